@@ -17,8 +17,67 @@ MYSQL_CONFIG = {
 # 服务器配置
 SERVER_CONFIG = {
     'max_query_rows': 1000,       # 最大查询返回行数
-    'query_timeout': 30,          # 查询超时时间（秒）
+    'query_timeout': 30,          # 单次工具调用的超时时间（秒），超时后在控制连接上 KILL QUERY 终止正在执行的查询
     'connection_pool_size': 5,    # 连接池大小
+    'driver': 'auto',             # 数据库驱动：auto / c_ext（C扩展）/ pure（纯Python）/ memory（进程内sqlite模拟库，离线压测用）
+    'memory_rows': 10000,         # memory驱动首次打开数据库时每张演示表生成的行数
+    'memory_tables': None,        # memory驱动生成的表和行数，如 {'users': 1000000, 'orders': 5000000}；None为全部演示表
+    'pool_validation_interval': 30,  # 空闲超过该秒数的连接在取出时先ping校验
+    'replica_reads': True,        # 连接目标配置了只读副本时，SELECT查询自动分发到副本
+    'reconnect_retries': 3,       # 连接断开（server has gone away）时读操作的最大重连次数
+    'reconnect_backoff': 0.2,     # 首次重连等待时间（秒），之后每次翻倍
+    'reconnect_backoff_max': 5,   # 重连等待时间上限（秒）
+    'fetch_batch_size': 500,      # 流式查询每批读取的行数
+    'max_cell_bytes': 2048,       # 单元格最大字节数，超出部分截断
+    'max_output_bytes': 1048576,  # 单次查询输出最大字节数
+    'blob_preview_bytes': 32,     # 二进制（BLOB）单元格显示的十六进制预览字节数，超出部分只显示总字节数，0为只显示字节数
+    'schema_cache_size': 1024,    # 表结构缓存的最大表数量
+    'schema_cache_ttl': 300,      # 表结构缓存有效期（秒）
+    'schema_cache_warmup': True,  # 连接成功后从information_schema批量预热表结构缓存
+    'database_stats_ttl': 300,    # get_database_info 表统计缓存有效期（秒），过期后先返回旧统计并在后台刷新
+    'database_stats_top_n': 10,   # get_database_info 默认显示占用空间最大的表数量
+    'batch_chunk_size': 1000,     # 批量写操作每个事务的语句数/行数
+    'batch_max_statement_bytes': 1048576,  # 合并后的多行INSERT最大长度，应小于max_allowed_packet
+    'script_multi_statements': True,  # execute_script 是否将连续的DML语句合并为一次往返发送
+    'script_timeout': 600,        # execute_script 整个脚本的执行超时（秒）
+    'query_cache_enabled': False, # 是否默认缓存SELECT结果（也可在execute_query中用use_cache单独开启）
+    'query_cache_size': 256,      # 查询结果缓存最大条目数
+    'query_cache_max_bytes': 67108864,  # 查询结果缓存最大总字节数
+    'query_cache_ttl': 60,        # 查询结果缓存默认有效期（秒）
+    'prepared_statement_cache_size': 32,  # 每个连接缓存的服务器端预处理语句数
+    'prepare_threshold': 2,       # 带参数的语句出现多少次后改用服务器端预处理
+    'cost_guard_mode': 'off',     # execute_query 代价检查：off / reject（拒绝）/ limit（客户端限制行数并终止查询）/ hint（加MAX_EXECUTION_TIME）
+    'cost_guard_max_rows': 1000000,  # EXPLAIN 估算扫描行数超过该值时触发代价检查
+    'cost_guard_max_execution_ms': 10000,  # hint 模式下的查询执行时间上限（毫秒）
+    'cost_guard_plan_cache_size': 512,  # 按查询形状缓存的执行计划估算数量
+    'cost_guard_plan_cache_ttl': 300,   # 执行计划估算缓存有效期（秒）
+    'result_cursor_max': 2,       # fetch_more 最多同时保留的服务器端游标数（每个占用一个连接，0为不保留）
+    'result_cursor_idle_timeout': 120,  # 保留的游标空闲多久后关闭（秒）
+    'result_keyset_ttl': 1800,    # 按主键续读的续页令牌有效期（秒）
+    'transaction_max': 2,         # 同时进行的显式事务数上限（每个固定占用一个连接，应小于connection_pool_size）
+    'transaction_idle_timeout': 60,  # 显式事务空闲多久未使用后自动回滚（秒）
+    'metrics_dump_file': None,    # 定期写入工具调用指标的文件路径（None为不写入）
+    'metrics_dump_format': 'json',  # 指标文件格式：json 或 prometheus
+    'metrics_dump_interval': 60,  # 指标文件最短写入间隔（秒）
+    'export_dir': '/tmp/mysql_mcp_exports',  # export_query 导出文件所在目录
+    'export_buffer_bytes': 1048576,  # 导出文件写缓冲区大小
+    'export_timeout': 600,        # 导出操作超时时间（秒）
+    'transport_max_concurrency': 8,  # 同时执行的工具调用数上限，另有同样数量的请求可排队，再多时暂停读取标准输入
+    'transport_max_message_bytes': 16777216,  # 单条JSON-RPC消息最大字节数
+}
+
+# 命名连接目标（可选）：connect_database 只传 target 即可连接，
+# 其他工具通过 target 参数使用对应连接（未连接时首次使用自动连接）
+TARGETS = {
+    # 'reporting': {
+    #     'host': 'reporting-primary',
+    #     'port': 3306,
+    #     'database': 'reporting',
+    #     'username': 'your_username',
+    #     'password': 'your_password',
+    #     # 只读副本：host 或 host:port，也可以是覆盖主库配置项的字典
+    #     'replicas': ['reporting-replica-1', 'reporting-replica-2:3307'],
+    # },
 }
 
 # 安全配置
@@ -0,0 +1,48 @@
+"""
+pytest 配置
+test_connection.py / test_cursor_config.py 是需要真实数据库和本机环境的交互式检查脚本，不由 pytest 收集；
+其余测试用 database / run 夹具在 memory 驱动的内存数据库上离线运行服务器工具
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+import mysql_mcp_memory
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_server import MySQLMCPServer
+
+collect_ignore = ["test_connection.py", "test_cursor_config.py"]
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def database():
+    name = f"test_memory_{next(_names)}"
+    mysql_mcp_memory.open_database(name, rows=50)
+    yield name
+    mysql_mcp_memory.drop_database(name)
+
+
+@pytest.fixture
+def run(database):
+    """在同一个服务器实例上依次执行工具调用：run(lambda server: server.handle_xxx(...))"""
+    server = MySQLMCPServer()
+    loop = asyncio.new_event_loop()
+    connected = loop.run_until_complete(server.handle_connect_database(
+        host="localhost", database=database, username="u", password="p", driver="memory"))
+    assert not isinstance(connected, ToolFailure), connected
+    yield lambda call: loop.run_until_complete(call(server))
+    # 停止服务器启动的后台任务（如空闲事务回收）
+    tasks = asyncio.all_tasks(loop)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.wait(tasks))
+    server.pager.close()
+    server.transactions.close()
+    server.executor.shutdown(wait=True)
+    server.connection_manager.close()
+    loop.close()
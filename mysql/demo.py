@@ -11,6 +11,45 @@ from datetime import datetime
 class MySQLMCPDemo:
     """MySQL MCP服务器演示类"""
     
+    # 演示数据
+    SAMPLE_TABLES = ['users', 'orders', 'products', 'categories', 'reviews']
+    
+    SAMPLE_ROWS = {
+        'users': [
+            {'id': 1, 'name': '张三', 'email': 'zhangsan@example.com', 'status': 'active'},
+            {'id': 2, 'name': '李四', 'email': 'lisi@example.com', 'status': 'active'},
+            {'id': 3, 'name': '王五', 'email': 'wangwu@example.com', 'status': 'inactive'}
+        ],
+        'orders': [
+            {'order_id': 1001, 'user_id': 1, 'amount': 299.99, 'status': 'completed'},
+            {'order_id': 1002, 'user_id': 2, 'amount': 159.50, 'status': 'pending'},
+            {'order_id': 1003, 'user_id': 1, 'amount': 89.99, 'status': 'shipped'}
+        ]
+    }
+    
+    SAMPLE_COLUMNS = {
+        'users': [
+            {'Field': 'id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'PRI', 'Default': 'NULL', 'Extra': 'auto_increment'},
+            {'Field': 'name', 'Type': 'varchar(100)', 'Null': 'NO', 'Key': '', 'Default': 'NULL', 'Extra': ''},
+            {'Field': 'email', 'Type': 'varchar(255)', 'Null': 'NO', 'Key': 'UNI', 'Default': 'NULL', 'Extra': ''},
+            {'Field': 'status', 'Type': 'enum("active","inactive")', 'Null': 'NO', 'Key': '', 'Default': 'active', 'Extra': ''},
+            {'Field': 'created_at', 'Type': 'timestamp', 'Null': 'NO', 'Key': '', 'Default': 'current_timestamp()', 'Extra': ''}
+        ],
+        'orders': [
+            {'Field': 'order_id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'PRI', 'Default': 'NULL', 'Extra': 'auto_increment'},
+            {'Field': 'user_id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'MUL', 'Default': 'NULL', 'Extra': ''},
+            {'Field': 'amount', 'Type': 'decimal(10,2)', 'Null': 'NO', 'Key': '', 'Default': '0.00', 'Extra': ''},
+            {'Field': 'status', 'Type': 'enum("pending","processing","shipped","completed","cancelled")', 'Null': 'NO', 'Key': '', 'Default': 'pending', 'Extra': ''},
+            {'Field': 'created_at', 'Type': 'timestamp', 'Null': 'NO', 'Key': '', 'Default': 'current_timestamp()', 'Extra': ''}
+        ]
+    }
+    
+    DEFAULT_COLUMNS = [
+        {'Field': 'id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'PRI', 'Default': 'NULL', 'Extra': 'auto_increment'},
+        {'Field': 'name', 'Type': 'varchar(255)', 'Null': 'YES', 'Key': '', 'Default': 'NULL', 'Extra': ''},
+        {'Field': 'created_at', 'Type': 'timestamp', 'Null': 'NO', 'Key': '', 'Default': 'current_timestamp()', 'Extra': ''}
+    ]
+    
     def __init__(self):
         self.dev_warning_shown = False
         self.database_connected = False
@@ -73,17 +112,9 @@ MySQL版本: 8.0.35
         
         # 模拟查询结果
         if 'users' in query.lower():
-            results = [
-                {'id': 1, 'name': '张三', 'email': 'zhangsan@example.com', 'status': 'active'},
-                {'id': 2, 'name': '李四', 'email': 'lisi@example.com', 'status': 'active'},
-                {'id': 3, 'name': '王五', 'email': 'wangwu@example.com', 'status': 'inactive'}
-            ]
+            results = self.SAMPLE_ROWS['users']
         elif 'orders' in query.lower():
-            results = [
-                {'order_id': 1001, 'user_id': 1, 'amount': 299.99, 'status': 'completed'},
-                {'order_id': 1002, 'user_id': 2, 'amount': 159.50, 'status': 'pending'},
-                {'order_id': 1003, 'user_id': 1, 'amount': 89.99, 'status': 'shipped'}
-            ]
+            results = self.SAMPLE_ROWS['orders']
         else:
             results = [
                 {'result': '查询执行成功', 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -113,28 +144,7 @@ MySQL版本: 8.0.35
             return f"{warning}❌ 请先连接数据库"
         
         # 模拟表结构信息
-        if table_name.lower() == 'users':
-            columns_info = [
-                {'Field': 'id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'PRI', 'Default': 'NULL', 'Extra': 'auto_increment'},
-                {'Field': 'name', 'Type': 'varchar(100)', 'Null': 'NO', 'Key': '', 'Default': 'NULL', 'Extra': ''},
-                {'Field': 'email', 'Type': 'varchar(255)', 'Null': 'NO', 'Key': 'UNI', 'Default': 'NULL', 'Extra': ''},
-                {'Field': 'status', 'Type': 'enum("active","inactive")', 'Null': 'NO', 'Key': '', 'Default': 'active', 'Extra': ''},
-                {'Field': 'created_at', 'Type': 'timestamp', 'Null': 'NO', 'Key': '', 'Default': 'current_timestamp()', 'Extra': ''}
-            ]
-        elif table_name.lower() == 'orders':
-            columns_info = [
-                {'Field': 'order_id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'PRI', 'Default': 'NULL', 'Extra': 'auto_increment'},
-                {'Field': 'user_id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'MUL', 'Default': 'NULL', 'Extra': ''},
-                {'Field': 'amount', 'Type': 'decimal(10,2)', 'Null': 'NO', 'Key': '', 'Default': '0.00', 'Extra': ''},
-                {'Field': 'status', 'Type': 'enum("pending","processing","shipped","completed","cancelled")', 'Null': 'NO', 'Key': '', 'Default': 'pending', 'Extra': ''},
-                {'Field': 'created_at', 'Type': 'timestamp', 'Null': 'NO', 'Key': '', 'Default': 'current_timestamp()', 'Extra': ''}
-            ]
-        else:
-            columns_info = [
-                {'Field': 'id', 'Type': 'int(11)', 'Null': 'NO', 'Key': 'PRI', 'Default': 'NULL', 'Extra': 'auto_increment'},
-                {'Field': 'name', 'Type': 'varchar(255)', 'Null': 'YES', 'Key': '', 'Default': 'NULL', 'Extra': ''},
-                {'Field': 'created_at', 'Type': 'timestamp', 'Null': 'NO', 'Key': '', 'Default': 'current_timestamp()', 'Extra': ''}
-            ]
+        columns_info = self.SAMPLE_COLUMNS.get(table_name.lower(), self.DEFAULT_COLUMNS)
         
         output = f"{warning}表 {table_name} 结构信息：\n\n"
         
@@ -156,7 +166,7 @@ MySQL版本: 8.0.35
             return f"{warning}❌ 请先连接数据库"
         
         # 模拟表列表
-        tables = ['users', 'orders', 'products', 'categories', 'reviews']
+        tables = self.SAMPLE_TABLES
         
         output = f"{warning}数据库中的表：\n\n"
         for table in tables:
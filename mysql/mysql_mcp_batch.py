@@ -0,0 +1,102 @@
+"""
+MySQL MCP批量写入
+语句分块、连续单行INSERT合并为多行INSERT，以及多条语句一次发送（multi-statement）
+"""
+
+import re
+import inspect
+from typing import Iterator, List, Sequence, TypeVar
+
+from mysql_mcp_sql import classify
+
+T = TypeVar("T")
+
+# 形如 INSERT INTO t (a, b) VALUES (...) 的简单INSERT
+SIMPLE_INSERT_PATTERN = re.compile(
+    r"^\s*(INSERT\s+(?:IGNORE\s+)?INTO\s+[`\w.$]+\s*(?:\([^)]*\))?\s*VALUES)\s*(\(.*\))\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# 包含这些子句的INSERT不能简单地拼接VALUES
+_UNMERGEABLE_PATTERN = re.compile(r"\bON\s+DUPLICATE\b|\bSELECT\b", re.IGNORECASE)
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    """按固定大小切分序列"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def chunk_statements(statements: Sequence[str], size: int) -> Iterator[Sequence[str]]:
+    """按固定大小切分语句列表，DDL 语句单独成块
+
+    MySQL 执行 DDL 时会隐式提交当前事务，与其他语句放在同一块中时该块无法整体回滚。
+    """
+    start = 0
+    for index, statement in enumerate(statements):
+        if classify(statement).is_ddl:
+            yield from chunked(statements[start:index], size)
+            yield statements[index:index + 1]
+            start = index + 1
+    yield from chunked(statements[start:], size)
+
+
+def merge_insert_statements(statements: Sequence[str], max_bytes: int = 1024 * 1024) -> List[str]:
+    """将连续的、目标表和列相同的单行INSERT合并为多行INSERT
+
+    其他语句保持原样和原有顺序；合并后的单条语句不超过 max_bytes 字符，
+    避免超过服务器的 max_allowed_packet。
+    """
+    merged: List[str] = []
+    prefix = None
+    values: List[str] = []
+    size = 0
+
+    def flush():
+        if values:
+            merged.append(f"{prefix} {','.join(values)}")
+
+    for statement in statements:
+        match = None
+        # 语句内部含分号（可能是多条语句）时不合并
+        if ";" not in statement.rstrip().rstrip(";") and not _UNMERGEABLE_PATTERN.search(statement):
+            match = SIMPLE_INSERT_PATTERN.match(statement)
+        if match is None:
+            flush()
+            prefix, values, size = None, [], 0
+            merged.append(statement)
+            continue
+
+        head = " ".join(match.group(1).split())
+        row = match.group(2)
+        if head != prefix or size + len(row) + 1 > max_bytes:
+            flush()
+            prefix, values, size = head, [], len(head)
+        values.append(row)
+        size += len(row) + 1
+
+    flush()
+    return merged
+
+
+def execute_multi(cursor, statements: Sequence[str]) -> Iterator[int]:
+    """在一次往返中发送多条语句，按顺序产出每个结果的行数（查询为返回行数，写操作为影响行数）
+
+    服务器在第一条失败的语句处停止执行，读取到该语句的结果时抛出异常。
+    """
+    # 语句可能以行注释结尾，分号放在新的一行
+    sql = "\n;\n".join(statements)
+    if "multi" in inspect.signature(cursor.execute).parameters:
+        # mysql-connector 9.2 之前：execute(multi=True) 返回逐个结果的迭代器
+        results = cursor.execute(sql, multi=True)
+    else:
+        cursor.execute(sql)
+        results = _result_sets(cursor)
+    for result in results:
+        yield len(result.fetchall()) if result.with_rows else max(result.rowcount, 0)
+
+
+def _result_sets(cursor) -> Iterator:
+    yield cursor
+    while cursor.nextset():
+        yield cursor
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+MySQL MCP服务器基准测试
+以可配置的并发度驱动 MySQLMCPServer.handle_* 方法，统计延迟分位数、吞吐和内存峰值
+
+后端：
+- fake: 进程内模拟连接，数据来自 demo.py 的 MySQLMCPDemo，可放大行数并模拟网络延迟
+- memory: 内存后端（mysql_mcp_memory，sqlite3），真实执行SQL，可生成百万行级的合成数据
+- mysql: 连接本地启动的 mysqld / MariaDB 实例
+
+示例：
+    python3 mysql_mcp_benchmark.py --backend fake --concurrency 8 --iterations 500 --output bench.json
+    python3 mysql_mcp_benchmark.py --backend memory --rows 1000000 --max-rows 1000
+    python3 mysql_mcp_benchmark.py --backend mysql --database bench --username root --compare bench.json
+    python3 mysql_mcp_benchmark.py --backend mysql --database bench --username root --drivers c_ext,pure --rows-query "SELECT * FROM big_table"
+"""
+
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import platform
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from demo import MySQLMCPDemo
+import mysql_mcp_server
+import mysql_mcp_driver
+import mysql_mcp_memory
+from mysql_mcp_server import DatabaseConfig, MySQLMCPServer, quote_identifier
+from mysql_mcp_memory import field_type
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_sql import referenced_tables, split_script
+
+
+# ---------------------------------------------------------------------------
+# 进程内模拟连接
+# ---------------------------------------------------------------------------
+
+class FakeDataset:
+    """基于 MySQLMCPDemo 演示数据的模拟数据集，可按行数放大"""
+
+    def __init__(self, rows_per_table: int = 0):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.columns: Dict[str, List[Dict[str, Any]]] = {}
+        for table in MySQLMCPDemo.SAMPLE_TABLES:
+            self.columns[table] = MySQLMCPDemo.SAMPLE_COLUMNS.get(table, MySQLMCPDemo.DEFAULT_COLUMNS)
+            sample = MySQLMCPDemo.SAMPLE_ROWS.get(table) or [
+                {'id': 1, 'name': f'{table}-1', 'created_at': datetime(2024, 1, 1)}
+            ]
+            self.tables[table] = self._scale(sample, rows_per_table)
+
+    @staticmethod
+    def _scale(sample: List[Dict[str, Any]], rows: int) -> List[Dict[str, Any]]:
+        if rows <= len(sample):
+            return list(sample)
+        key = next(iter(sample[0]))
+        scaled = []
+        for index in range(rows):
+            row = dict(sample[index % len(sample)])
+            if isinstance(row[key], int):
+                row[key] = index + 1
+            scaled.append(row)
+        return scaled
+
+
+class FakeCursor:
+    """兼容 mysql.connector 游标接口的模拟游标"""
+
+    def __init__(self, connection: "FakeConnection", dictionary: bool = False):
+        self._connection = connection
+        self._dictionary = dictionary
+        self._rows: List[Any] = []
+        self._pending: List[str] = []
+        self._position = 0
+        self.rowcount = -1
+        self.description = None
+        self.column_names: tuple = ()
+
+    def execute(self, operation: str, params: Any = None):
+        self._connection.simulate_latency()
+        # 一次发送的多条语句依次产生结果，由 nextset 切换
+        statements = (split_script(operation) if ";" in operation else None) or [operation]
+        self._pending = statements[1:]
+        columns, rows = self._connection.run(statements[0], params)
+        self._set_result(columns, rows)
+
+    def nextset(self):
+        if not self._pending:
+            return None
+        columns, rows = self._connection.run(self._pending.pop(0))
+        self._set_result(columns, rows)
+        return True
+
+    @property
+    def with_rows(self) -> bool:
+        return self.description is not None
+
+    def executemany(self, operation: str, seq_params: List[Any]):
+        self._connection.simulate_latency()
+        self._set_result([], [])
+        self.rowcount = len(seq_params)
+
+    def _set_result(self, columns: List[str], rows: List[Dict[str, Any]]):
+        self.column_names = tuple(columns)
+        self.description = [
+            (name, field_type(rows[0].get(name) if rows else None), None, None, None, None, 1, 0)
+            for name in columns
+        ] or None
+        if self._dictionary:
+            self._rows = rows
+        else:
+            self._rows = [tuple(row.get(name) for name in columns) for row in rows]
+        self._position = 0
+        self.rowcount = len(rows)
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size: int = 1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def close(self):
+        self._rows = []
+
+
+class FakeConnection:
+    """兼容 mysql.connector 连接接口的进程内模拟连接"""
+
+    VERSION = "8.0.35-mcp-fake"
+
+    def __init__(self, config: DatabaseConfig, dataset: FakeDataset, latency: float = 0.0):
+        self.config = config
+        self.dataset = dataset
+        self.latency = latency
+        self.unread_result = False
+        self.in_transaction = False
+        self.connection_id = id(self) & 0xFFFF
+
+    def simulate_latency(self):
+        if self.latency:
+            # time.sleep 会释放GIL，用于模拟网络往返
+            time.sleep(self.latency)
+
+    def cursor(self, dictionary: bool = False, prepared: bool = False, **kwargs):
+        return FakeCursor(self, dictionary=dictionary)
+
+    def run(self, sql: str, params: Any = None):
+        """按语句类型返回 (列名, 行字典列表)"""
+        text = sql.strip()
+        upper = text.upper()
+        if upper.startswith("SELECT VERSION()"):
+            if "@@" in upper:
+                info = {"version": self.VERSION, "database": self.config.database,
+                        "user": f"{self.config.username}@localhost",
+                        "sql_mode": "STRICT_TRANS_TABLES,NO_ENGINE_SUBSTITUTION",
+                        "character_set": self.config.charset, "collation": f"{self.config.charset}_general_ci",
+                        "time_zone": "SYSTEM", "system_time_zone": "UTC"}
+                return list(info), [info]
+            if "DATABASE()" in upper:
+                return ["version", "database", "user"], [
+                    {"version": self.VERSION, "database": self.config.database, "user": f"{self.config.username}@localhost"}
+                ]
+            return ["VERSION()"], [{"VERSION()": self.VERSION}]
+        if upper.startswith("EXPLAIN FORMAT=JSON"):
+            # 每张引用的表按全表扫描估算
+            tables = [table for table in referenced_tables(text) if table in self.dataset.tables]
+            plan = {"query_block": {"cost_info": {"query_cost": "1.00"}, "nested_loop": [
+                {"table": {"table_name": table, "access_type": "ALL",
+                           "rows_examined_per_scan": len(self.dataset.tables[table]),
+                           "rows_produced_per_join": len(self.dataset.tables[table])}}
+                for table in tables
+            ]}}
+            return ["EXPLAIN"], [{"EXPLAIN": json.dumps(plan)}]
+        if upper.startswith("SELECT COUNT(*) FROM ("):
+            inner = text[text.index("(") + 1:text.rindex(")")]
+            _, rows = self.run(inner, params)
+            return ["COUNT(*)"], [{"COUNT(*)": len(rows)}]
+        if "INFORMATION_SCHEMA.KEY_COLUMN_USAGE" in upper:
+            # 约定：<name>_id 列引用 <name>s.id
+            rows = [
+                {"Table": table, "Constraint_name": f"fk_{table}_{col['Field']}", "Column_name": col["Field"],
+                 "Referenced_table": col["Field"][:-3] + "s", "Referenced_column": "id",
+                 "Update_rule": "RESTRICT", "Delete_rule": "RESTRICT"}
+                for table, cols in self.dataset.columns.items() for col in cols
+                if col["Field"].endswith("_id") and col["Field"][:-3] + "s" in self.dataset.tables
+                and col["Field"][:-3] + "s" != table
+            ]
+            return ["Table", "Constraint_name", "Column_name", "Referenced_table", "Referenced_column",
+                    "Update_rule", "Delete_rule"], rows
+        if "INFORMATION_SCHEMA.COLUMNS" in upper:
+            rows = [dict(col, Table=table) for table, cols in self.dataset.columns.items() for col in cols]
+            return ["Table", "Field", "Type", "Null", "Key", "Default", "Extra"], rows
+        if "INFORMATION_SCHEMA.STATISTICS" in upper:
+            rows = [
+                {"Table": table, **index}
+                for table in self.dataset.columns
+                for index in self._indexes(table)
+            ]
+            return ["Table", "Key_name", "Column_name", "Non_unique", "Seq_in_index"], rows
+        if "INFORMATION_SCHEMA.TABLES" in upper:
+            # 每行按128字节数据、32字节索引估算
+            return ["name", "type", "engine", "rows", "data_size", "index_size", "update_time"], [
+                {"name": table, "type": "BASE TABLE", "engine": "InnoDB", "rows": len(rows),
+                 "data_size": len(rows) * 128, "index_size": len(rows) * 32, "update_time": None}
+                for table, rows in self.dataset.tables.items()
+            ]
+        if upper.startswith("SHOW TABLES"):
+            name = f"Tables_in_{self.config.database}"
+            return [name], [{name: table} for table in self.dataset.tables]
+        if upper.startswith(("DESCRIBE", "DESC ")):
+            table = self._table_name(text.split(None, 1)[1])
+            return ["Field", "Type", "Null", "Key", "Default", "Extra"], self.dataset.columns.get(table, [])
+        if upper.startswith("SHOW INDEX FROM"):
+            table = self._table_name(text[len("SHOW INDEX FROM"):])
+            return ["Key_name", "Column_name", "Non_unique", "Seq_in_index"], self._indexes(table)
+        if upper.startswith(("SELECT", "WITH", "(")):
+            for table in referenced_tables(text):
+                if table in self.dataset.tables:
+                    rows = self.dataset.tables[table]
+                    return list(rows[0]) if rows else [], rows
+            return ["result"], [{"result": 1}]
+        # 写操作
+        self.in_transaction = True
+        return [], []
+
+    def _indexes(self, table: str) -> List[Dict[str, Any]]:
+        indexes = []
+        for col in self.dataset.columns.get(table, []):
+            if col["Key"] == "PRI":
+                indexes.append({"Key_name": "PRIMARY", "Column_name": col["Field"], "Non_unique": 0, "Seq_in_index": 1})
+            elif col["Key"] in ("UNI", "MUL"):
+                indexes.append({"Key_name": col["Field"], "Column_name": col["Field"],
+                                "Non_unique": 0 if col["Key"] == "UNI" else 1, "Seq_in_index": 1})
+        return indexes
+
+    @staticmethod
+    def _table_name(text: str) -> str:
+        return text.strip().rstrip(";").replace("`", "").split(".")[-1]
+
+    def commit(self):
+        self.simulate_latency()
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def ping(self, reconnect: bool = False):
+        self.simulate_latency()
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+def fake_connect_factory(dataset: FakeDataset, latency: float = 0.0, connect_latency: float = 0.0):
+    """返回创建模拟连接的工厂函数"""
+    def connect(config: DatabaseConfig) -> FakeConnection:
+        if connect_latency:
+            time.sleep(connect_latency)
+        return FakeConnection(config, dataset, latency)
+    return connect
+
+
+# ---------------------------------------------------------------------------
+# 基准测试
+# ---------------------------------------------------------------------------
+
+Scenario = Callable[[MySQLMCPServer], Awaitable[str]]
+
+
+def default_scenarios(table: str, max_rows: int) -> Dict[str, Scenario]:
+    """默认测试场景：每个工具处理函数一项"""
+    return {
+        "execute_query": lambda s: s.handle_execute_query(f"SELECT * FROM {table}", max_rows=max_rows),
+        "execute_query_cached": lambda s: s.handle_execute_query(f"SELECT * FROM {table}", max_rows=max_rows, use_cache=True),
+        "execute_query_params": lambda s: s.handle_execute_query(f"SELECT * FROM {table} WHERE id > %s", max_rows=max_rows, params=[0]),
+        "describe_table": lambda s: s.handle_describe_table(table),
+        "describe_schema": lambda s: s.handle_describe_schema(compact=True),
+        "show_tables": lambda s: s.handle_show_tables(),
+        "execute_write_operation": lambda s: s.handle_execute_write_operation(f"UPDATE {table} SET name = name WHERE id = 1"),
+        "confirmed_write_operation": lambda s: s.handle_confirmed_write_operation(f"UPDATE {table} SET name = name WHERE id = %s", params=[1]),
+        "get_database_info": lambda s: s.handle_get_database_info(),
+        "execute_script": lambda s: s.handle_execute_script(
+            "\n".join(f"UPDATE {table} SET name = name WHERE id = {i};" for i in range(1, 21)), confirmed=True
+        ),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法计算分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程内存峰值（MB）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_scenario(server: MySQLMCPServer, scenario: Scenario, concurrency: int, iterations: int) -> Dict[str, Any]:
+    """以给定并发度执行 iterations 次调用"""
+    latencies: List[float] = []
+    errors = 0
+    calls = iter(range(iterations))
+
+    async def worker():
+        nonlocal errors
+        for _ in calls:
+            start = time.perf_counter()
+            result = await scenario(server)
+            latencies.append(time.perf_counter() - start)
+            if isinstance(result, ToolFailure):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "calls_per_sec": len(latencies) / wall if wall > 0 else 0.0,
+    }
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    mysql_mcp_server.SERVER_CONFIG['connection_pool_size'] = args.pool_size
+    server = MySQLMCPServer()
+    server.show_dev_warning()
+
+    if args.backend == "fake":
+        dataset = FakeDataset(rows_per_table=args.rows)
+        server.connection_manager.connect_factory = fake_connect_factory(
+            dataset, latency=args.latency_ms / 1000.0, connect_latency=args.connect_ms / 1000.0
+        )
+    elif args.backend == "memory":
+        start = time.perf_counter()
+        mysql_mcp_memory.open_database(args.database, rows=args.rows)
+        print(f"   生成合成数据: 每张表 {args.rows:,} 行，耗时 {time.perf_counter() - start:.1f} 秒", file=sys.stderr)
+        args.driver = "memory"
+
+    connected = await server.handle_connect_database(
+        host=args.host, port=args.port, database=args.database,
+        username=args.username, password=args.password, driver=args.driver
+    )
+    if isinstance(connected, ToolFailure):
+        raise SystemExit(connected)
+
+    scenarios = default_scenarios(args.table, args.max_rows)
+    selected = args.tools.split(",") if args.tools else list(scenarios)
+    results = {}
+    try:
+        for name in selected:
+            if name not in scenarios:
+                raise SystemExit(f"未知的测试场景: {name}，可选: {', '.join(scenarios)}")
+            # 预热，排除首次建连的影响
+            for _ in range(min(args.warmup, args.iterations)):
+                await scenarios[name](server)
+            results[name] = await run_scenario(server, scenarios[name], args.concurrency, args.iterations)
+            print_result(name, results[name])
+    finally:
+        pool_stats = server.connection_manager.get_pool_stats()
+        server.executor.shutdown(wait=True)
+        server.connection_manager.close()
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "pool_size": args.pool_size,
+        "rows": args.rows,
+        "max_rows": args.max_rows,
+        "latency_ms": args.latency_ms if args.backend == "fake" else None,
+        "pool": pool_stats,
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+
+def run_driver_comparison(args) -> Dict[str, Any]:
+    """对同一查询比较各驱动的每秒解码行数（直接使用驱动连接，不经过结果格式化）"""
+    query = args.rows_query or f"SELECT * FROM {quote_identifier(args.table)}"
+    batch_size = mysql_mcp_server.SERVER_CONFIG['fetch_batch_size']
+    results = {}
+    for driver in args.drivers.split(","):
+        resolved = mysql_mcp_driver.resolve_driver(driver)
+        conn = mysql_mcp_driver.connect(
+            driver, host=args.host, port=args.port, database=args.database,
+            user=args.username, password=args.password
+        )
+        latencies: List[float] = []
+        rows_per_query = 0
+        try:
+            for i in range(args.warmup + args.iterations):
+                start = time.perf_counter()
+                cursor = conn.cursor()
+                cursor.execute(query)
+                rows_per_query = 0
+                for batch in iter(lambda: cursor.fetchmany(batch_size), []):
+                    rows_per_query += len(batch)
+                cursor.close()
+                if i >= args.warmup:
+                    latencies.append(time.perf_counter() - start)
+        finally:
+            conn.close()
+
+        total = sum(latencies)
+        latencies.sort()
+        results[driver] = {
+            "driver": resolved,
+            "calls": len(latencies),
+            "errors": 0,
+            "rows_per_query": rows_per_query,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "mean_ms": total / len(latencies) * 1000 if latencies else 0.0,
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+            "calls_per_sec": len(latencies) / total if total > 0 else 0.0,
+            "rows_per_sec": rows_per_query * len(latencies) / total if total > 0 else 0.0,
+        }
+        print_result(f"{driver} ({resolved})", results[driver])
+        print(f"   {'':<28} {results[driver]['rows_per_sec']:,.0f} 行/秒（每次 {rows_per_query} 行）", file=sys.stderr)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "query": query,
+        "iterations": args.iterations,
+        "have_cext": mysql_mcp_driver.HAVE_CEXT,
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+
+def print_result(name: str, result: Dict[str, Any]):
+    print(f"   {name:<28} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+          f"p99 {result['p99_ms']:8.2f} ms  {result['calls_per_sec']:9.1f} 次/秒"
+          f"{'  错误 ' + str(result['errors']) if result['errors'] else ''}", file=sys.stderr)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]):
+    """与基线结果对比，输出变化百分比"""
+    print("\n📊 与基线对比（正数表示变慢 / 吞吐下降）:", file=sys.stderr)
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+
+        def delta(key, inverse=False):
+            if not base[key]:
+                return "   n/a"
+            change = (result[key] - base[key]) / base[key] * 100
+            return f"{-change if inverse else change:+6.1f}%"
+
+        print(f"   {name:<28} p50 {delta('p50_ms')}  p95 {delta('p95_ms')}  p99 {delta('p99_ms')}  "
+              f"吞吐 {delta('calls_per_sec', inverse=True)}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MySQL MCP服务器基准测试")
+    parser.add_argument("--backend", choices=["fake", "memory", "mysql"], default="fake",
+                        help="fake: 进程内模拟连接；memory: 进程内sqlite内存库；mysql: 本地MySQL/MariaDB")
+    parser.add_argument("--driver", default=mysql_mcp_server.SERVER_CONFIG['driver'], help="mysql后端使用的驱动：auto / c_ext / pure")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--database", default="demo_db")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--table", default="users", help="查询和查看结构使用的表")
+    parser.add_argument("--tools", help="逗号分隔的测试场景，默认全部")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=200, help="每个场景的调用次数")
+    parser.add_argument("--warmup", type=int, default=5, help="每个场景的预热调用次数")
+    parser.add_argument("--pool-size", type=int, default=mysql_mcp_server.SERVER_CONFIG['connection_pool_size'])
+    parser.add_argument("--max-rows", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=1000, help="fake/memory后端每张表的行数")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="fake后端每次往返的模拟延迟")
+    parser.add_argument("--connect-ms", type=float, default=10.0, help="fake后端建立连接的模拟延迟")
+    parser.add_argument("--output", help="JSON结果输出文件，默认输出到标准输出")
+    parser.add_argument("--compare", help="用于对比的基线JSON文件")
+    parser.add_argument("--drivers", help="逗号分隔的驱动列表（如 c_ext,pure），对同一查询比较每秒解码行数，仅mysql后端")
+    parser.add_argument("--rows-query", help="驱动对比使用的查询，默认 SELECT * FROM <table>")
+    args = parser.parse_args()
+
+    if args.drivers:
+        if args.backend != "mysql":
+            raise SystemExit("驱动对比需要真实数据库，请使用 --backend mysql")
+        print(f"🏁 驱动对比: {args.drivers}，每个驱动 {args.iterations} 次", file=sys.stderr)
+        report = run_driver_comparison(args)
+    else:
+        print(f"🏁 基准测试: 后端 {args.backend}，并发 {args.concurrency}，每场景 {args.iterations} 次", file=sys.stderr)
+        report = asyncio.run(run_benchmark(args))
+    print(f"   内存峰值: {report['peak_rss_mb']:.1f} MB" if report['peak_rss_mb'] else "", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"💾 结果已写入: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+MySQL MCP缓存
+进程内的TTL + LRU缓存，以及基于它的表结构缓存和查询结果缓存
+"""
+
+import re
+import time
+import fnmatch
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# 连接标识：(host, port, database)
+ConnectionKey = Tuple[str, int, str]
+
+_MISSING = object()
+
+
+class TTLLRUCache:
+    """线程安全的TTL + LRU缓存，可同时按条目数和总字节数限制"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            expires_at, value, size = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0) -> None:
+        """写入缓存；size 为条目占用的字节数，用于总字节数限制"""
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def invalidate(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """删除所有满足 predicate(key, value) 的条目，返回删除数量"""
+        with self._lock:
+            keys = [key for key, entry in self._data.items() if predicate(key, entry[1])]
+            for key in keys:
+                self._bytes -= self._data.pop(key)[2]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+def normalize_table_name(table_name: str) -> str:
+    """去掉反引号，用于缓存键"""
+    return table_name.strip().replace("`", "")
+
+
+class SchemaCache:
+    """表结构缓存
+
+    - 表结构按 (host, port, database, table) 缓存 DESCRIBE / SHOW INDEX 的结果
+    - 表列表按 (host, port, database) 缓存 SHOW TABLES 的结果
+    - 整库结构（列、索引、外键）按 (host, port, database) 缓存 information_schema 的查询结果
+    """
+
+    # 以 DESCRIBE 的列名返回，便于与 DESCRIBE 结果互换
+    COLUMNS_SQL = """
+        SELECT TABLE_NAME AS `Table`, COLUMN_NAME AS `Field`, COLUMN_TYPE AS `Type`,
+               IS_NULLABLE AS `Null`, COLUMN_KEY AS `Key`, COLUMN_DEFAULT AS `Default`,
+               EXTRA AS `Extra`
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """
+
+    # 以 SHOW INDEX 的列名返回
+    STATISTICS_SQL = """
+        SELECT TABLE_NAME AS `Table`, INDEX_NAME AS `Key_name`, COLUMN_NAME AS `Column_name`,
+               NON_UNIQUE AS `Non_unique`, SEQ_IN_INDEX AS `Seq_in_index`
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """
+
+    FOREIGN_KEYS_SQL = """
+        SELECT k.TABLE_NAME AS `Table`, k.CONSTRAINT_NAME AS `Constraint_name`, k.COLUMN_NAME AS `Column_name`,
+               k.REFERENCED_TABLE_NAME AS `Referenced_table`, k.REFERENCED_COLUMN_NAME AS `Referenced_column`,
+               r.UPDATE_RULE AS `Update_rule`, r.DELETE_RULE AS `Delete_rule`
+        FROM information_schema.KEY_COLUMN_USAGE k
+        JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+          ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+         AND r.TABLE_NAME = k.TABLE_NAME
+        WHERE k.TABLE_SCHEMA = DATABASE() AND k.REFERENCED_TABLE_NAME IS NOT NULL
+        ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION
+    """
+
+    def __init__(self, max_tables: int = 1024, ttl: float = 300.0):
+        self.tables = TTLLRUCache(max_entries=max_tables, ttl=ttl)
+        self.table_lists = TTLLRUCache(max_entries=64, ttl=ttl)
+        self.schemas = TTLLRUCache(max_entries=16, ttl=ttl)
+
+    def get_table(self, conn_key: ConnectionKey, table_name: str):
+        """返回 (columns, indexes)，未命中返回 None"""
+        return self.tables.get(conn_key + (normalize_table_name(table_name),))
+
+    def put_table(self, conn_key: ConnectionKey, table_name: str, columns: List[Dict], indexes: List[Dict]) -> None:
+        self.tables.set(conn_key + (normalize_table_name(table_name),), (columns, indexes))
+
+    def get_table_list(self, conn_key: ConnectionKey) -> Optional[List[str]]:
+        return self.table_lists.get(conn_key)
+
+    def put_table_list(self, conn_key: ConnectionKey, tables: List[str]) -> None:
+        self.table_lists.set(conn_key, tables)
+
+    def invalidate(self, conn_key: ConnectionKey, table_name: Optional[str] = None) -> None:
+        """DDL后失效缓存；未指定表名时失效整个数据库"""
+        self.table_lists.pop(conn_key)
+        self.schemas.pop(conn_key)
+        if table_name is None:
+            self.tables.invalidate(lambda key, _: key[:3] == conn_key)
+        else:
+            self.tables.pop(conn_key + (normalize_table_name(table_name),))
+
+    def get_schema(self, conn_key: ConnectionKey) -> Optional["OrderedDict[str, Dict[str, List[Dict]]]"]:
+        """返回整库结构 {表名: {"columns", "indexes", "foreign_keys"}}，未命中返回 None"""
+        return self.schemas.get(conn_key)
+
+    def load_schema(self, conn, conn_key: ConnectionKey) -> "OrderedDict[str, Dict[str, List[Dict]]]":
+        """通过三条 information_schema 查询加载整库结构，并同时填充表结构和表列表缓存"""
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(self.COLUMNS_SQL)
+        column_rows = cursor.fetchall()
+        cursor.execute(self.STATISTICS_SQL)
+        index_rows = cursor.fetchall()
+        cursor.execute(self.FOREIGN_KEYS_SQL)
+        foreign_key_rows = cursor.fetchall()
+        cursor.close()
+
+        schema: "OrderedDict[str, Dict[str, List[Dict]]]" = OrderedDict()
+        for row in column_rows:
+            table = schema.setdefault(row.pop("Table"), {"columns": [], "indexes": [], "foreign_keys": []})
+            table["columns"].append(row)
+        for key, rows in (("indexes", index_rows), ("foreign_keys", foreign_key_rows)):
+            for row in rows:
+                table = schema.get(row.pop("Table"))
+                if table is not None:
+                    table[key].append(row)
+
+        for table_name, table in schema.items():
+            self.put_table(conn_key, table_name, table["columns"], table["indexes"])
+        self.put_table_list(conn_key, list(schema))
+        self.schemas.set(conn_key, schema)
+        return schema
+
+    def warm_up(self, conn, conn_key: ConnectionKey) -> int:
+        """一次性从 information_schema 加载当前数据库所有表的结构，返回加载的表数量"""
+        return len(self.load_schema(conn, conn_key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tables": self.tables.stats(), "table_lists": self.table_lists.stats(), "schemas": self.schemas.stats()}
+
+
+class DatabaseStats:
+    """一个数据库的表统计快照，tables 按数据加索引大小降序排列"""
+
+    __slots__ = ("tables", "table_count", "total_rows", "total_size", "loaded_at", "load_seconds", "stale")
+
+    def __init__(self, tables: "OrderedDict[str, Dict[str, Any]]", load_seconds: float):
+        self.tables = tables
+        self.table_count = len(tables)
+        self.total_rows = sum(table["rows"] for table in tables.values())
+        self.total_size = sum(table["size"] for table in tables.values())
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.stale = False
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.loaded_at
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        return list(self.tables.values())[:n]
+
+    def table(self, name: str) -> Optional[Dict[str, Any]]:
+        """按表名查找（不区分大小写）"""
+        name = normalize_table_name(name)
+        table = self.tables.get(name)
+        if table is None:
+            table = next((t for key, t in self.tables.items() if key.lower() == name.lower()), None)
+        return table
+
+
+class DatabaseStatsCache:
+    """数据库统计缓存
+
+    一条 information_schema.TABLES 查询取得每张表的行数和大小，汇总和排序在本地完成。
+    超过 ttl 的统计仍直接返回，由调用方在后台刷新（同一数据库同时只刷新一次）。
+    """
+
+    TABLES_SQL = """
+        SELECT TABLE_NAME AS `name`, TABLE_TYPE AS `type`, ENGINE AS `engine`, TABLE_ROWS AS `rows`,
+               DATA_LENGTH AS `data_size`, INDEX_LENGTH AS `index_size`, UPDATE_TIME AS `update_time`
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._stats: Dict[ConnectionKey, DatabaseStats] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, conn_key: ConnectionKey) -> Optional[DatabaseStats]:
+        return self._stats.get(conn_key)
+
+    def is_stale(self, stats: DatabaseStats) -> bool:
+        return stats.stale or stats.age > self.ttl
+
+    def mark_stale(self, conn_key: ConnectionKey) -> None:
+        """表结构变化后标记统计过期，下次读取时后台刷新"""
+        stats = self._stats.get(conn_key)
+        if stats is not None:
+            stats.stale = True
+
+    def begin_refresh(self, conn_key: ConnectionKey) -> bool:
+        """开始后台刷新；已有刷新在进行时返回 False"""
+        with self._lock:
+            if conn_key in self._refreshing:
+                return False
+            self._refreshing.add(conn_key)
+            return True
+
+    def end_refresh(self, conn_key: ConnectionKey) -> None:
+        with self._lock:
+            self._refreshing.discard(conn_key)
+
+    def is_refreshing(self, conn_key: ConnectionKey) -> bool:
+        return conn_key in self._refreshing
+
+    def load(self, conn, conn_key: ConnectionKey) -> DatabaseStats:
+        """查询 information_schema 并缓存统计"""
+        start = time.perf_counter()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(self.TABLES_SQL)
+        rows = cursor.fetchall()
+        cursor.close()
+
+        for row in rows:
+            row["rows"] = int(row["rows"] or 0)
+            row["data_size"] = int(row["data_size"] or 0)
+            row["index_size"] = int(row["index_size"] or 0)
+            row["size"] = row["data_size"] + row["index_size"]
+        rows.sort(key=lambda row: row["size"], reverse=True)
+        stats = DatabaseStats(OrderedDict((row["name"], row) for row in rows), time.perf_counter() - start)
+        with self._lock:
+            self._stats[conn_key] = stats
+            self.loads += 1
+        return stats
+
+
+def filter_tables(names: Iterable[str], include: Optional[Iterable[str]] = None,
+                  exclude: Optional[Iterable[str]] = None) -> List[str]:
+    """按通配符（* ? [seq]，不区分大小写）筛选表名"""
+    include = [pattern.lower() for pattern in include or []]
+    exclude = [pattern.lower() for pattern in exclude or []]
+    return [
+        name for name in names
+        if (not include or any(fnmatch.fnmatchcase(name.lower(), p) for p in include))
+        and not any(fnmatch.fnmatchcase(name.lower(), p) for p in exclude)
+    ]
+
+
+# 结果不确定的函数，包含它们的查询不缓存
+_NON_DETERMINISTIC_PATTERN = re.compile(
+    r"\b(?:NOW|RAND|UUID|UUID_SHORT|SYSDATE|CURDATE|CURTIME|CURRENT_DATE|CURRENT_TIME|"
+    r"CURRENT_TIMESTAMP|UNIX_TIMESTAMP|LOCALTIME|LOCALTIMESTAMP|CONNECTION_ID|LAST_INSERT_ID|FOUND_ROWS|SLEEP)\b",
+    re.IGNORECASE,
+)
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# 字符串字面量与其余部分
+_LITERAL_PATTERN = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\")")
+
+
+def normalize_sql(sql: str) -> str:
+    """规范化SQL：合并字符串字面量以外的空白，去掉结尾分号"""
+    parts = _LITERAL_PATTERN.split(sql.strip().rstrip(";").strip())
+    # split带捕获组：偶数下标为非字面量部分
+    return "".join(part if index % 2 else _WHITESPACE_PATTERN.sub(" ", part) for index, part in enumerate(parts))
+
+
+class QueryResultCache:
+    """SELECT查询结果缓存
+
+    键为 (连接标识, 规范化SQL, 渲染参数)，值为渲染后的输出文本。
+    同时按条目数和总字节数做LRU淘汰；写操作按表失效。
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        self.entries = TTLLRUCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self._bytes_saved = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def is_cacheable(sql: str) -> bool:
+        return not _NON_DETERMINISTIC_PATTERN.search(sql)
+
+    @staticmethod
+    def make_key(conn_key: ConnectionKey, sql: str, *options: Hashable) -> Tuple:
+        return (conn_key, normalize_sql(sql)) + options
+
+    def get(self, key: Tuple) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        text, _, size = entry
+        with self._lock:
+            self._bytes_saved += size
+        return text
+
+    def put(self, key: Tuple, text: str, tables: Iterable[str], ttl: Optional[float] = None) -> None:
+        size = len(text.encode("utf-8"))
+        self.entries.set(key, (text, frozenset(tables), size), ttl=ttl, size=size)
+
+    def invalidate_tables(self, conn_key: ConnectionKey, tables: Iterable[str]) -> int:
+        """失效引用了指定表的缓存；未识别出表名时失效该连接的全部缓存"""
+        tables = frozenset(tables)
+        if tables:
+            removed = self.entries.invalidate(
+                lambda key, value: key[0] == conn_key and not value[1].isdisjoint(tables)
+            )
+        else:
+            removed = self.entries.invalidate(lambda key, _: key[0] == conn_key)
+        with self._lock:
+            self._invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.entries.stats()
+        with self._lock:
+            stats["bytes_saved"] = self._bytes_saved
+            stats["invalidations"] = self._invalidations
+        return stats
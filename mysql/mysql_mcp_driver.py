@@ -0,0 +1,61 @@
+"""
+MySQL MCP数据库驱动
+- c_ext: mysql-connector-python 的 C 扩展，行解码在 C 中完成，大结果集明显更快
+- pure: mysql-connector-python 的纯Python实现
+- auto: 有 C 扩展时使用 c_ext，否则退回 pure
+也可以通过 register_driver 注册其他驱动，连接对象需兼容 mysql.connector 的接口
+（cursor(dictionary=/prepared=)、ping、unread_result、in_transaction 等）
+"""
+
+import logging
+from typing import Any, Callable, Dict, List
+
+import mysql.connector
+from mysql.connector.errors import NotSupportedError
+
+logger = logging.getLogger("mysql-mcp-server")
+
+# 驱动名 -> 建立连接的函数，参数为 mysql.connector.connect 的关键字参数
+DriverConnect = Callable[..., Any]
+
+_DRIVERS: Dict[str, DriverConnect] = {}
+
+HAVE_CEXT = bool(getattr(mysql.connector, "HAVE_CEXT", False))
+
+_fallback_warned = False
+
+
+def register_driver(name: str, connect: DriverConnect) -> None:
+    """注册驱动（同名覆盖）"""
+    if name == "auto":
+        raise ValueError("auto 是保留的驱动名")
+    _DRIVERS[name] = connect
+
+
+def available_drivers() -> List[str]:
+    """当前环境可用的驱动名"""
+    return [name for name in _DRIVERS if name != "c_ext" or HAVE_CEXT]
+
+
+def resolve_driver(name: str) -> str:
+    """将配置的驱动名解析为实际使用的驱动，C 扩展不可用时退回 pure"""
+    if name == "auto":
+        return "c_ext" if HAVE_CEXT else "pure"
+    if name == "c_ext" and not HAVE_CEXT:
+        global _fallback_warned
+        if not _fallback_warned:
+            _fallback_warned = True
+            logger.warning("mysql-connector-python 的 C 扩展不可用，已退回纯Python驱动")
+        return "pure"
+    if name not in _DRIVERS:
+        raise NotSupportedError(msg=f"未知的数据库驱动: {name}，可选: auto, {', '.join(_DRIVERS)}")
+    return name
+
+
+def connect(driver: str, **kwargs) -> Any:
+    """使用指定驱动建立连接"""
+    return _DRIVERS[resolve_driver(driver)](**kwargs)
+
+
+register_driver("c_ext", lambda **kwargs: mysql.connector.connect(use_pure=False, **kwargs))
+register_driver("pure", lambda **kwargs: mysql.connector.connect(use_pure=True, **kwargs))
@@ -0,0 +1,187 @@
+"""
+MySQL MCP结果导出
+将查询结果按批写入本地文件（CSV / JSON Lines / Parquet / Arrow IPC），内存占用只与批大小有关
+"""
+
+import os
+import csv
+import json
+from typing import Any, List, Optional, Sequence
+
+from mysql.connector.constants import FieldType
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet", "arrow")
+
+# 需要 pyarrow 的格式
+ARROW_FORMATS = ("parquet", "arrow")
+
+FILE_EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet", "arrow": ".arrow"}
+
+# 写入导出文件时可能出现的错误（值与列类型不符时 pyarrow 抛出 ArrowException）
+WRITE_ERRORS = (ValueError, TypeError, OSError) + ((pa.ArrowException,) if pa is not None else ())
+
+_INTEGER_TYPES = frozenset({
+    FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG, FieldType.LONGLONG,
+    FieldType.YEAR, FieldType.BIT,
+})
+
+
+def available_formats() -> List[str]:
+    """当前环境可用的导出格式"""
+    return [fmt for fmt in EXPORT_FORMATS if pa is not None or fmt not in ARROW_FORMATS]
+
+
+def _text_value(value: Any) -> Any:
+    """二进制内容能按UTF-8解码时输出文本，否则输出十六进制"""
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            return value.decode("utf-8")
+        except UnicodeDecodeError:
+            return "0x" + value.hex()
+    return value
+
+
+def _string_value(value: Any) -> Optional[str]:
+    """Arrow 字符串列的值：DECIMAL 等无法确定类型的列也按文本写入"""
+    if value is None or isinstance(value, str):
+        return value
+    return str(_text_value(value))
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(_text_value(value))
+
+
+class _CSVWriter:
+    def __init__(self, path: str, columns: Sequence[str], buffer_bytes: int):
+        self._file = open(path, "w", newline="", encoding="utf-8", buffering=buffer_bytes)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write_batch(self, rows: List[Sequence[Any]]) -> None:
+        self._writer.writerows([_text_value(v) for v in row] for row in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _JSONLinesWriter:
+    def __init__(self, path: str, columns: Sequence[str], buffer_bytes: int):
+        self._file = open(path, "w", encoding="utf-8", buffering=buffer_bytes)
+        self._columns = list(columns)
+
+    def write_batch(self, rows: List[Sequence[Any]]) -> None:
+        columns = self._columns
+        self._file.write("".join(
+            json.dumps({col: _json_value(v) for col, v in zip(columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        ))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _arrow_type(column: Sequence[Any]):
+    """由 cursor.description 的一项确定 Arrow 列类型；无法确定的类型按字符串处理"""
+    type_code = column[1]
+    if type_code in _INTEGER_TYPES:
+        flags = column[7] if len(column) > 7 and column[7] else 0
+        if type_code == FieldType.LONGLONG and flags & 32:
+            # UNSIGNED BIGINT 超出 int64 范围
+            return pa.uint64()
+        return pa.int64()
+    if type_code in (FieldType.FLOAT, FieldType.DOUBLE):
+        return pa.float64()
+    if type_code in (FieldType.DECIMAL, FieldType.NEWDECIMAL):
+        precision, scale = column[4], column[5]
+        if precision is None or scale is None:
+            return pa.string()
+        # 按列定义的精度建类型，不随批次中实际出现的位数变化
+        return pa.decimal128(38, scale) if precision <= 38 else pa.decimal256(76, scale)
+    if type_code in (FieldType.DATE, FieldType.NEWDATE):
+        return pa.date32()
+    if type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+        return pa.timestamp("us")
+    if type_code == FieldType.TIME:
+        return pa.duration("us")
+    return pa.string()
+
+
+class _ArrowWriter:
+    """Parquet / Arrow IPC：按 cursor.description 的字段类型确定表结构，没有时全部按字符串处理"""
+
+    def __init__(self, path: str, columns: Sequence[str], fmt: str,
+                 description: Optional[Sequence[Sequence[Any]]] = None):
+        self._path = path
+        self._columns = list(columns)
+        self._fmt = fmt
+        types = [_arrow_type(column) for column in description] if description else [pa.string()] * len(self._columns)
+        self._schema = pa.schema([pa.field(col, arrow_type) for col, arrow_type in zip(self._columns, types)])
+        # 字符串列中的值先转为文本
+        self._text_columns = [pa.types.is_string(arrow_type) for arrow_type in types]
+        self._writer = None
+
+    def _to_batch(self, rows: List[Sequence[Any]]):
+        data = {
+            col: [_string_value(row[i]) for row in rows] if text else [row[i] for row in rows]
+            for i, (col, text) in enumerate(zip(self._columns, self._text_columns))
+        }
+        return pa.RecordBatch.from_pydict(data, schema=self._schema)
+
+    def _open(self) -> None:
+        if self._fmt == "parquet":
+            self._writer = pq.ParquetWriter(self._path, self._schema)
+        else:
+            self._writer = pa_ipc.new_file(self._path, self._schema)
+
+    def write_batch(self, rows: List[Sequence[Any]]) -> None:
+        batch = self._to_batch(rows)
+        if self._writer is None:
+            self._open()
+        if self._fmt == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        if self._writer is None:
+            # 空结果：只写表结构
+            self._open()
+        self._writer.close()
+
+
+def open_writer(path: str, columns: Sequence[str], fmt: str, buffer_bytes: int = 1024 * 1024,
+                description: Optional[Sequence[Sequence[Any]]] = None):
+    """按格式创建批量写入器，提供 write_batch(rows) 和 close()
+
+    description 为 cursor.description，Parquet / Arrow 据此确定各列类型。
+    """
+    if fmt == "csv":
+        return _CSVWriter(path, columns, buffer_bytes)
+    if fmt == "jsonl":
+        return _JSONLinesWriter(path, columns, buffer_bytes)
+    if fmt in ARROW_FORMATS:
+        if pa is None:
+            raise ValueError(f"{fmt} 格式需要安装 pyarrow")
+        return _ArrowWriter(path, columns, fmt, description)
+    raise ValueError(f"不支持的导出格式: {fmt}，可选: {', '.join(available_formats())}")
+
+
+def resolve_export_path(export_dir: str, path: Optional[str], fmt: str, default_name: str) -> str:
+    """导出文件路径，限制在 export_dir 目录下"""
+    base = os.path.realpath(export_dir)
+    name = path or default_name + FILE_EXTENSIONS[fmt]
+    target = os.path.realpath(os.path.join(base, name))
+    if os.path.commonpath([base, target]) != base:
+        raise ValueError(f"导出路径必须位于导出目录内: {base}")
+    return target
+
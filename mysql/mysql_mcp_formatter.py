@@ -0,0 +1,249 @@
+"""
+MySQL MCP结果渲染
+一次遍历、列表拼接的结果格式化，支持多种输出格式和字节预算。
+每个结果集按 cursor.description 的字段类型为每一列编译一次转换函数，逐行只按列下标调用，
+不再对每个单元格判断类型；二进制列输出十六进制预览和总字节数。
+"""
+
+import json
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence
+
+from mysql.connector.constants import FieldType
+
+# 支持的输出格式
+OUTPUT_FORMATS = ("table", "tsv", "jsonl", "json")
+
+TRUNCATED_MARK = "…"
+
+# 二进制单元格默认预览的字节数
+BLOB_PREVIEW_BYTES = 32
+
+# 转换结果不会超过单元格字节上限的类型，这些列跳过截断检查
+_NUMERIC_TYPES = frozenset({
+    FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG, FieldType.INT24,
+    FieldType.YEAR, FieldType.FLOAT, FieldType.DOUBLE, FieldType.BIT,
+})
+_STRING_VALUE_TYPES = frozenset({
+    FieldType.DECIMAL, FieldType.NEWDECIMAL,
+    FieldType.DATE, FieldType.NEWDATE, FieldType.TIME, FieldType.DATETIME, FieldType.TIMESTAMP,
+})
+
+
+class ResultSet:
+    """查询结果：列名、cursor.description（没有时为 None）和按列顺序排列的行"""
+
+    __slots__ = ("columns", "description", "rows")
+
+    def __init__(self, columns: Sequence[str], description: Optional[Sequence[Sequence[Any]]],
+                 rows: List[Sequence[Any]]):
+        self.columns = list(columns)
+        self.description = description
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class RenderResult(NamedTuple):
+    """渲染结果"""
+    text: str
+    rows_rendered: int
+    cells_truncated: int
+    output_truncated: bool
+
+
+def truncate_cell(value: str, max_bytes: int) -> str:
+    """按UTF-8字节数截断单元格内容"""
+    # 每个字符最多4字节，足够短的字符串无需编码即可判断
+    if max_bytes <= 0 or len(value) * 4 <= max_bytes:
+        return value
+    encoded = value.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return value
+    return (encoded[:max_bytes].decode("utf-8", "ignore")
+            + f"{TRUNCATED_MARK}(共{len(encoded)}字节)")
+
+
+def blob_preview(value: bytes, preview_bytes: int = BLOB_PREVIEW_BYTES) -> str:
+    """二进制值的十六进制预览：0x 加前 preview_bytes 个字节，超出时注明总字节数；0 表示只显示字节数"""
+    size = len(value)
+    if preview_bytes <= 0:
+        return f"(二进制数据，共{size}字节)"
+    if size <= preview_bytes:
+        return "0x" + value.hex()
+    return "0x" + value[:preview_bytes].hex() + f"{TRUNCATED_MARK}(共{size}字节)"
+
+
+def _text_converter(type_code: Optional[int], preview_bytes: int) -> Callable[[Any], str]:
+    """文本格式（table / tsv）的单元格转换函数；NULL 与原来一样显示为 None"""
+    if type_code in _NUMERIC_TYPES or type_code in _STRING_VALUE_TYPES:
+        return str
+
+    # 字符串、BLOB、JSON 等列：驱动可能返回 str 或 bytes / bytearray（二进制字符集）
+    def convert(value: Any) -> str:
+        if type(value) is str:
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return blob_preview(value, preview_bytes)
+        return str(value)
+    return convert
+
+
+def _json_converter(type_code: Optional[int], preview_bytes: int) -> Callable[[Any], Any]:
+    """JSON格式（jsonl / json）的单元格转换函数：数值原样输出，DECIMAL 和时间类型输出字符串"""
+    if type_code in _NUMERIC_TYPES:
+        return _number
+    if type_code in _STRING_VALUE_TYPES:
+        return _str_or_none
+
+    def convert(value: Any) -> Any:
+        if value is None or type(value) is str or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return blob_preview(value, preview_bytes)
+        return str(value)
+    return convert
+
+
+def _number(value: Any) -> Any:
+    # 类型码由驱动推断时（如 memory 驱动）同一列也可能出现其他类型的值
+    return value if value is None or type(value) in (int, float) else str(value)
+
+
+def _str_or_none(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def compile_converters(columns: Sequence[str], description: Optional[Sequence[Sequence[Any]]],
+                       json_values: bool, preview_bytes: int = BLOB_PREVIEW_BYTES):
+    """按列的字段类型生成转换函数，返回 (转换函数列表, 需要检查截断的列下标)
+
+    没有 description 时每列按值的类型逐个转换。
+    """
+    type_codes = [column[1] for column in description] if description else [None] * len(columns)
+    make = _json_converter if json_values else _text_converter
+    converters = [make(type_code, preview_bytes) for type_code in type_codes]
+    long_columns = [index for index, type_code in enumerate(type_codes)
+                    if type_code not in _NUMERIC_TYPES and type_code not in _STRING_VALUE_TYPES]
+    return converters, long_columns
+
+
+def _truncate_values(values: List[Any], long_columns: Sequence[int], max_cell_bytes: int) -> int:
+    """就地截断超长的字符串单元格，返回被截断的单元格数"""
+    cut = 0
+    limit = max_cell_bytes // 4
+    for index in long_columns:
+        value = values[index]
+        # 每个字符最多4字节，足够短的字符串无需编码即可判断
+        if type(value) is str and len(value) > limit:
+            truncated = truncate_cell(value, max_cell_bytes)
+            if truncated is not value:
+                values[index] = truncated
+                cut += 1
+    return cut
+
+
+def _utf8_size(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def render_rows(columns: Sequence[str],
+                rows: Iterable[Sequence[Any]],
+                fmt: str = "table",
+                max_cell_bytes: int = 0,
+                max_total_bytes: int = 0,
+                description: Optional[Sequence[Sequence[Any]]] = None,
+                blob_preview_bytes: int = BLOB_PREVIEW_BYTES) -> RenderResult:
+    """渲染结果集
+
+    Args:
+        columns: 列名
+        rows: 按列顺序排列的行（元组或列表）
+        fmt: 输出格式，table / tsv / jsonl / json（紧凑列式JSON）
+        max_cell_bytes: 单元格最大字节数，0表示不限制
+        max_total_bytes: 输出总字节数上限，0表示不限制；超出后停止渲染后续行
+        description: cursor.description，用于按字段类型选择每列的转换函数
+        blob_preview_bytes: 二进制单元格十六进制预览的字节数，0表示只显示字节数
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"不支持的输出格式: {fmt}，可选: {', '.join(OUTPUT_FORMATS)}")
+    converters, long_columns = compile_converters(columns, description, fmt in ("jsonl", "json"),
+                                                  blob_preview_bytes)
+    if not max_cell_bytes:
+        long_columns = []
+    if fmt == "json":
+        return _render_columnar(columns, rows, converters, long_columns, max_cell_bytes, max_total_bytes)
+
+    lines: List[str] = []
+    if fmt == "table":
+        header = " | ".join(columns)
+        lines.append(header)
+        lines.append("-" * len(header))
+    elif fmt == "tsv":
+        lines.append("\t".join(columns))
+
+    budget = max_total_bytes
+    used = sum(_utf8_size(line) + 1 for line in lines)
+    rendered = 0
+    cells_truncated = 0
+    output_truncated = False
+
+    for row in rows:
+        values = [convert(value) for convert, value in zip(converters, row)]
+        if long_columns:
+            cells_truncated += _truncate_values(values, long_columns, max_cell_bytes)
+
+        if fmt == "jsonl":
+            line = json.dumps(dict(zip(columns, values)), ensure_ascii=False)
+        elif fmt == "tsv":
+            line = "\t".join(
+                "\\N" if v is None else
+                t.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+                for v, t in zip(row, values)
+            )
+        else:
+            line = " | ".join(values)
+
+        if budget:
+            size = _utf8_size(line) + 1
+            if used + size > budget:
+                output_truncated = True
+                break
+            used += size
+        lines.append(line)
+        rendered += 1
+
+    return RenderResult("\n".join(lines) + "\n", rendered, cells_truncated, output_truncated)
+
+
+def _render_columnar(columns: Sequence[str],
+                     rows: Iterable[Sequence[Any]],
+                     converters: Sequence[Callable[[Any], Any]],
+                     long_columns: Sequence[int],
+                     max_cell_bytes: int,
+                     max_total_bytes: int) -> RenderResult:
+    """紧凑列式JSON：{"columns": [...], "data": [[第1列...], [第2列...]]}"""
+    data: List[List[Any]] = [[] for _ in columns]
+    # 预算按单元格文本长度估算，最终只做一次序列化
+    used = sum(len(c) + 3 for c in columns)
+    rendered = 0
+    cells_truncated = 0
+    output_truncated = False
+
+    for row in rows:
+        values = [convert(value) for convert, value in zip(converters, row)]
+        if long_columns:
+            cells_truncated += _truncate_values(values, long_columns, max_cell_bytes)
+        if max_total_bytes:
+            size = sum(len(v) + 3 if isinstance(v, str) else 8 for v in values)
+            if used + size > max_total_bytes:
+                output_truncated = True
+                break
+            used += size
+        for column_data, value in zip(data, values):
+            column_data.append(value)
+        rendered += 1
+
+    text = json.dumps({"columns": list(columns), "data": data},
+                      ensure_ascii=False, separators=(",", ":"))
+    return RenderResult(text + "\n", rendered, cells_truncated, output_truncated)
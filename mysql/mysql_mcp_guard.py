@@ -0,0 +1,146 @@
+"""
+MySQL MCP查询代价检查
+执行SELECT前先 EXPLAIN FORMAT=JSON 估算扫描行数，超过阈值时按模式处理：
+- reject: 拒绝执行
+- limit: 客户端读够 max_rows 行后停止读取，并 KILL QUERY 终止服务器端仍在执行的查询
+  （不改写SQL：包一层派生表会使重名列报错 1060，且 GROUP BY / ORDER BY 照样先物化全部结果）；
+  事务中的连接不能终止查询，只能读完剩余结果，此时按 reject 处理
+- hint: 加 MAX_EXECUTION_TIME 优化器提示，由服务器在超时后中止查询
+执行计划的估算结果按查询形状（字面量替换为 ?）缓存
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from mysql_mcp_cache import ConnectionKey, TTLLRUCache
+from mysql_mcp_metrics import phase
+from mysql_mcp_sql import add_optimizer_hint, query_shape
+
+GUARD_MODES = ("off", "reject", "limit", "hint")
+
+
+class CostEstimate:
+    """EXPLAIN 估算的扫描行数和优化器代价"""
+
+    __slots__ = ("rows", "cost", "cached")
+
+    def __init__(self, rows: float, cost: Optional[float], cached: bool = False):
+        self.rows = rows
+        self.cost = cost
+        self.cached = cached
+
+
+def estimate_rows_examined(plan: Any) -> float:
+    """由 EXPLAIN FORMAT=JSON 的执行计划估算扫描行数
+
+    嵌套循环中每张表的扫描行数乘以此前各表连接后的行数（rows_produced_per_join），
+    子查询、派生表等各部分相加。
+    """
+    if isinstance(plan, list):
+        return sum(estimate_rows_examined(item) for item in plan)
+    if not isinstance(plan, dict):
+        return 0.0
+    total = 0.0
+    for key, value in plan.items():
+        if key == "nested_loop" and isinstance(value, list):
+            prefix = 1.0
+            for item in value:
+                table = item.get("table", {}) if isinstance(item, dict) else {}
+                total += prefix * float(table.get("rows_examined_per_scan", 0))
+                prefix = float(table.get("rows_produced_per_join", prefix)) or 1.0
+                total += estimate_rows_examined({k: v for k, v in table.items() if isinstance(v, (dict, list))})
+        elif key == "table" and isinstance(value, dict):
+            total += float(value.get("rows_examined_per_scan", 0))
+            total += estimate_rows_examined({k: v for k, v in value.items() if isinstance(v, (dict, list))})
+        else:
+            total += estimate_rows_examined(value)
+    return total
+
+
+def _query_cost(plan: Dict[str, Any]) -> Optional[float]:
+    try:
+        return float(plan["query_block"]["cost_info"]["query_cost"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class QueryCostGuard:
+    """查询代价检查"""
+
+    def __init__(self,
+                 mode: str = "off",
+                 max_rows: int = 1000000,
+                 max_execution_ms: int = 10000,
+                 cache_size: int = 512,
+                 cache_ttl: float = 300.0):
+        if mode not in GUARD_MODES:
+            raise ValueError(f"不支持的代价检查模式: {mode}，可选: {', '.join(GUARD_MODES)}")
+        self.mode = mode
+        self.max_rows = max_rows
+        self.max_execution_ms = max_execution_ms
+        self.plans = TTLLRUCache(max_entries=cache_size, ttl=cache_ttl)
+        self.rejected = 0
+        self.rewritten = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def capped(self, notice: Optional[str]) -> bool:
+        """apply 的结果是否要求在客户端限制读取行数"""
+        return self.mode == "limit" and notice is not None
+
+    def estimate(self, conn, conn_key: ConnectionKey, sql: str,
+                 params: Optional[List[Any]] = None) -> CostEstimate:
+        """估算查询代价，同一查询形状使用缓存的估算结果"""
+        key = (conn_key, query_shape(sql))
+        cached = self.plans.get(key)
+        if cached is not None:
+            return CostEstimate(cached.rows, cached.cost, cached=True)
+        with phase("guard"):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", tuple(params) if params is not None else None)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        plan = json.loads(rows[0][0]) if rows else {}
+        estimate = CostEstimate(estimate_rows_examined(plan), _query_cost(plan))
+        self.plans.set(key, estimate)
+        return estimate
+
+    def apply(self, sql: str, estimate: CostEstimate, max_rows: int, in_transaction: bool = False):
+        """按模式处理超过阈值的查询，返回 (要执行的SQL, 说明)；拒绝时SQL为 None
+
+        limit 模式不改写SQL，由调用方在读够 max_rows 行后终止查询（capped 为真）。
+        in_transaction=True 时 limit 模式拒绝执行：事务中的连接要读完剩余结果，无法提前终止查询。
+        """
+        if estimate.rows <= self.max_rows:
+            return sql, None
+        rows = f"预计扫描 {estimate.rows:,.0f} 行，超过上限 {self.max_rows:,} 行"
+        if self.mode == "reject":
+            self.rejected += 1
+            return None, rows
+        if self.mode == "limit" and in_transaction:
+            self.rejected += 1
+            return None, f"{rows}，事务中无法在读够行数后终止查询"
+        if self.mode == "limit":
+            self.rewritten += 1
+            return sql, f"{rows}，已在客户端限制为 {max_rows} 行，读够后终止服务器端查询"
+        hinted = add_optimizer_hint(sql, f"MAX_EXECUTION_TIME({int(self.max_execution_ms)})")
+        if hinted is None:
+            return sql, None
+        self.rewritten += 1
+        return hinted, f"{rows}，已设置执行时间上限 {self.max_execution_ms} ms"
+
+    def invalidate(self, conn_key: ConnectionKey) -> None:
+        """表结构变化（如新增索引）后丢弃该连接的执行计划估算"""
+        self.plans.invalidate(lambda key, _: key[0] == conn_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "plans": self.plans.stats(),
+            "rejected": self.rejected,
+            "rewritten": self.rewritten,
+        }
@@ -0,0 +1,1099 @@
+"""
+MySQL MCP内存后端
+基于 sqlite3 的进程内数据库，连接对象兼容 mysql.connector 的接口，以驱动名 memory 注册。
+连接池、缓存、分页、事务、结果格式化和各工具处理函数都走与真实数据库相同的代码路径，
+可以离线在接近生产的数据量下压测。
+
+- 同一数据库名的连接共享一个内存数据库（sqlite 共享缓存），进程退出前数据一直保留
+- 数据库首次打开时生成合成数据表：默认为 demo.py 的演示表，每张表的行数可配置（可到百万行）
+- MySQL 兼容：%s 占位符、反斜杠转义和双引号字符串、@@系统变量、VERSION() / DATABASE() / NOW() / SLEEP() 等函数、
+  SHOW TABLES / DESCRIBE / SHOW INDEX、information_schema 的表结构视图、EXPLAIN（含 FORMAT=JSON 的扫描行数估算）、
+  START TRANSACTION [READ ONLY]、KILL QUERY、MAX_EXECUTION_TIME 提示、CREATE TABLE 的常用 MySQL 写法；
+  错误转换为对应错误码的 mysql.connector 异常
+- 读不加锁（相当于 READ UNCOMMITTED），写冲突时等待 LOCK_WAIT_TIMEOUT 秒后报 1205
+
+sqlite 不支持的语法（存储过程、ALTER TABLE ADD INDEX 等）按语法错误 1064 返回。
+"""
+
+import re
+import json
+import time
+import sqlite3
+import itertools
+import threading
+import weakref
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from mysql.connector import errors
+from mysql.connector.constants import FieldType
+
+from demo import MySQLMCPDemo
+from mysql_mcp_sql import DDL_KINDS, MAX_CACHED_SQL_LENGTH, classify, split_script
+
+VERSION = f"8.0.35-memory-sqlite{sqlite3.sqlite_version}"
+
+# 未指定表时每张演示表生成的行数
+DEFAULT_ROWS = 10000
+
+# 生成数据时每批插入的行数
+SEED_BATCH_SIZE = 10000
+
+# 写冲突时等待表锁的最长时间（秒），对应 innodb_lock_wait_timeout
+LOCK_WAIT_TIMEOUT = 5.0
+
+# @@变量的取值（只读）
+SYSTEM_VARIABLES = {
+    "version": VERSION,
+    "version_comment": "mysql_mcp_memory",
+    "sql_mode": "STRICT_TRANS_TABLES,NO_ENGINE_SUBSTITUTION",
+    "character_set_connection": "utf8mb4",
+    "collation_connection": "utf8mb4_general_ci",
+    "time_zone": "SYSTEM",
+    "system_time_zone": time.tzname[0],
+    "autocommit": 0,
+    "transaction_isolation": "READ-UNCOMMITTED",
+    "innodb_lock_wait_timeout": int(LOCK_WAIT_TIMEOUT),
+    "max_execution_time": 0,
+}
+
+
+# ---------------------------------------------------------------------------
+# 类型转换：DECIMAL / DATETIME / DATE 列按声明类型还原为与 mysql.connector 相同的 Python 类型
+# （sqlite3 的转换器和适配器是进程内全局注册的）
+# ---------------------------------------------------------------------------
+
+def _convert_decimal(value: bytes) -> Any:
+    try:
+        return Decimal(value.decode())
+    except InvalidOperation:
+        return value.decode()
+
+
+def _convert_datetime(value: bytes) -> Any:
+    try:
+        return datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+def _convert_date(value: bytes) -> Any:
+    try:
+        return date.fromisoformat(value.decode()[:10])
+    except ValueError:
+        return value.decode()
+
+
+for _name in ("DECIMAL", "NUMERIC"):
+    sqlite3.register_converter(_name, _convert_decimal)
+for _name in ("DATETIME", "TIMESTAMP"):
+    sqlite3.register_converter(_name, _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+
+def field_type(value: Any) -> int:
+    """按值的 Python 类型推断 cursor.description 中的字段类型码"""
+    if isinstance(value, bool) or isinstance(value, int):
+        return FieldType.LONGLONG
+    if isinstance(value, float):
+        return FieldType.DOUBLE
+    if isinstance(value, Decimal):
+        return FieldType.NEWDECIMAL
+    if isinstance(value, datetime):
+        return FieldType.DATETIME
+    if isinstance(value, date):
+        return FieldType.DATE
+    if isinstance(value, (bytes, bytearray)):
+        return FieldType.BLOB
+    if value is None:
+        return FieldType.NULL
+    return FieldType.VAR_STRING
+
+
+# ---------------------------------------------------------------------------
+# SQL 改写
+# ---------------------------------------------------------------------------
+
+_REWRITE_PATTERN = re.compile(r"""
+    (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")
+  | (?P<identifier>`(?:[^`]|``)*`)
+  | (?P<comment>--[^\n]*|\#[^\n]*|/\*.*?\*/)
+  | (?P<named>%\(\w+\)s)
+  | (?P<param>%s)
+  | (?P<percent>%%)
+  | (?P<variable>@@[\w.]+)
+""", re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {"0": "\0", "n": "\n", "r": "\r", "t": "\t", "b": "\b", "Z": "\x1a"}
+
+
+def _sql_literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _sqlite_string(token: str) -> str:
+    """MySQL 字符串字面量（单引号或双引号，反斜杠转义）改写为 sqlite 的单引号字符串"""
+    quote_char = token[0]
+    body = token[1:-1].replace(quote_char * 2, quote_char)
+    if "\\" in body:
+        body = re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), body, flags=re.DOTALL)
+    return _sql_literal(body)
+
+
+def _translate(sql: str, with_params: bool) -> str:
+    """改写字符串、# 注释、占位符和 @@变量；没有参数时 % 原样保留（与 mysql.connector 相同）"""
+    if len(sql) > MAX_CACHED_SQL_LENGTH:
+        return _rewrite(sql, with_params)
+    return _rewrite_cached(sql, with_params)
+
+
+def _rewrite(sql: str, with_params: bool) -> str:
+    def replace(match):
+        text = match.group()
+        group = match.lastgroup
+        if group == "string":
+            return _sqlite_string(text)
+        if group == "comment" and text.startswith("#"):
+            return "--" + text[1:]
+        if group == "variable":
+            return _sql_literal(SYSTEM_VARIABLES.get(text[2:].split(".")[-1].lower()))
+        if with_params:
+            if group == "param":
+                return "?"
+            if group == "named":
+                return ":" + text[2:-2]
+            if group == "percent":
+                return "%"
+        return text
+    return _REWRITE_PATTERN.sub(replace, sql)
+
+
+_rewrite_cached = lru_cache(maxsize=1024)(_rewrite)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unquote(name: str) -> str:
+    """`db`.`table` -> table"""
+    return name.strip().rstrip(";").split(".")[-1].strip("`\"")
+
+
+_INSERT_IGNORE = re.compile(r"^(\s*)INSERT\s+IGNORE\b", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", re.IGNORECASE | re.DOTALL)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\s*\(\s*(`?\w+`?)\s*\)", re.IGNORECASE)
+_AUTO_INCREMENT_COLUMN = re.compile(
+    r"((?:`[^`]+`|\w+)\s+)((?:TINY|SMALL|MEDIUM|BIG)?INT(?:EGER)?\s*(?:\(\s*\d+\s*\))?(?:\s+UNSIGNED)?)"
+    r"(?=[^,]*\bAUTO_INCREMENT\b)", re.IGNORECASE)
+_ENUM_COLUMN = re.compile(r"((?:`[^`]+`|\w+)\s+)((?:ENUM|SET)\s*\((?:'(?:[^']|'')*'|\"[^\"]*\"|[^)'\"])*\))", re.IGNORECASE)
+_INLINE_INDEX = re.compile(r",\s*(UNIQUE\s+)?(?:KEY|INDEX)\s+(`[^`]+`|\w+)?\s*\(([^)]*)\)", re.IGNORECASE)
+_MYSQL_ONLY_CLAUSES = re.compile(
+    r"\bAUTO_INCREMENT\b(?:\s*=\s*\d+)?|\bON\s+UPDATE\s+CURRENT_TIMESTAMP(?:\(\))?"
+    r"|\bENGINE\s*=\s*\w+|\b(?:DEFAULT\s+)?(?:CHARSET|CHARACTER\s+SET)\s*=?\s*\w+|\bCOLLATE\s*=?\s*\w+"
+    r"|\bCOMMENT\s*=?\s*'(?:[^']|'')*'|\bROW_FORMAT\s*=\s*\w+", re.IGNORECASE)
+_CREATE_INDEX = re.compile(r"^(\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+)(`[^`]+`|\w+)(\s+ON\s+)(`[^`]+`|\w+)", re.IGNORECASE)
+_DROP_INDEX = re.compile(r"^\s*DROP\s+INDEX\s+(`[^`]+`|\w+)\s+ON\s+(`[^`]+`|[\w.]+)", re.IGNORECASE)
+_TRUNCATE = re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?(`[^`]+`|[\w.]+)", re.IGNORECASE)
+
+_SHOW_TABLES = re.compile(r"\s*SHOW\s+(?:FULL\s+)?TABLES\b(?:\s+LIKE\s+'((?:[^']|'')*)')?", re.IGNORECASE)
+_SHOW_INDEX = re.compile(r"\s*SHOW\s+(?:INDEX|INDEXES|KEYS)\s+(?:FROM|IN)\s+(\S+)", re.IGNORECASE)
+_SHOW_COLUMNS = re.compile(
+    r"\s*(?:(?:DESCRIBE|DESC|EXPLAIN)\s+|SHOW\s+(?:FULL\s+)?(?:COLUMNS|FIELDS)\s+(?:FROM|IN)\s+)(\S+)", re.IGNORECASE)
+_SHOW_VARIABLES = re.compile(r"\s*SHOW\s+(?:SESSION\s+|GLOBAL\s+)?VARIABLES\b(?:\s+LIKE\s+'((?:[^']|'')*)')?", re.IGNORECASE)
+_EXPLAIN = re.compile(
+    r"\s*EXPLAIN\s+(?:FORMAT\s*=\s*(\w+)\s+)?(?:ANALYZE\s+)?(?=\(|(?:SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE|TABLE)\b)",
+    re.IGNORECASE)
+_START_TRANSACTION = re.compile(r"\s*(?:START\s+TRANSACTION|BEGIN)\b(.*)", re.IGNORECASE | re.DOTALL)
+_PLAIN_ROLLBACK = re.compile(r"\s*ROLLBACK(?:\s+WORK)?\s*;?\s*$", re.IGNORECASE)
+_KILL = re.compile(r"\s*KILL\s+(QUERY\s+|CONNECTION\s+)?(\d+)", re.IGNORECASE)
+_MAX_EXECUTION_TIME = re.compile(r"/\*\+[^*]*\bMAX_EXECUTION_TIME\s*\(\s*(\d+)\s*\)", re.IGNORECASE)
+_INFORMATION_SCHEMA = re.compile(r"\binformation_schema\s*\.\s*`?(\w+)", re.IGNORECASE)
+_TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(`[^`]+`|[\w.]+)(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|USING|GROUP|ORDER|"
+                          r"LIMIT|LEFT|RIGHT|INNER|CROSS|STRAIGHT_JOIN|NATURAL|UNION|HAVING|WINDOW|FOR)\b)(`[^`]+`|\w+))?",
+                          re.IGNORECASE)
+_PLAN_STEP = re.compile(
+    r"^(SCAN|SEARCH)\s+(?:TABLE\s+)?(\S+)(?:\s+AS\s+\S+)?"
+    r"(?:\s+USING\s+(INTEGER PRIMARY KEY|PRIMARY KEY|(?:COVERING\s+)?INDEX\s+(\S+)))?(?:\s+\((.*)\))?")
+
+
+# ---------------------------------------------------------------------------
+# 错误转换
+# ---------------------------------------------------------------------------
+
+def _mysql_error(error: sqlite3.Error, timed_out: bool = False) -> errors.Error:
+    """sqlite3 异常转换为带 MySQL 错误码的 mysql.connector 异常"""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        if message.startswith("NOT NULL"):
+            return errors.IntegrityError(msg=message, errno=1048, sqlstate="23000")
+        if message.startswith("FOREIGN KEY"):
+            return errors.IntegrityError(msg=message, errno=1452, sqlstate="23000")
+        if message.startswith("CHECK"):
+            return errors.IntegrityError(msg=message, errno=3819, sqlstate="HY000")
+        return errors.IntegrityError(msg=message, errno=1062, sqlstate="23000")
+    if message == "interrupted":
+        if timed_out:
+            return errors.DatabaseError(msg="Query execution was interrupted, maximum statement execution time exceeded",
+                                        errno=3024, sqlstate="HY000")
+        return errors.DatabaseError(msg="Query execution was interrupted", errno=1317, sqlstate="70100")
+    if "locked" in message:
+        return errors.DatabaseError(msg="Lock wait timeout exceeded; try restarting transaction",
+                                    errno=1205, sqlstate="HY000")
+    if message.startswith("no such table"):
+        return errors.ProgrammingError(msg=message, errno=1146, sqlstate="42S02")
+    if message.startswith("no such column"):
+        return errors.ProgrammingError(msg=message, errno=1054, sqlstate="42S22")
+    if message.startswith("duplicate column name"):
+        return errors.ProgrammingError(msg=message, errno=1060, sqlstate="42S21")
+    if "already exists" in message:
+        return errors.ProgrammingError(msg=message, errno=1050, sqlstate="42S01")
+    if "readonly" in message:
+        return errors.DatabaseError(msg="Cannot execute statement in a READ ONLY transaction.",
+                                    errno=1792, sqlstate="25006")
+    if "syntax error" in message or "incomplete input" in message or "unrecognized token" in message:
+        return errors.ProgrammingError(msg=f"You have an error in your SQL syntax: {message}",
+                                       errno=1064, sqlstate="42000")
+    return errors.DatabaseError(msg=message, errno=1105, sqlstate="HY000")
+
+
+def _lost_connection() -> errors.Error:
+    return errors.OperationalError(msg="Lost connection to MySQL server during query", errno=2013, sqlstate="HY000")
+
+
+# ---------------------------------------------------------------------------
+# 合成数据
+# ---------------------------------------------------------------------------
+
+def _seed_columns(table: str) -> List[Dict[str, Any]]:
+    return MySQLMCPDemo.SAMPLE_COLUMNS.get(table, MySQLMCPDemo.DEFAULT_COLUMNS)
+
+
+def _referenced_table(table: str, column: str, row_counts: Dict[str, int]) -> Optional[str]:
+    """约定：<name>_id 列引用 <name>s 表的主键"""
+    if not column.endswith("_id"):
+        return None
+    reference = column[:-3] + "s"
+    return reference if reference in row_counts and reference != table else None
+
+
+def _primary_key(table: str) -> str:
+    return next((col["Field"] for col in _seed_columns(table) if col["Key"] == "PRI"), "id")
+
+
+def _value_generator(table: str, column: Dict[str, Any], row_counts: Dict[str, int]) -> Callable[[int], Any]:
+    """第 i 行（从1开始）的列值；同样的参数总是生成同样的数据"""
+    name = column["Field"]
+    mysql_type = column["Type"].lower()
+    reference = _referenced_table(table, name, row_counts)
+    if reference is not None:
+        size = row_counts[reference] or 1
+        return lambda i: (i * 7919) % size + 1
+    if column["Key"] == "PRI":
+        return lambda i: i
+    if mysql_type.startswith(("enum", "set")):
+        values = [a or b for a, b in re.findall(r"'([^']*)'|\"([^\"]*)\"", column["Type"])]
+        return lambda i: values[i % len(values)]
+    if re.match(r"(tiny|small|medium|big)?int", mysql_type):
+        return lambda i: (i * 7919) % 1000
+    if mysql_type.startswith(("decimal", "numeric")):
+        match = re.search(r",\s*(\d+)\s*\)", mysql_type)
+        scale = int(match.group(1)) if match else 0
+        return lambda i: Decimal((i * 7919) % 100000).scaleb(-scale)
+    if mysql_type.startswith(("float", "double", "real")):
+        return lambda i: ((i * 7919) % 100000) / 100
+    if mysql_type.startswith(("timestamp", "datetime")):
+        start = datetime(2024, 1, 1)
+        return lambda i: start + timedelta(seconds=i * 37)
+    if mysql_type.startswith("date"):
+        start = date(2024, 1, 1)
+        return lambda i: start + timedelta(days=i % 3650)
+    samples = [row[name] for row in MySQLMCPDemo.SAMPLE_ROWS.get(table, []) if name in row]
+    if column["Key"] == "UNI":
+        if samples and "@" in str(samples[0]):
+            parts = [str(sample).split("@", 1) for sample in samples]
+            return lambda i: "{0}{2}@{1}".format(*parts[i % len(parts)], i)
+        return lambda i: f"{table}-{i}"
+    if samples:
+        return lambda i: samples[i % len(samples)]
+    return lambda i: f"{name}-{i}"
+
+
+class MemoryDatabase:
+    """一个命名的内存数据库
+
+    持有一个连接使共享缓存中的数据一直存在；记录 sqlite 无法声明的 MySQL 列类型（如 ENUM），供 DESCRIBE 使用。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.uri = f"file:mysql_mcp_{quote(name, safe='')}?mode=memory&cache=shared"
+        self.column_types: Dict[Tuple[str, str], str] = {}
+        self.lock = threading.Lock()
+        self._keeper = self.open()
+
+    def open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.uri, uri=True, detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False, cached_statements=256)
+        # 读不加表锁，长事务不阻塞其他连接的查询
+        conn.execute("PRAGMA read_uncommitted = 1")
+        return conn
+
+    def seed(self, tables: Dict[str, int]) -> None:
+        """创建合成数据表：表名 -> 行数；演示表之外的表使用 demo.py 的默认列"""
+        for table, rows in tables.items():
+            columns = _seed_columns(table)
+            self._keeper.execute(self._create_table_sql(table, columns, tables))
+            for column in columns:
+                if column["Key"] in ("UNI", "MUL"):
+                    unique = "UNIQUE " if column["Key"] == "UNI" else ""
+                    self._keeper.execute(f"CREATE {unique}INDEX {_quote(f'{table}__' + column['Field'])} "
+                                         f"ON {_quote(table)} ({_quote(column['Field'])})")
+            generators = [_value_generator(table, column, tables) for column in columns]
+            insert = (f"INSERT INTO {_quote(table)} ({', '.join(_quote(col['Field']) for col in columns)}) "
+                      f"VALUES ({', '.join('?' * len(columns))})")
+            ids = iter(range(1, rows + 1))
+            while True:
+                batch = [tuple(generate(i) for generate in generators) for i in itertools.islice(ids, SEED_BATCH_SIZE)]
+                if not batch:
+                    break
+                self._keeper.executemany(insert, batch)
+            self._keeper.commit()
+
+    def _create_table_sql(self, table: str, columns: Sequence[Dict[str, Any]], row_counts: Dict[str, int]) -> str:
+        definitions = []
+        for column in columns:
+            name, mysql_type = column["Field"], column["Type"]
+            self.column_types[(table, name)] = mysql_type
+            if column["Key"] == "PRI" and "auto_increment" in column["Extra"]:
+                definitions.append(f"{_quote(name)} INTEGER PRIMARY KEY")
+                continue
+            declared = "varchar(64)" if mysql_type.lower().startswith(("enum", "set")) else mysql_type
+            definition = f"{_quote(name)} {declared}"
+            if column["Key"] == "PRI":
+                definition += " PRIMARY KEY"
+            elif column["Null"] == "NO":
+                definition += " NOT NULL"
+            default = column["Default"]
+            if default and default != "NULL":
+                if default.lower().startswith("current_timestamp"):
+                    definition += " DEFAULT CURRENT_TIMESTAMP"
+                else:
+                    definition += f" DEFAULT {_sql_literal(default)}"
+            reference = _referenced_table(table, name, row_counts)
+            if reference is not None:
+                definition += f" REFERENCES {_quote(reference)} ({_quote(_primary_key(reference))})"
+            definitions.append(definition)
+        return f"CREATE TABLE {_quote(table)} ({', '.join(definitions)})"
+
+    def forget(self, table: str) -> None:
+        """表被删除后丢弃记录的列类型"""
+        with self.lock:
+            for key in [key for key in self.column_types if key[0] == table]:
+                del self.column_types[key]
+
+    def close(self) -> None:
+        self._keeper.close()
+
+
+_databases: Dict[str, MemoryDatabase] = {}
+_databases_lock = threading.Lock()
+
+# 连接ID -> 连接，供 KILL 查找
+_connections: "weakref.WeakValueDictionary[int, MemoryConnection]" = weakref.WeakValueDictionary()
+_connection_ids = itertools.count(1)
+
+
+def open_database(name: str, tables: Optional[Dict[str, int]] = None, rows: int = DEFAULT_ROWS) -> MemoryDatabase:
+    """获取内存数据库，首次打开时生成合成数据表
+
+    tables 为 表名 -> 行数；未指定时生成 demo.py 的全部演示表，每张 rows 行。
+    数据库已存在时参数不起作用。
+    """
+    with _databases_lock:
+        database = _databases.get(name)
+        if database is None:
+            database = MemoryDatabase(name)
+            database.seed(tables if tables is not None else {table: rows for table in MySQLMCPDemo.SAMPLE_TABLES})
+            _databases[name] = database
+        return database
+
+
+def drop_database(name: str) -> None:
+    """删除内存数据库（已打开的连接仍可使用，最后一个连接关闭后数据释放）"""
+    with _databases_lock:
+        database = _databases.pop(name, None)
+    if database is not None:
+        database.close()
+
+
+def connect(database: str = "", user: str = "root", host: str = "localhost",
+            tables: Optional[Dict[str, int]] = None, rows: int = DEFAULT_ROWS, **kwargs) -> "MemoryConnection":
+    """驱动入口：接受 mysql.connector.connect 的关键字参数，只使用 database、user 和 host"""
+    return MemoryConnection(open_database(database or "memory", tables, rows), user=user, host=host)
+
+
+# ---------------------------------------------------------------------------
+# 连接和游标
+# ---------------------------------------------------------------------------
+
+# information_schema 中模拟的表和列
+_INFORMATION_SCHEMA_TABLES = {
+    "SCHEMATA": ("CATALOG_NAME", "SCHEMA_NAME", "DEFAULT_CHARACTER_SET_NAME", "DEFAULT_COLLATION_NAME"),
+    "TABLES": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "TABLE_TYPE", "ENGINE", "TABLE_ROWS",
+               "AVG_ROW_LENGTH", "DATA_LENGTH", "INDEX_LENGTH", "CREATE_TIME", "UPDATE_TIME", "TABLE_COMMENT"),
+    "COLUMNS": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME", "ORDINAL_POSITION", "COLUMN_DEFAULT",
+                "IS_NULLABLE", "DATA_TYPE", "COLUMN_TYPE", "COLUMN_KEY", "EXTRA", "COLUMN_COMMENT"),
+    "STATISTICS": ("TABLE_CATALOG", "TABLE_SCHEMA", "TABLE_NAME", "NON_UNIQUE", "INDEX_SCHEMA", "INDEX_NAME",
+                   "SEQ_IN_INDEX", "COLUMN_NAME"),
+    "KEY_COLUMN_USAGE": ("CONSTRAINT_SCHEMA", "CONSTRAINT_NAME", "TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME",
+                         "ORDINAL_POSITION", "REFERENCED_TABLE_SCHEMA", "REFERENCED_TABLE_NAME",
+                         "REFERENCED_COLUMN_NAME"),
+    "REFERENTIAL_CONSTRAINTS": ("CONSTRAINT_SCHEMA", "CONSTRAINT_NAME", "TABLE_NAME", "REFERENCED_TABLE_NAME",
+                                "UPDATE_RULE", "DELETE_RULE"),
+}
+
+
+class _Result:
+    """一条语句的结果：columns 为 None 表示没有结果集"""
+
+    __slots__ = ("columns", "rows", "rowcount", "lastrowid")
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, rows: Iterator = iter(()),
+                 rowcount: int = 0, lastrowid: Optional[int] = None):
+        self.columns = columns
+        self.rows = rows
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+
+    @classmethod
+    def table(cls, columns: Sequence[str], rows: Sequence[Dict[str, Any]]) -> "_Result":
+        return cls(columns, iter([tuple(row.get(col) for col in columns) for row in rows]), -1)
+
+
+class MemoryCursor:
+    """兼容 mysql.connector 游标接口的游标；结果按需从 sqlite 逐行读取"""
+
+    def __init__(self, connection: "MemoryConnection", dictionary: bool = False):
+        self._connection = connection
+        self._dictionary = dictionary
+        self._rows: Optional[Iterator] = None
+        self._peeked: List[tuple] = []
+        self._pending: List[str] = []
+        self._fetched = 0
+        self.description = None
+        self.column_names: tuple = ()
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, operation: str, params: Any = None):
+        # 一次发送的多条语句依次产生结果，由 nextset 切换；和服务器一样在读到失败的语句时才报错
+        statements = (split_script(operation) if ";" in operation else None) or [operation]
+        self._pending = statements[1:]
+        self._set_result(self._connection.run(statements[0], params))
+
+    def nextset(self):
+        if not self._pending:
+            return None
+        self._set_result(self._connection.run(self._pending.pop(0)))
+        return True
+
+    def executemany(self, operation: str, seq_params: Sequence[Any]):
+        self._set_result(self._connection.run_many(operation, seq_params))
+
+    @property
+    def with_rows(self) -> bool:
+        return self.description is not None
+
+    @property
+    def unread(self) -> bool:
+        return self._rows is not None
+
+    def _set_result(self, result: _Result) -> None:
+        self._rows = None
+        self._fetched = 0
+        self._peeked = []
+        self.rowcount = result.rowcount
+        self.lastrowid = result.lastrowid
+        if result.columns is None:
+            self.description = None
+            self.column_names = ()
+            return
+        self._rows = result.rows
+        # 先读一行，按值推断字段类型
+        self._peeked = self._read(1)
+        first = self._peeked[0] if self._peeked else ()
+        self.column_names = tuple(result.columns)
+        self.description = [
+            (name, field_type(first[index] if first else None), None, None, None, None, 1, 0)
+            for index, name in enumerate(self.column_names)
+        ]
+
+    def _read(self, size: Optional[int]) -> List[tuple]:
+        if self._rows is None:
+            return []
+        try:
+            rows = list(self._rows) if size is None else list(itertools.islice(self._rows, size))
+        except sqlite3.Error as e:
+            self._rows = None
+            raise self._connection.translate_error(e)
+        if size is None or len(rows) < size:
+            self._rows = None
+        return rows
+
+    def _fetch(self, size: Optional[int]) -> List[Any]:
+        rows = self._peeked
+        self._peeked = []
+        if size is None:
+            rows += self._read(None)
+        elif len(rows) < size:
+            rows += self._read(size - len(rows))
+        else:
+            self._peeked = rows[size:]
+            rows = rows[:size]
+        self._fetched += len(rows)
+        self.rowcount = self._fetched
+        if self._dictionary:
+            return [dict(zip(self.column_names, row)) for row in rows]
+        return rows
+
+    def fetchone(self):
+        rows = self._fetch(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: int = 1):
+        return self._fetch(size)
+
+    def fetchall(self):
+        return self._fetch(None)
+
+    def close(self):
+        self._rows = None
+        self._peeked = []
+        self._pending = []
+
+
+class MemoryConnection:
+    """兼容 mysql.connector 连接接口的内存数据库连接"""
+
+    def __init__(self, database: MemoryDatabase, user: str = "root", host: str = "localhost"):
+        self._database = database
+        self.user = user
+        self.host = host
+        self.connection_id = next(_connection_ids)
+        self._db = database.open()
+        self._db.execute("ATTACH DATABASE ':memory:' AS information_schema")
+        for table, columns in _INFORMATION_SCHEMA_TABLES.items():
+            self._db.execute(f"CREATE TABLE information_schema.{table} ({', '.join(columns)})")
+        for (name, args), function in {
+            ("VERSION", 0): lambda: VERSION,
+            ("DATABASE", 0): lambda: database.name,
+            ("SCHEMA", 0): lambda: database.name,
+            ("USER", 0): lambda: f"{user}@{host}",
+            ("CONNECTION_ID", 0): lambda: self.connection_id,
+            ("NOW", 0): lambda: datetime.now().isoformat(" ", "seconds"),
+            ("CURDATE", 0): lambda: date.today().isoformat(),
+            ("UNIX_TIMESTAMP", 0): lambda: int(time.time()),
+            ("SLEEP", 1): self._sleep,
+            ("IF", 3): lambda condition, value, other: value if condition else other,
+            ("CONCAT", -1): lambda *parts: None if None in parts else "".join(str(part) for part in parts),
+        }.items():
+            self._db.create_function(name, args, function)
+        self._cursors: "weakref.WeakSet[MemoryCursor]" = weakref.WeakSet()
+        self._killed = threading.Event()
+        self._deadline: Optional[float] = None
+        self._timed_out = False
+        self._read_only = False
+        self._closed = False
+        _connections[self.connection_id] = self
+
+    # -- mysql.connector 接口 --------------------------------------------------
+
+    def cursor(self, dictionary: bool = False, prepared: bool = False, **kwargs) -> MemoryCursor:
+        # sqlite 自己缓存编译后的语句，预处理游标与普通游标相同
+        self._check_open()
+        cursor = MemoryCursor(self, dictionary=dictionary)
+        self._cursors.add(cursor)
+        return cursor
+
+    @property
+    def unread_result(self) -> bool:
+        return any(cursor.unread for cursor in self._cursors)
+
+    @property
+    def in_transaction(self) -> bool:
+        return not self._closed and self._db.in_transaction
+
+    @property
+    def database(self) -> str:
+        return self._database.name
+
+    def commit(self):
+        self._check_open()
+        self._db.commit()
+        self._end_read_only()
+
+    def rollback(self):
+        self._check_open()
+        self._db.rollback()
+        self._end_read_only()
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0):
+        if self._closed:
+            raise errors.OperationalError(msg="MySQL server has gone away", errno=2006, sqlstate="HY000")
+
+    def is_connected(self) -> bool:
+        return not self._closed
+
+    def close(self):
+        if self._db is None:
+            return
+        self._closed = True
+        _connections.pop(self.connection_id, None)
+        for cursor in list(self._cursors):
+            cursor.close()
+        self._db.close()
+        self._db = None
+
+    # -- 语句执行 ---------------------------------------------------------------
+
+    def run(self, sql: str, params: Any = None) -> _Result:
+        """执行一条语句：MySQL 特有的语句在本地模拟，其余改写后交给 sqlite"""
+        self._check_open()
+        kind = classify(sql).kind
+        if kind in ("SHOW", "DESCRIBE") or (kind == "EXPLAIN" and not _EXPLAIN.match(sql)):
+            return self._show(sql)
+        if kind == "EXPLAIN":
+            return self._explain(sql, params)
+        if kind in ("START", "BEGIN"):
+            return self._start_transaction(sql)
+        if kind == "COMMIT":
+            self.commit()
+            return _Result()
+        if kind == "ROLLBACK" and _PLAIN_ROLLBACK.match(sql):
+            self.rollback()
+            return _Result()
+        if kind in ("SET", "USE", "LOCK", "UNLOCK"):
+            return _Result()
+        if kind == "KILL":
+            return self._kill(sql)
+        if kind in DDL_KINDS:
+            # DDL 隐式提交当前事务
+            self._db.commit()
+            sql, indexes = self._translate_ddl(sql, classify(sql).ddl_object)
+            result = self._execute(sql, params)
+            for index in indexes:
+                self._execute(index, None)
+            return result
+        if kind in ("INSERT", "REPLACE"):
+            sql = self._translate_insert(sql)
+        return self._execute(sql, params)
+
+    def run_many(self, sql: str, seq_params: Sequence[Any]) -> _Result:
+        self._check_open()
+        if classify(sql).kind in ("INSERT", "REPLACE"):
+            sql = self._translate_insert(sql)
+        text = _translate(sql, True)
+        rows = [dict(params) if isinstance(params, dict) else tuple(params) for params in seq_params]
+        self._begin_statement(sql)
+        cursor = self._attempt(lambda: self._db.executemany(text, rows))
+        return _Result(rowcount=cursor.rowcount, lastrowid=cursor.lastrowid)
+
+    def _execute(self, sql: str, params: Any) -> _Result:
+        text = _translate(sql, params is not None)
+        if params is not None:
+            params = dict(params) if isinstance(params, dict) else tuple(params)
+        tables = _INFORMATION_SCHEMA.findall(text)
+        if tables:
+            self._refresh_information_schema({table.upper() for table in tables})
+        self._begin_statement(sql)
+        cursor = self._attempt(lambda: self._db.execute(text, params if params is not None else ()))
+        if cursor.description is None:
+            # DDL 的 rowcount 为 -1，MySQL 返回 0
+            return _Result(rowcount=max(cursor.rowcount, 0), lastrowid=cursor.lastrowid)
+        return _Result([column[0] for column in cursor.description], cursor, -1)
+
+    def _begin_statement(self, sql: str) -> None:
+        """每条语句开始时清除上一条语句的 KILL 标记，按 MAX_EXECUTION_TIME 提示设置执行期限"""
+        self._killed.clear()
+        self._timed_out = False
+        match = _MAX_EXECUTION_TIME.search(sql)
+        if match and int(match.group(1)) > 0:
+            self._deadline = time.monotonic() + int(match.group(1)) / 1000.0
+            self._db.set_progress_handler(self._check_deadline, 10000)
+        elif self._deadline is not None:
+            self._deadline = None
+            self._db.set_progress_handler(None, 0)
+
+    def _check_deadline(self) -> int:
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._timed_out = True
+            return 1
+        return 0
+
+    def _attempt(self, action: Callable[[], Any]) -> Any:
+        """执行 sqlite 操作；其他连接持有表锁时重试，超过 LOCK_WAIT_TIMEOUT 后报 1205"""
+        deadline = time.monotonic() + LOCK_WAIT_TIMEOUT
+        delay = 0.001
+        while True:
+            try:
+                return action()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() >= deadline:
+                    raise self.translate_error(e)
+            except sqlite3.Error as e:
+                raise self.translate_error(e)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def translate_error(self, error: sqlite3.Error) -> errors.Error:
+        if self._closed:
+            return _lost_connection()
+        # SLEEP() 被终止时 sqlite 报 "user-defined function raised exception"
+        if (self._killed.is_set() or self._timed_out) and "user-defined function" in str(error):
+            return _mysql_error(sqlite3.OperationalError("interrupted"), self._timed_out)
+        return _mysql_error(error, self._timed_out)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise _lost_connection()
+
+    def _sleep(self, seconds: Any) -> int:
+        """SLEEP(n)：被 KILL QUERY 或超过执行期限时中止所在语句（报 1317 / 3024）
+
+        抛出异常而不只依赖 interrupt：sqlite 只在扫描循环中检查 interrupt，
+        UPDATE ... SET x = SLEEP(n) WHERE id = 1 这样的单行语句会照常执行完并写入。
+        sqlite 中止语句时撤销该语句已做的修改，与 MySQL 相同。
+        """
+        timeout = float(seconds or 0)
+        if self._deadline is not None:
+            timeout = min(timeout, max(0.0, self._deadline - time.monotonic()))
+        if self._killed.wait(timeout):
+            raise InterruptedError("interrupted")
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._timed_out = True
+            self._db.interrupt()
+            raise InterruptedError("interrupted")
+        return 0
+
+    def _kill_query(self) -> None:
+        self._killed.set()
+        self._db.interrupt()
+
+    # -- MySQL 语句模拟 ---------------------------------------------------------
+
+    def _start_transaction(self, sql: str) -> _Result:
+        match = _START_TRANSACTION.match(sql)
+        options = match.group(1).upper() if match else ""
+        # START TRANSACTION 隐式提交当前事务
+        self._db.commit()
+        self._end_read_only()
+        self._db.execute("BEGIN")
+        if "READ ONLY" in options:
+            self._db.execute("PRAGMA query_only = 1")
+            self._read_only = True
+        return _Result()
+
+    def _end_read_only(self) -> None:
+        if self._read_only:
+            self._db.execute("PRAGMA query_only = 0")
+            self._read_only = False
+
+    def _kill(self, sql: str) -> _Result:
+        match = _KILL.match(sql)
+        if not match:
+            raise errors.ProgrammingError(msg="You have an error in your SQL syntax near KILL", errno=1064)
+        target = _connections.get(int(match.group(2)))
+        if target is None or target._closed:
+            raise errors.DatabaseError(msg=f"Unknown thread id: {match.group(2)}", errno=1094, sqlstate="HY000")
+        target._kill_query()
+        if not (match.group(1) or "").upper().startswith("QUERY"):
+            # 连接由其所有者关闭，之后的操作报连接断开
+            target._closed = True
+        return _Result()
+
+    def _translate_ddl(self, sql: str, ddl_object: Optional[Tuple[str, str]]) -> Tuple[str, List[str]]:
+        """DDL 中 sqlite 不支持的 MySQL 写法改写为等价形式，返回 (语句, 建表后要创建的索引)"""
+        table = ddl_object[1] if ddl_object else ""
+        upper = sql.lstrip().upper()
+        match = _TRUNCATE.match(sql)
+        if match:
+            return f"DELETE FROM {match.group(1)}", []
+        match = _DROP_INDEX.match(sql)
+        if match:
+            return f"DROP INDEX {_quote(_unquote(match.group(2)) + '__' + _unquote(match.group(1)))}", []
+        match = _CREATE_INDEX.match(sql)
+        if match:
+            # sqlite 的索引名在库内唯一，MySQL 在表内唯一：加表名前缀
+            name = _unquote(match.group(4)) + "__" + _unquote(match.group(2))
+            return _CREATE_INDEX.sub(lambda m: f"{m.group(1)}{_quote(name)}{m.group(3)}{m.group(4)}", sql, count=1), []
+        if upper.startswith("DROP TABLE"):
+            self._database.forget(table)
+            return sql, []
+        if not upper.startswith(("CREATE TABLE", "CREATE TEMPORARY TABLE")):
+            return sql, []
+
+        def record(match, declared):
+            with self._database.lock:
+                self._database.column_types[(table, _unquote(match.group(1)))] = " ".join(match.group(2).split()).lower()
+            return match.group(1) + declared
+
+        indexes = []
+
+        def inline_index(match):
+            columns = re.sub(r"\(\s*\d+\s*\)", "", match.group(3))
+            name = _unquote(match.group(2) or columns.split(",")[0])
+            if match.group(1):
+                return f", CONSTRAINT {_quote(name)} UNIQUE ({columns})"
+            indexes.append(f"CREATE INDEX {_quote(table + '__' + name)} ON {_quote(table)} ({columns})")
+            return ""
+
+        sql = _AUTO_INCREMENT_COLUMN.sub(lambda m: record(m, "INTEGER"), sql)
+        sql = _ENUM_COLUMN.sub(lambda m: record(m, "TEXT"), sql)
+        sql = _INLINE_INDEX.sub(inline_index, sql)
+        return _MYSQL_ONLY_CLAUSES.sub("", sql), indexes
+
+    @staticmethod
+    def _translate_insert(sql: str) -> str:
+        sql = _INSERT_IGNORE.sub(r"\1INSERT OR IGNORE", sql, count=1)
+        match = _ON_DUPLICATE.search(sql)
+        if match:
+            assignments = _VALUES_FUNCTION.sub(lambda m: f"excluded.{m.group(1)}", match.group(1))
+            sql = sql[:match.start()] + "ON CONFLICT DO UPDATE SET" + assignments
+        return sql
+
+    def _show(self, sql: str) -> _Result:
+        match = _SHOW_TABLES.match(sql)
+        if match:
+            column = f"Tables_in_{self._database.name}"
+            tables = self._tables()
+            if match.group(1) is not None:
+                pattern = _like_pattern(match.group(1).replace("''", "'"))
+                tables = [table for table in tables if pattern.match(table)]
+            return _Result.table([column], [{column: table} for table, _ in tables])
+        match = _SHOW_INDEX.match(sql)
+        if match:
+            table = self._require_table(_unquote(match.group(1)))
+            rows = [dict(index, Table=table) for index in self._indexes(table)]
+            return _Result.table(["Table", "Non_unique", "Key_name", "Seq_in_index", "Column_name"], rows)
+        match = _SHOW_COLUMNS.match(sql)
+        if match:
+            table = self._require_table(_unquote(match.group(1)))
+            return _Result.table(["Field", "Type", "Null", "Key", "Default", "Extra"], self._columns(table))
+        match = _SHOW_VARIABLES.match(sql)
+        rows = []
+        if match:
+            pattern = _like_pattern(match.group(1) or "%")
+            rows = [{"Variable_name": name, "Value": str(value)}
+                    for name, value in SYSTEM_VARIABLES.items() if pattern.match(name)]
+        # 其他 SHOW 语句返回空结果
+        return _Result.table(["Variable_name", "Value"], rows)
+
+    def _explain(self, sql: str, params: Any) -> _Result:
+        """由 sqlite 的 EXPLAIN QUERY PLAN 构造 MySQL 形式的执行计划，扫描行数按表的实际行数估算"""
+        match = _EXPLAIN.match(sql)
+        statement = sql[match.end():]
+        text = _translate(statement, params is not None)
+        aliases = {}
+        for table, alias in _TABLE_ALIAS.findall(text):
+            aliases[_unquote(alias or table)] = _unquote(table)
+        try:
+            plan = self._db.execute(f"EXPLAIN QUERY PLAN {text}",
+                                    tuple(params) if params is not None else ()).fetchall()
+        except sqlite3.Error as e:
+            raise self.translate_error(e)
+        known = {table for table, _ in self._tables()}
+        steps = []
+        for _, _, _, detail in plan:
+            step = _PLAN_STEP.match(detail)
+            if not step:
+                continue
+            operation, name, using, index, condition = step.groups()
+            table = aliases.get(name, name)
+            if table not in known:
+                # 物化的子查询、派生表已按其中的表计入
+                continue
+            count = self._count(table)
+            equality = bool(condition) and "=" in condition and not re.search(r"[<>]", condition)
+            if operation == "SCAN":
+                access, rows = ("index" if index else "ALL"), count
+            elif equality and ("PRIMARY KEY" in using or self._unique_index(index)):
+                access, rows = "eq_ref", 1
+            elif equality:
+                access, rows = "ref", max(1, count // 10)
+            else:
+                access, rows = "range", max(1, count // 3)
+            steps.append({"table_name": table, "access_type": access, "key": index or ("PRIMARY" if using else None),
+                          "rows_examined_per_scan": rows, "rows_produced_per_join": rows, "filtered": "100.00"})
+
+        output = (match.group(1) or "TRADITIONAL").upper()
+        if output == "JSON":
+            examined, prefix = 0.0, 1.0
+            for step in steps:
+                examined += prefix * step["rows_examined_per_scan"]
+                prefix = step["rows_produced_per_join"] or 1.0
+            document = {"query_block": {"select_id": 1, "cost_info": {"query_cost": f"{examined * 0.1:.2f}"},
+                                        "nested_loop": [{"table": step} for step in steps]}}
+            return _Result.table(["EXPLAIN"], [{"EXPLAIN": json.dumps(document)}])
+        if output == "TREE":
+            return _Result.table(["EXPLAIN"], [{"EXPLAIN": "\n".join(f"-> {row[3]}" for row in plan)}])
+        return _Result.table(
+            ["id", "select_type", "table", "type", "key", "rows", "filtered", "Extra"],
+            [{"id": 1, "select_type": "SIMPLE", "table": step["table_name"], "type": step["access_type"],
+              "key": step["key"], "rows": step["rows_examined_per_scan"], "filtered": 100.0, "Extra": None}
+             for step in steps])
+
+    # -- 表结构 ---------------------------------------------------------------
+
+    def _tables(self) -> List[Tuple[str, str]]:
+        """(表名, 类型)，类型为 table 或 view"""
+        return self._db.execute(
+            "SELECT name, type FROM main.sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' ORDER BY name"
+        ).fetchall()
+
+    def _require_table(self, table: str) -> str:
+        if not self._db.execute("SELECT 1 FROM main.sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+                                (table,)).fetchone():
+            raise errors.ProgrammingError(msg=f"Table '{self._database.name}.{table}' doesn't exist",
+                                          errno=1146, sqlstate="42S02")
+        return table
+
+    def _count(self, table: str) -> int:
+        return self._db.execute(f"SELECT COUNT(*) FROM main.{_quote(table)}").fetchone()[0]
+
+    def _table_info(self, table: str) -> List[tuple]:
+        # (cid, name, type, notnull, dflt_value, pk)
+        return self._db.execute(f"PRAGMA main.table_info({_quote(table)})").fetchall()
+
+    def _indexes(self, table: str) -> List[Dict[str, Any]]:
+        """SHOW INDEX 形式的索引列表：主键在前，其余按索引名"""
+        primary = sorted((column for column in self._table_info(table) if column[5]), key=lambda column: column[5])
+        indexes = [{"Key_name": "PRIMARY", "Column_name": column[1], "Non_unique": 0, "Seq_in_index": seq}
+                   for seq, column in enumerate(primary, 1)]
+        others = []
+        for _, name, unique, origin, _ in self._db.execute(f"PRAGMA main.index_list({_quote(table)})").fetchall():
+            if origin == "pk":
+                continue
+            columns = [row[2] for row in self._db.execute(f"PRAGMA main.index_info({_quote(name)})").fetchall()]
+            if name.startswith(f"{table}__"):
+                key_name = name[len(table) + 2:]
+            elif name.startswith("sqlite_autoindex_"):
+                key_name = columns[0]
+            else:
+                key_name = name
+            others.extend({"Key_name": key_name, "Column_name": column, "Non_unique": 0 if unique else 1,
+                           "Seq_in_index": seq} for seq, column in enumerate(columns, 1))
+        others.sort(key=lambda index: (index["Key_name"], index["Seq_in_index"]))
+        return indexes + others
+
+    def _unique_index(self, index: Optional[str]) -> bool:
+        if not index:
+            return False
+        row = self._db.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'index' AND name = ? AND "
+                               "(sql IS NULL OR sql LIKE 'CREATE UNIQUE%')", (index,)).fetchone()
+        return row is not None
+
+    def _columns(self, table: str) -> List[Dict[str, Any]]:
+        """DESCRIBE 形式的列列表"""
+        info = self._table_info(table)
+        indexes = self._indexes(table)
+        primary = [column[1] for column in info if column[5]]
+        unique = {index["Column_name"] for index in indexes if index["Non_unique"] == 0 and index["Key_name"] != "PRIMARY"
+                  and not any(other["Key_name"] == index["Key_name"] and other["Seq_in_index"] > 1 for other in indexes)}
+        multiple = {index["Column_name"] for index in indexes if index["Seq_in_index"] == 1}
+        columns = []
+        for _, name, declared, notnull, default, pk in info:
+            # INTEGER PRIMARY KEY 是 rowid 的别名，插入时自动编号
+            auto_increment = len(primary) == 1 and pk and declared.upper() == "INTEGER"
+            with self._database.lock:
+                mysql_type = self._database.column_types.get((table, name))
+            if default is not None:
+                default = "current_timestamp()" if default.upper() == "CURRENT_TIMESTAMP" else default.strip("'")
+            columns.append({
+                "Field": name,
+                "Type": mysql_type or declared.lower() or "text",
+                "Null": "NO" if notnull or pk else "YES",
+                "Key": "PRI" if pk else "UNI" if name in unique else "MUL" if name in multiple else "",
+                "Default": default,
+                "Extra": "auto_increment" if auto_increment else "",
+            })
+        return columns
+
+    def _foreign_keys(self, table: str) -> List[Dict[str, Any]]:
+        keys = []
+        for key_id, seq, referenced, column, referenced_column, on_update, on_delete, _ in self._db.execute(
+                f"PRAGMA main.foreign_key_list({_quote(table)})").fetchall():
+            if referenced_column is None:
+                referenced_column = next((col[1] for col in self._table_info(referenced) if col[5]), None)
+            keys.append({"name": f"{table}_ibfk_{key_id + 1}", "column": column, "seq": seq + 1,
+                         "referenced_table": referenced, "referenced_column": referenced_column,
+                         "update_rule": on_update, "delete_rule": on_delete})
+        return keys
+
+    def _table_size(self, table: str, rows: int) -> Tuple[int, int]:
+        """(数据字节数, 索引字节数)；sqlite 未编译 dbstat 时按行数估算"""
+        try:
+            data = self._db.execute("SELECT SUM(pgsize) FROM dbstat('main') WHERE name = ?", (table,)).fetchone()[0]
+            index = self._db.execute(
+                "SELECT SUM(pgsize) FROM dbstat('main') WHERE name IN "
+                "(SELECT name FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ?)", (table,)).fetchone()[0]
+            return data or 0, index or 0
+        except sqlite3.Error:
+            return rows * 128, rows * 32
+
+    def _refresh_information_schema(self, names: set) -> None:
+        """按当前表结构重建查询用到的 information_schema 表"""
+        schema = self._database.name
+        rows: Dict[str, List[tuple]] = {name: [] for name in names if name in _INFORMATION_SCHEMA_TABLES}
+        for table, kind in self._tables():
+            if "TABLES" in rows:
+                count = self._count(table)
+                data_size, index_size = self._table_size(table, count)
+                rows["TABLES"].append(("def", schema, table, "VIEW" if kind == "view" else "BASE TABLE",
+                                       None if kind == "view" else "InnoDB", count,
+                                       data_size // count if count else 0, data_size, index_size, None, None, ""))
+            if "COLUMNS" in rows:
+                for position, column in enumerate(self._columns(table), 1):
+                    rows["COLUMNS"].append(("def", schema, table, column["Field"], position, column["Default"],
+                                            column["Null"], column["Type"].split("(")[0], column["Type"],
+                                            column["Key"], column["Extra"], ""))
+            if "STATISTICS" in rows:
+                rows["STATISTICS"].extend(("def", schema, table, index["Non_unique"], schema, index["Key_name"],
+                                           index["Seq_in_index"], index["Column_name"])
+                                          for index in self._indexes(table))
+            if "KEY_COLUMN_USAGE" in rows or "REFERENTIAL_CONSTRAINTS" in rows:
+                keys = self._foreign_keys(table)
+                rows.get("KEY_COLUMN_USAGE", []).extend(
+                    (schema, key["name"], schema, table, key["column"], key["seq"], schema,
+                     key["referenced_table"], key["referenced_column"]) for key in keys)
+                rows.get("REFERENTIAL_CONSTRAINTS", []).extend(
+                    (schema, key["name"], table, key["referenced_table"], key["update_rule"], key["delete_rule"])
+                    for key in keys if key["seq"] == 1)
+        if "SCHEMATA" in rows:
+            rows["SCHEMATA"].append(("def", schema, "utf8mb4", "utf8mb4_general_ci"))
+        # 在事务中时刷新随事务提交或回滚，不单独提交（避免提前提交用户的写操作）
+        in_transaction = self._db.in_transaction
+        for name, values in rows.items():
+            self._db.execute(f"DELETE FROM information_schema.{name}")
+            if values:
+                placeholders = ", ".join("?" * len(_INFORMATION_SCHEMA_TABLES[name]))
+                self._db.executemany(f"INSERT INTO information_schema.{name} VALUES ({placeholders})", values)
+        if not in_transaction:
+            self._db.commit()
+
+
+def _like_pattern(pattern: str) -> "re.Pattern":
+    """SQL LIKE 模式转换为正则（不区分大小写）"""
+    regex = "".join(".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern)
+    return re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL)
@@ -0,0 +1,254 @@
+"""
+MySQL MCP性能指标
+按工具统计调用次数、延迟直方图、各阶段耗时（建连/执行/读取/格式化）、返回行数和字节数
+"""
+
+import os
+import json
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# 直方图桶上限（秒）
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+PHASES = ("connect", "execute", "fetch", "format")
+
+
+class Histogram:
+    """固定桶直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """按桶上限估算分位数"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus 风格的累计桶"""
+        result = []
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            result.append((f"{bound:g}", seen))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class CallRecord:
+    """单次工具调用的阶段耗时和数据量"""
+
+    __slots__ = ("phases", "rows")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.rows = 0
+
+
+_current_call: ContextVar[Optional[CallRecord]] = ContextVar("mysql_mcp_current_call", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """记录当前工具调用中某个阶段的耗时（不在工具调用中时不做任何事）"""
+    record = _current_call.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.phases[name] = record.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def add_rows(count: int) -> None:
+    """记录当前工具调用返回的行数"""
+    record = _current_call.get()
+    if record is not None:
+        record.rows += count
+
+
+class ToolFailure(str):
+    """失败的工具调用结果
+
+    文本与普通结果相同，由类型标记调用失败；指标统计和传输层据此判断，不检查文本内容。
+    """
+
+    __slots__ = ()
+
+
+class ToolMetrics:
+    """单个工具的累计指标"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.bytes = 0
+        self.latency = Histogram()
+        self.phases = {name: Histogram() for name in PHASES}
+
+
+class MetricsRegistry:
+    """工具调用指标注册表"""
+
+    def __init__(self, dump_file: Optional[str] = None, dump_format: str = "json", dump_interval: float = 60.0):
+        self.tools: Dict[str, ToolMetrics] = {}
+        self.started_at = time.time()
+        self.dump_file = dump_file
+        self.dump_format = dump_format
+        self.dump_interval = dump_interval
+        self._last_dump = 0.0
+        self._lock = threading.Lock()
+
+    def instrument(self, tool_name: str, handler: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        """包装异步工具处理函数"""
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            record = CallRecord()
+            token = _current_call.set(record)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = await handler(*args, **kwargs)
+                return result
+            finally:
+                _current_call.reset(token)
+                self.observe(tool_name, time.perf_counter() - start, record, result)
+        return wrapper
+
+    def observe(self, tool_name: str, elapsed: float, record: CallRecord, result: Optional[str]) -> None:
+        with self._lock:
+            metrics = self.tools.get(tool_name)
+            if metrics is None:
+                metrics = self.tools[tool_name] = ToolMetrics()
+            metrics.calls += 1
+            if result is None or isinstance(result, ToolFailure):
+                metrics.errors += 1
+            metrics.latency.observe(elapsed)
+            for name, seconds in record.phases.items():
+                histogram = metrics.phases.get(name)
+                if histogram is None:
+                    histogram = metrics.phases[name] = Histogram()
+                histogram.observe(seconds)
+            metrics.rows += record.rows
+            if result:
+                metrics.bytes += len(result.encode("utf-8"))
+        self._maybe_dump()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """所有工具指标的字典形式"""
+        with self._lock:
+            tools = {}
+            for name, metrics in sorted(self.tools.items()):
+                tools[name] = {
+                    "calls": metrics.calls,
+                    "errors": metrics.errors,
+                    "rows": metrics.rows,
+                    "bytes": metrics.bytes,
+                    "latency_ms": {
+                        "avg": metrics.latency.sum / metrics.latency.count * 1000 if metrics.latency.count else 0.0,
+                        "p50": metrics.latency.quantile(0.5) * 1000,
+                        "p95": metrics.latency.quantile(0.95) * 1000,
+                        "p99": metrics.latency.quantile(0.99) * 1000,
+                        "buckets": metrics.latency.cumulative(),
+                    },
+                    "phases_ms": {
+                        phase_name: {
+                            "count": histogram.count,
+                            "total": histogram.sum * 1000,
+                            "avg": histogram.sum / histogram.count * 1000,
+                        }
+                        for phase_name, histogram in metrics.phases.items() if histogram.count
+                    },
+                }
+            return {"uptime_seconds": time.time() - self.started_at, "tools": tools}
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            items = sorted(self.tools.items())
+            for metric, help_text, attr in (
+                ("mysql_mcp_tool_calls_total", "工具调用次数", "calls"),
+                ("mysql_mcp_tool_errors_total", "工具调用失败次数", "errors"),
+                ("mysql_mcp_tool_rows_total", "工具返回的数据行数", "rows"),
+                ("mysql_mcp_tool_response_bytes_total", "工具返回的字节数", "bytes"),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(f'{metric}{{tool="{name}"}} {getattr(m, attr)}' for name, m in items)
+
+            lines.append("# HELP mysql_mcp_tool_duration_seconds 工具调用耗时")
+            lines.append("# TYPE mysql_mcp_tool_duration_seconds histogram")
+            for name, m in items:
+                lines.extend(self._histogram_lines("mysql_mcp_tool_duration_seconds", f'tool="{name}"', m.latency))
+
+            lines.append("# HELP mysql_mcp_tool_phase_seconds 工具调用各阶段耗时")
+            lines.append("# TYPE mysql_mcp_tool_phase_seconds histogram")
+            for name, m in items:
+                for phase_name, histogram in m.phases.items():
+                    if histogram.count:
+                        lines.extend(self._histogram_lines(
+                            "mysql_mcp_tool_phase_seconds", f'tool="{name}",phase="{phase_name}"', histogram
+                        ))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(metric: str, labels: str, histogram: Histogram) -> List[str]:
+        lines = [f'{metric}_bucket{{{labels},le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+        lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.6f}")
+        lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return lines
+
+    def render(self, fmt: str = "json") -> str:
+        if fmt == "prometheus":
+            return self.to_prometheus()
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def dump(self, path: str, fmt: str = "json") -> None:
+        """写入指标文件（先写临时文件再替换，避免读取到半个文件）"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render(fmt))
+        os.replace(tmp_path, path)
+
+    def _maybe_dump(self) -> None:
+        if not self.dump_file:
+            return
+        now = time.monotonic()
+        if now - self._last_dump < self.dump_interval:
+            return
+        self._last_dump = now
+        try:
+            self.dump(self.dump_file, self.dump_format)
+        except OSError:
+            pass
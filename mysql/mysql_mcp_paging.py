@@ -0,0 +1,175 @@
+"""
+MySQL MCP结果分页
+execute_query 结果被截断时返回续页令牌，fetch_more 凭令牌读取下一页：
+- 键集分页：单表查询且结果包含主键时，按主键排序，下一页以上一页最后一行的主键为起点，
+  不持有连接，每页只扫描该页的行
+- 持有游标：其他查询保留连接和未读完的游标，下一页直接继续读取；
+  持有的游标数量有上限，空闲超时后关闭
+"""
+
+import time
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Sequence
+
+
+class KeysetPage:
+    """键集分页状态：原查询按主键排序，记录已返回的最后一行的主键"""
+
+    kind = "keyset"
+
+    def __init__(self, query: str, params: Optional[List[Any]], key_columns: Sequence[str],
+                 target: Optional[str], output_format: str, page_size: int):
+        self.query = query
+        self.params = params
+        self.key_columns = list(key_columns)
+        self.last_key: Optional[List[Any]] = None
+        self.target = target
+        self.output_format = output_format
+        self.page_size = page_size
+        self.offset = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def page_sql(self, limit: int):
+        """返回 (SQL, 参数)：从 last_key 之后按主键取 limit 行"""
+        quoted = [f"`{col.replace('`', '``')}`" for col in self.key_columns]
+        order = ", ".join(quoted)
+        query = self.query.strip().rstrip(';')
+        if self.params is None and self.last_key is not None:
+            # 原查询不带参数时其中的 % 是字面量，加上主键参数后要转义才不会被当作占位符
+            query = query.replace("%", "%%")
+        sql = f"SELECT * FROM ({query}) AS _mcp_page"
+        params = list(self.params or [])
+        if self.last_key is not None:
+            placeholders = ", ".join(["%s"] * len(quoted))
+            if len(quoted) == 1:
+                sql += f" WHERE {quoted[0]} > %s"
+            else:
+                sql += f" WHERE ({order}) > ({placeholders})"
+            params.extend(self.last_key)
+        sql += f" ORDER BY {order} LIMIT {int(limit)}"
+        return sql, (params if params or self.params is not None else None)
+
+    def advance(self, columns: Sequence[str], rows: List[Sequence[Any]]) -> None:
+        if rows:
+            last = rows[-1]
+            self.last_key = [last[columns.index(col)] for col in self.key_columns]
+        self.offset += len(rows)
+
+    def close(self) -> None:
+        pass
+
+
+class HeldCursor:
+    """持有的服务器端游标：连接在关闭前不归还连接池"""
+
+    kind = "cursor"
+
+    def __init__(self, cursor, columns: Sequence[str], release: Callable[[bool], None],
+                 target: Optional[str], output_format: str, page_size: int, offset: int,
+                 description: Optional[Sequence[Sequence[Any]]] = None,
+                 connection: Any = None, sql: str = ""):
+        self.cursor = cursor
+        # 游标所在的连接和原查询，读取下一页时登记为运行中的查询
+        self.connection = connection
+        self.sql = sql
+        self.columns = list(columns)
+        self.description = description
+        self._release = release
+        self.target = target
+        self.output_format = output_format
+        self.page_size = page_size
+        self.offset = offset
+        # 判断是否还有下一页时多读的行
+        self.pending: List[Sequence[Any]] = []
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def close(self, exhausted: bool = False) -> None:
+        """归还连接；结果未读完时连接直接关闭
+
+        等待正在读取该游标的线程（如已超时的 fetch_more）结束后再关闭，同一连接不会被两个线程同时使用。
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            if exhausted:
+                try:
+                    self.cursor.close()
+                except Exception:
+                    exhausted = False
+            self._release(not exhausted)
+
+
+class ResultPager:
+    """续页令牌登记表
+
+    持有游标的数量不超过 max_cursors（超出时关闭最早的），空闲超过 cursor_idle_timeout 后关闭；
+    键集分页令牌不占用连接，空闲超过 keyset_ttl 后失效。
+    """
+
+    def __init__(self, max_cursors: int = 2, cursor_idle_timeout: float = 120.0,
+                 keyset_ttl: float = 1800.0, max_tokens: int = 256):
+        self.max_cursors = max_cursors
+        self.cursor_idle_timeout = cursor_idle_timeout
+        self.keyset_ttl = keyset_ttl
+        self.max_tokens = max_tokens
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, entry) -> str:
+        """登记分页状态，返回续页令牌"""
+        token = secrets.token_urlsafe(9)
+        evicted = []
+        with self._lock:
+            self._entries[token] = entry
+            cursors = [key for key, value in self._entries.items()
+                       if value.kind == "cursor" and not value.lock.locked()]
+            for key in cursors[:max(0, len(cursors) - self.max_cursors)]:
+                evicted.append(self._entries.pop(key))
+            while len(self._entries) > self.max_tokens:
+                evicted.append(self._entries.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return token
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                self._entries.move_to_end(token)
+                entry.last_used = time.monotonic()
+            return entry
+
+    def pop(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def expire(self) -> int:
+        """关闭空闲超时的游标并删除过期令牌，返回处理的数量"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key for key, entry in self._entries.items()
+                if now - entry.last_used > (self.cursor_idle_timeout if entry.kind == "cursor" else self.keyset_ttl)
+                and not entry.lock.locked()
+            ]
+            entries = [self._entries.pop(key) for key in expired]
+        for entry in entries:
+            entry.close()
+        return len(entries)
+
+    def held_cursors(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if entry.kind == "cursor")
+
+    def close(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.close()
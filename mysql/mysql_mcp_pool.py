@@ -0,0 +1,285 @@
+"""
+MySQL MCP连接池
+有界、线程安全的连接池，避免每次工具调用都重新建立TCP连接和认证握手；
+每个池化连接附带服务器端预处理语句缓存
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from mysql.connector.errors import PoolError
+
+logger = logging.getLogger("mysql-mcp-server")
+
+
+class PreparedStatementCache:
+    """单个连接上的服务器端预处理语句LRU
+
+    同一语句形状使用次数达到 prepare_threshold 后才在服务器端预处理，
+    一次性语句仍走客户端参数转义，避免多余的 PREPARE / CLOSE 往返。
+    """
+
+    def __init__(self, conn: Any, max_statements: int = 32, prepare_threshold: int = 2):
+        self.conn = conn
+        self.max_statements = max_statements
+        self.prepare_threshold = prepare_threshold
+        self._cursors: "OrderedDict[str, Any]" = OrderedDict()
+        self._uses: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.prepares = 0
+
+    def cursor_for(self, sql: str) -> Optional[Any]:
+        """返回该语句的预处理游标；使用次数未达到阈值时返回 None"""
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            self.hits += 1
+            return cursor
+
+        uses = self._uses.pop(sql, 0) + 1
+        if uses < self.prepare_threshold:
+            self._uses[sql] = uses
+            while len(self._uses) > self.max_statements * 4:
+                self._uses.popitem(last=False)
+            return None
+
+        cursor = self.conn.cursor(prepared=True)
+        self._cursors[sql] = cursor
+        self.prepares += 1
+        while len(self._cursors) > self.max_statements:
+            _, evicted = self._cursors.popitem(last=False)
+            try:
+                # 关闭游标会释放服务器端的语句句柄
+                evicted.close()
+            except Exception:
+                pass
+        return cursor
+
+    def owns(self, cursor: Any) -> bool:
+        return any(cached is cursor for cached in self._cursors.values())
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+
+class MySQLConnectionPool:
+    """有界连接池
+
+    - 最多持有 size 个连接（空闲 + 使用中）
+    - 取出空闲连接时，仅当其空闲时间超过 validation_interval 才执行一次 ping 校验
+    - 失效连接直接丢弃并重新建立
+    """
+
+    def __init__(self,
+                 connect: Callable[[], Any],
+                 size: int = 5,
+                 validation_interval: float = 30.0,
+                 acquire_timeout: float = 30.0,
+                 statement_cache_size: int = 32,
+                 prepare_threshold: int = 2):
+        if size < 1:
+            raise ValueError("连接池大小必须大于0")
+        self._connect = connect
+        self.size = size
+        self.validation_interval = validation_interval
+        self.acquire_timeout = acquire_timeout
+        self.statement_cache_size = statement_cache_size
+        self.prepare_threshold = prepare_threshold
+        self._statement_caches: Dict[int, PreparedStatementCache] = {}
+
+        self._cond = threading.Condition()
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._total = 0
+        self._discard: Set[int] = set()
+        self._closed = False
+
+        # 统计计数器
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._dropped = 0
+        self._timeouts = 0
+
+    def acquire(self) -> Any:
+        """取出一个可用连接，连接池已满时最多等待 acquire_timeout 秒"""
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        waited = False
+
+        while True:
+            conn = None
+            last_used = 0.0
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("连接池已关闭")
+                    if self._idle:
+                        # 后进先出：优先复用最近使用过的连接
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._total < self.size:
+                        self._total += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolError(f"等待连接超时（{self.acquire_timeout}秒），连接池已满: {self.size}")
+                    waited = True
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                conn = self._create()
+                self._record_wait(start, waited, hit=False)
+                return conn
+
+            if self._is_alive(conn, last_used):
+                self._record_wait(start, waited, hit=True)
+                return conn
+
+            # 连接已失效，丢弃后重新获取
+            self._close_quietly(conn)
+            with self._cond:
+                self._total -= 1
+                self._dropped += 1
+                self._cond.notify()
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """归还连接；discard为True或连接状态异常时直接关闭"""
+        with self._cond:
+            if id(conn) in self._discard:
+                self._discard.discard(id(conn))
+                discard = True
+            closed = self._closed
+
+        if not discard and not closed:
+            try:
+                if conn.unread_result:
+                    discard = True
+                elif conn.in_transaction:
+                    # 结束隐式事务，避免下一个使用者读到旧快照
+                    conn.rollback()
+            except Exception as e:
+                logger.warning(f"归还连接时状态检查失败，丢弃该连接: {e}")
+                discard = True
+
+        if discard or closed:
+            self._close_quietly(conn)
+            with self._cond:
+                self._total -= 1
+                if not closed:
+                    self._dropped += 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def statement_cache(self, conn: Any) -> PreparedStatementCache:
+        """获取连接对应的预处理语句缓存（连接关闭时一并丢弃）"""
+        with self._cond:
+            cache = self._statement_caches.get(id(conn))
+            if cache is None or cache.conn is not conn:
+                cache = PreparedStatementCache(conn, self.statement_cache_size, self.prepare_threshold)
+                self._statement_caches[id(conn)] = cache
+            return cache
+
+    def invalidate(self, conn: Any) -> None:
+        """标记连接在归还时丢弃（例如结果集未读完）"""
+        with self._cond:
+            self._discard.add(id(conn))
+
+    def expire_idle(self) -> None:
+        """强制所有空闲连接在下次取出时重新校验（例如检测到服务器断开后）"""
+        with self._cond:
+            self._idle = deque((conn, 0.0) for conn, _ in self._idle)
+
+    @contextmanager
+    def connection(self):
+        """连接上下文管理器"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """关闭连接池及所有空闲连接"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """连接池统计信息"""
+        with self._cond:
+            acquired = self._hits + self._misses
+            prepared_hits = sum(cache.hits for cache in self._statement_caches.values())
+            prepared_statements = sum(len(cache) for cache in self._statement_caches.values())
+            return {
+                "size": self.size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / acquired if acquired else 0.0,
+                "waits": self._waits,
+                "wait_time_total_ms": self._wait_time_total * 1000,
+                "wait_time_max_ms": self._wait_time_max * 1000,
+                "dropped": self._dropped,
+                "timeouts": self._timeouts,
+                "prepared_statements": prepared_statements,
+                "prepared_hits": prepared_hits,
+            }
+
+    def _create(self) -> Any:
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def _is_alive(self, conn: Any, last_used: float) -> bool:
+        if time.monotonic() - last_used < self.validation_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.info(f"空闲连接校验失败，已丢弃: {e}")
+            return False
+
+    def _record_wait(self, start: float, waited: bool, hit: bool) -> None:
+        elapsed = time.monotonic() - start
+        with self._cond:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+            if waited:
+                self._waits += 1
+                self._wait_time_total += elapsed
+                self._wait_time_max = max(self._wait_time_max, elapsed)
+
+    def _close_quietly(self, conn: Any) -> None:
+        with self._cond:
+            cache = self._statement_caches.get(id(conn))
+            if cache is not None and cache.conn is conn:
+                del self._statement_caches[id(conn)]
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,89 @@
+"""
+MySQL MCP运行中查询登记
+执行中的查询按服务器连接ID登记，可以通过 list_running_queries 查看已执行时间和已读取行数，
+通过 cancel_query 或在工具调用超时后，在单独的控制连接上执行 KILL QUERY 终止服务器端的查询
+"""
+
+import time
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# 当前工具调用的标识：超时后终止该调用登记的全部查询
+current_call: ContextVar[Optional[object]] = ContextVar("mysql_mcp_call", default=None)
+
+
+class RunningQuery:
+    """一条正在执行的查询"""
+
+    def __init__(self, query_id: int, sql: str, target: Optional[str], session: Any,
+                 connection_id: Optional[int], owner: Optional[object]):
+        self.query_id = query_id
+        self.sql = sql
+        self.target = target
+        self.session = session
+        self.connection_id = connection_id
+        self.owner = owner
+        self.started = time.monotonic()
+        self.rows = 0
+        self.cancelled = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+# 当前线程正在执行的查询，用于累计已读取行数
+_current_query: ContextVar[Optional[RunningQuery]] = ContextVar("mysql_mcp_running_query", default=None)
+
+
+class RunningQueryRegistry:
+    """运行中查询登记表"""
+
+    def __init__(self):
+        self._queries: Dict[int, RunningQuery] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.cancelled = 0
+
+    @contextmanager
+    def track(self, session: Any, conn: Any, sql: str, target: Optional[str] = None):
+        """在 with 块内登记 conn 上正在执行的查询"""
+        query = RunningQuery(next(self._ids), sql, target, session,
+                             getattr(conn, "connection_id", None), current_call.get())
+        with self._lock:
+            self._queries[query.query_id] = query
+        token = _current_query.set(query)
+        try:
+            yield query
+        finally:
+            _current_query.reset(token)
+            with self._lock:
+                self._queries.pop(query.query_id, None)
+
+    @staticmethod
+    def add_rows(count: int) -> None:
+        """累计当前查询已读取的行数"""
+        query = _current_query.get()
+        if query is not None:
+            query.rows += count
+
+    def get(self, query_id: int) -> Optional[RunningQuery]:
+        with self._lock:
+            return self._queries.get(query_id)
+
+    def queries(self) -> List[RunningQuery]:
+        with self._lock:
+            return sorted(self._queries.values(), key=lambda query: query.started)
+
+    def owned_by(self, owner: object) -> List[RunningQuery]:
+        with self._lock:
+            return [query for query in self._queries.values() if query.owner is owner]
+
+    def mark_cancelled(self, query: RunningQuery) -> None:
+        with self._lock:
+            if not query.cancelled:
+                query.cancelled = True
+                self.cancelled += 1
@@ -5,18 +5,148 @@ MySQL MCP服务器 - 开发环境专用
 """
 
 import os
+import sys
 import json
+import time
+import asyncio
+import inspect
 import logging
-from typing import Any, Dict, List, Optional, Union
+import tempfile
+import functools
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
 from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import DatabaseError, InterfaceError
 from pydantic import BaseModel
 
+from mysql_mcp_pool import MySQLConnectionPool
+from mysql_mcp_session import ConnectionTarget, MySQLSession, current_target, is_lost_connection
+from mysql_mcp_formatter import OUTPUT_FORMATS, ResultSet, render_rows
+from mysql_mcp_cache import DatabaseStatsCache, QueryResultCache, SchemaCache, filter_tables
+from mysql_mcp_sql import DML_KINDS, classify, classify_cache_info, split_script
+from mysql_mcp_guard import QueryCostGuard
+from mysql_mcp_paging import HeldCursor, KeysetPage, ResultPager
+from mysql_mcp_running import RunningQuery, RunningQueryRegistry, current_call
+from mysql_mcp_transaction import ISOLATION_LEVELS, PinnedTransaction, TransactionRegistry, current_transaction
+from mysql_mcp_batch import chunk_statements, chunked, execute_multi, merge_insert_statements
+from mysql_mcp_metrics import MetricsRegistry, ToolFailure, add_rows, phase
+import mysql_mcp_driver
+from mysql_mcp_export import WRITE_ERRORS as EXPORT_WRITE_ERRORS, available_formats, open_writer, resolve_export_path
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mysql-mcp-server")
 
+# 服务器配置：优先读取 config.py（由 config.example.py 复制），缺失项使用默认值
+DEFAULT_SERVER_CONFIG = {
+    'max_query_rows': 1000,
+    'query_timeout': 30,
+    'connection_pool_size': 5,
+    'driver': 'auto',
+    'memory_rows': 10000,
+    'memory_tables': None,
+    'pool_validation_interval': 30,
+    'replica_reads': True,
+    'reconnect_retries': 3,
+    'reconnect_backoff': 0.2,
+    'reconnect_backoff_max': 5,
+    'fetch_batch_size': 500,
+    'max_cell_bytes': 2048,
+    'max_output_bytes': 1024 * 1024,
+    'blob_preview_bytes': 32,
+    'schema_cache_size': 1024,
+    'schema_cache_ttl': 300,
+    'schema_cache_warmup': True,
+    'database_stats_ttl': 300,
+    'database_stats_top_n': 10,
+    'batch_chunk_size': 1000,
+    'batch_max_statement_bytes': 1024 * 1024,
+    'script_multi_statements': True,
+    'script_timeout': 600,
+    'query_cache_enabled': False,
+    'query_cache_size': 256,
+    'query_cache_max_bytes': 64 * 1024 * 1024,
+    'query_cache_ttl': 60,
+    'prepared_statement_cache_size': 32,
+    'prepare_threshold': 2,
+    'cost_guard_mode': 'off',
+    'cost_guard_max_rows': 1000000,
+    'cost_guard_max_execution_ms': 10000,
+    'cost_guard_plan_cache_size': 512,
+    'cost_guard_plan_cache_ttl': 300,
+    'result_cursor_max': 2,
+    'result_cursor_idle_timeout': 120,
+    'result_keyset_ttl': 1800,
+    'transaction_max': 2,
+    'transaction_idle_timeout': 60,
+    'metrics_dump_file': None,
+    'metrics_dump_format': 'json',
+    'metrics_dump_interval': 60,
+    'export_dir': os.path.join(tempfile.gettempdir(), 'mysql_mcp_exports'),
+    'export_buffer_bytes': 1024 * 1024,
+    'export_timeout': 600,
+    'transport_max_concurrency': 8,
+    'transport_max_message_bytes': 16 * 1024 * 1024,
+}
+
+try:
+    from config import SERVER_CONFIG as _USER_SERVER_CONFIG
+except ImportError:
+    _USER_SERVER_CONFIG = {}
+
+SERVER_CONFIG = {**DEFAULT_SERVER_CONFIG, **_USER_SERVER_CONFIG}
+
+# 预先配置的命名连接目标：名称 -> 连接参数（可含 replicas 只读副本列表）
+try:
+    from config import TARGETS
+except ImportError:
+    TARGETS = {}
+
+DEFAULT_TARGET = "default"
+
+
+def _connect_memory(**kwargs):
+    """内存后端（driver 为 memory）：数据库首次打开时按配置生成合成数据表
+
+    模块在第一次使用时才导入，正常连接 MySQL 时不加载模拟库，也不注册 sqlite3 的类型转换函数。
+    """
+    import mysql_mcp_memory
+    return mysql_mcp_memory.connect(tables=SERVER_CONFIG['memory_tables'], rows=SERVER_CONFIG['memory_rows'],
+                                    **kwargs)
+
+
+mysql_mcp_driver.register_driver("memory", _connect_memory)
+
+# 不访问数据库或自行处理目标的工具，不增加 target 参数
+TARGETLESS_TOOLS = ("connect_database", "list_targets", "get_server_metrics", "fetch_more", "commit", "rollback",
+                    "list_running_queries", "cancel_query")
+
+# 查询被 KILL QUERY 终止（Query execution was interrupted）
+QUERY_INTERRUPTED = 1317
+
+# 不能在显式事务中执行的工具（自行管理提交），不增加 transaction 参数
+NON_TRANSACTIONAL_TOOLS = TARGETLESS_TOOLS + ("begin_transaction", "batch_write_operation", "execute_script")
+
+# 会改变连接会话状态的语句，脚本执行后不把连接放回连接池
+SESSION_STATE_KINDS = frozenset({"USE", "SET", "LOCK", "UNLOCK"})
+
+# 键集分页的外层查询引用不到主键列（1054）或子查询结果列名重复（1060）时改用持有游标
+KEYSET_FALLBACK_ERRORS = frozenset({1054, 1060})
+
+
+def quote_identifier(name: str) -> str:
+    """为表名等标识符加反引号（支持 db.table 形式），避免拼接SQL时注入"""
+    parts = name.strip().replace("`", "").split(".")
+    return ".".join(f"`{part}`" for part in parts)
+
+
+class QueryTimeoutError(Error):
+    """工具调用超过 SERVER_CONFIG['query_timeout']"""
+
 
 class DatabaseConfig(BaseModel):
     """数据库配置模型"""
@@ -27,37 +157,268 @@ class DatabaseConfig(BaseModel):
     password: str
     charset: str = "utf8mb4"
     use_ssl: bool = False
+    # auto / c_ext / pure，或通过 mysql_mcp_driver.register_driver 注册的驱动名
+    driver: str = "auto"
 
 
 class MySQLConnectionManager:
-    """MySQL连接管理器"""
+    """MySQL连接管理器：按名称登记连接目标，每个数据库配置对应一个长期会话
+
+    工具调用通过 current_target 选择目标（未指定时使用默认目标），
+    只读查询可路由到目标的只读副本；处于显式事务（current_transaction）时一律使用事务固定的连接。
+    """
     
-    def __init__(self):
-        self.connection: Optional[mysql.connector.MySQLConnection] = None
-        self.config: Optional[DatabaseConfig] = None
+    def __init__(self, pool_size: Optional[int] = None):
+        self.sessions: Dict[tuple, MySQLSession] = {}
+        self.targets: Dict[str, ConnectionTarget] = {}
+        self.default_target: Optional[str] = None
+        self.pool_size = pool_size or SERVER_CONFIG['connection_pool_size']
+        # 可替换的连接工厂（例如基准测试使用的进程内模拟连接），默认按 config.driver 选择驱动
+        self.connect_factory: Optional[Callable[[DatabaseConfig], Any]] = None
+        self._lock = threading.Lock()
+        # 借出连接 -> 所属会话（副本连接的语句缓存、丢弃和终止查询需要找到对应的会话）
+        self._owners: Dict[int, MySQLSession] = {}
+        # 会话 -> 执行 KILL QUERY 的控制连接（不占用连接池）
+        self._control: Dict[MySQLSession, Any] = {}
+        self._control_lock = threading.Lock()
+        # 事务固定的连接 -> 事务
+        self._pinned: Dict[int, PinnedTransaction] = {}
     
-    @contextmanager
-    def get_connection(self, config: DatabaseConfig):
-        """获取数据库连接的上下文管理器"""
-        self.config = config
+    @property
+    def target(self) -> Optional[ConnectionTarget]:
+        """当前工具调用使用的连接目标"""
+        name = current_target.get() or self.default_target
+        return self.targets.get(name) if name else None
+    
+    @property
+    def session(self) -> Optional[MySQLSession]:
+        """当前目标的主库会话"""
+        target = self.target
+        return target.primary if target else None
+    
+    @property
+    def config(self) -> Optional[DatabaseConfig]:
+        session = self.session
+        return session.config if session else None
+    
+    @property
+    def pool(self) -> Optional[MySQLConnectionPool]:
+        session = self.session
+        return session.pool if session else None
+    
+    def _connect(self, config: DatabaseConfig) -> mysql.connector.MySQLConnection:
+        """建立一个新的物理连接"""
+        if self.connect_factory is not None:
+            return self.connect_factory(config)
+        return mysql_mcp_driver.connect(
+            config.driver,
+            host=config.host,
+            port=config.port,
+            database=config.database,
+            user=config.username,
+            password=config.password,
+            charset=config.charset,
+            ssl_disabled=not config.use_ssl
+        )
+    
+    def open_session(self, config: DatabaseConfig) -> MySQLSession:
+        """获取配置对应的会话（不存在或配置变化时新建），不改变当前目标"""
+        key = (config.host, config.port, config.database, config.username)
+        with self._lock:
+            session = self.sessions.get(key)
+            if session is not None and session.config != config:
+                session.close()
+                session = None
+            if session is None:
+                pool = MySQLConnectionPool(
+                    lambda: self._connect(config),
+                    size=self.pool_size,
+                    validation_interval=SERVER_CONFIG['pool_validation_interval'],
+                    acquire_timeout=SERVER_CONFIG['query_timeout'],
+                    statement_cache_size=SERVER_CONFIG['prepared_statement_cache_size'],
+                    prepare_threshold=SERVER_CONFIG['prepare_threshold'],
+                )
+                session = MySQLSession(
+                    config,
+                    pool,
+                    retries=SERVER_CONFIG['reconnect_retries'],
+                    backoff=SERVER_CONFIG['reconnect_backoff'],
+                    backoff_max=SERVER_CONFIG['reconnect_backoff_max'],
+                )
+                self.sessions[key] = session
+            return session
+    
+    def register_target(self, name: str, primary: MySQLSession,
+                        replicas: Optional[List[MySQLSession]] = None) -> ConnectionTarget:
+        """登记（或替换）命名连接目标"""
+        target = ConnectionTarget(name, primary, replicas or [])
+        with self._lock:
+            self.targets[name] = target
+        return target
+    
+    def use(self, name: str):
+        """切换默认目标"""
+        with self._lock:
+            self.default_target = name
+    
+    def acquire(self, read_only: bool = False):
+        """从当前目标取出连接，返回 (会话, 连接)，调用方负责 release
+
+        read_only=True 且目标配置了只读副本时使用副本连接，副本不可用时退回主库。
+        处于显式事务时返回事务固定的连接（同一事务的调用依次执行）。
+        """
+        transaction = current_transaction.get()
+        if transaction is not None:
+            transaction.enter()
+            return transaction.session, transaction.conn
+        target = self.target
+        if target is None:
+            raise InterfaceError(msg="尚未连接数据库")
+        session = target.session_for(read_only and SERVER_CONFIG['replica_reads'])
         try:
-            self.connection = mysql.connector.connect(
-                host=config.host,
-                port=config.port,
-                database=config.database,
-                user=config.username,
-                password=config.password,
-                charset=config.charset,
-                use_pure=True,  # 使用纯Python实现
-                ssl_disabled=not config.use_ssl
-            )
-            yield self.connection
+            with phase("connect"):
+                try:
+                    conn = session.pool.acquire()
+                except Error as e:
+                    if session is target.primary:
+                        raise
+                    logger.warning(f"只读副本 {session.config.host}:{session.config.port} 不可用，改用主库: {e}")
+                    session = target.primary
+                    conn = session.pool.acquire()
         except Error as e:
             logger.error(f"MySQL连接错误: {e}")
             raise
+        self._owners[id(conn)] = session
+        return session, conn
+    
+    def release(self, session: MySQLSession, conn, discard: bool = False):
+        """归还 acquire 取出的连接；discard=True 时直接关闭"""
+        transaction = self._pinned.get(id(conn))
+        if transaction is not None and transaction.conn is conn:
+            if not transaction.closed:
+                # 事务连接在事务结束前不归还，连接断开时事务随之失效
+                transaction.exit(broken=discard)
+                return
+            self.unpin(transaction)
+        self._owners.pop(id(conn), None)
+        session.pool.release(conn, discard=discard)
+    
+    def pin(self, transaction: PinnedTransaction):
+        self._pinned[id(transaction.conn)] = transaction
+    
+    def unpin(self, transaction: PinnedTransaction):
+        self._pinned.pop(id(transaction.conn), None)
+    
+    @property
+    def transaction(self) -> Optional[PinnedTransaction]:
+        """当前工具调用所在的显式事务"""
+        return current_transaction.get()
+    
+    @contextmanager
+    def get_connection(self, read_only: bool = False):
+        """从当前目标获取数据库连接的上下文管理器"""
+        session, conn = self.acquire(read_only)
+        discard = False
+        try:
+            yield conn
+        except Error as e:
+            # 连接已断开，归还时直接关闭
+            discard = is_lost_connection(e)
+            raise
         finally:
-            if self.connection and self.connection.is_connected():
-                self.connection.close()
+            self.release(session, conn, discard=discard)
+    
+    def execute(self, conn, sql: str, params: Optional[List[Any]] = None, dictionary: bool = False):
+        """执行语句，返回 (cursor, prepared)
+
+        带参数的语句在重复出现后走服务器端预处理语句，游标由连接的语句缓存持有，
+        调用方不应关闭 prepared 为 True 的游标。
+        """
+        if params is not None:
+            session = self._owners.get(id(conn))
+            cursor = session.pool.statement_cache(conn).cursor_for(sql) if session else None
+            if cursor is not None:
+                with phase("execute"):
+                    cursor.execute(sql, tuple(params))
+                return cursor, True
+        cursor = conn.cursor(dictionary=dictionary)
+        with phase("execute"):
+            cursor.execute(sql, tuple(params) if params is not None else None)
+        return cursor, False
+    
+    def discard(self, conn):
+        """标记连接在归还时关闭（例如结果集未读完）"""
+        session = self._owners.get(id(conn))
+        if session is not None:
+            session.pool.invalidate(conn)
+    
+    def session_of(self, conn) -> Optional[MySQLSession]:
+        """借出连接所属的会话"""
+        return self._owners.get(id(conn))
+    
+    def kill_query(self, session: MySQLSession, connection_id: int) -> bool:
+        """在会话的控制连接上执行 KILL QUERY，终止该服务器连接正在执行的语句
+
+        返回 False 表示服务器上已没有该连接（查询已结束）。控制连接断开时重连一次。
+        """
+        with self._control_lock:
+            for attempt in range(2):
+                conn = self._control.get(session)
+                try:
+                    if conn is None:
+                        conn = self._control[session] = self._connect(session.config)
+                    cursor = conn.cursor()
+                    cursor.execute(f"KILL QUERY {int(connection_id)}")
+                    cursor.close()
+                    return True
+                except Error as e:
+                    if e.errno == 1094:
+                        # Unknown thread id
+                        return False
+                    self._close_control(session)
+                    if attempt or not (is_lost_connection(e) or isinstance(e, InterfaceError)):
+                        raise
+        return False
+    
+    def _close_control(self, session: MySQLSession):
+        conn = self._control.pop(session, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    
+    def abandon_result(self, conn, cursor):
+        """不再读取剩余结果：普通连接归还时关闭；事务连接不能关闭，按批读完并丢弃剩余结果"""
+        if id(conn) in self._pinned:
+            batch_size = SERVER_CONFIG['fetch_batch_size']
+            while cursor.fetchmany(batch_size):
+                pass
+        else:
+            self.discard(conn)
+    
+    @property
+    def cache_key(self):
+        """当前目标的缓存标识 (host, port, database)，只读副本与主库共用"""
+        target = self.target
+        return target.cache_key if target else None
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """当前目标主库的连接池统计信息"""
+        pool = self.pool
+        return pool.stats() if pool else {}
+    
+    def close(self):
+        """关闭所有会话的连接池和控制连接"""
+        with self._control_lock:
+            for session in list(self._control):
+                self._close_control(session)
+        with self._lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+            self.targets.clear()
+            self.default_target = None
 
 
 class MySQLMCPServer:
@@ -66,6 +427,101 @@ class MySQLMCPServer:
     def __init__(self):
         self.connection_manager = MySQLConnectionManager()
         self.dev_warning_shown = False
+        # 阻塞的数据库调用在有界线程池中执行，避免阻塞事件循环
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.connection_manager.pool_size,
+            thread_name_prefix="mysql-mcp"
+        )
+        self.query_timeout = SERVER_CONFIG['query_timeout']
+        self.schema_cache = SchemaCache(
+            max_tables=SERVER_CONFIG['schema_cache_size'],
+            ttl=SERVER_CONFIG['schema_cache_ttl']
+        )
+        self.query_cache = QueryResultCache(
+            max_entries=SERVER_CONFIG['query_cache_size'],
+            max_bytes=SERVER_CONFIG['query_cache_max_bytes'],
+            ttl=SERVER_CONFIG['query_cache_ttl']
+        )
+        self.database_stats = DatabaseStatsCache(ttl=SERVER_CONFIG['database_stats_ttl'])
+        self.cost_guard = QueryCostGuard(
+            mode=SERVER_CONFIG['cost_guard_mode'],
+            max_rows=SERVER_CONFIG['cost_guard_max_rows'],
+            max_execution_ms=SERVER_CONFIG['cost_guard_max_execution_ms'],
+            cache_size=SERVER_CONFIG['cost_guard_plan_cache_size'],
+            cache_ttl=SERVER_CONFIG['cost_guard_plan_cache_ttl']
+        )
+        self.pager = ResultPager(
+            max_cursors=SERVER_CONFIG['result_cursor_max'],
+            cursor_idle_timeout=SERVER_CONFIG['result_cursor_idle_timeout'],
+            keyset_ttl=SERVER_CONFIG['result_keyset_ttl']
+        )
+        self.transactions = TransactionRegistry(
+            max_transactions=SERVER_CONFIG['transaction_max'],
+            idle_timeout=SERVER_CONFIG['transaction_idle_timeout']
+        )
+        self._reaper: Optional[asyncio.Future] = None
+        self.running = RunningQueryRegistry()
+        self.metrics = MetricsRegistry(
+            dump_file=SERVER_CONFIG['metrics_dump_file'],
+            dump_format=SERVER_CONFIG['metrics_dump_format'],
+            dump_interval=SERVER_CONFIG['metrics_dump_interval']
+        )
+        # 所有工具处理函数统一支持 target / transaction 参数，并记录调用耗时、各阶段耗时和返回数据量
+        for attr in dir(self):
+            if attr.startswith("handle_"):
+                name = attr[len("handle_"):]
+                handler = getattr(self, attr)
+                if name not in TARGETLESS_TOOLS:
+                    handler = self._with_target(handler, transactional=name not in NON_TRANSACTIONAL_TOOLS)
+                setattr(self, attr, self.metrics.instrument(name, handler))
+    
+    def _with_target(self, handler, transactional: bool = True):
+        """为工具处理函数增加可选的 target 参数，本次调用使用该连接目标
+
+        config.py 中 TARGETS 配置的目标在第一次使用时自动连接。
+        transactional=True 时另增加 transaction 参数，本次调用在该事务固定的连接上执行。
+        """
+        @functools.wraps(handler)
+        async def wrapper(*args, target: Optional[str] = None, **kwargs):
+            # 不支持事务的工具自己可能有同名参数（如 execute_script 的 transaction=true），原样传给处理函数
+            transaction = kwargs.pop("transaction", None) if transactional else None
+            pinned = None
+            if transaction is not None:
+                pinned = self.transactions.get(transaction)
+                if pinned is None:
+                    return ToolFailure(f"{self.show_dev_warning()}❌ {self._missing_transaction(transaction)}")
+                if target is not None and target != pinned.target:
+                    return ToolFailure(f"{self.show_dev_warning()}❌ 事务 {transaction} 属于连接目标 {pinned.target or DEFAULT_TARGET}")
+                target = pinned.target
+            if target is not None and target not in self.connection_manager.targets:
+                if target not in TARGETS:
+                    known = sorted(set(self.connection_manager.targets) | set(TARGETS))
+                    return ToolFailure(f"{self.show_dev_warning()}❌ 未知的连接目标: {target}（可用: {', '.join(known) or '无'}）")
+                try:
+                    await self._open_target(target, self._target_config(TARGETS[target]),
+                                            TARGETS[target].get('replicas'))
+                except Error as e:
+                    return ToolFailure(f"{self.show_dev_warning()}❌ 连接目标 {target} 失败: {str(e)}")
+            token = current_target.set(target)
+            transaction_token = current_transaction.set(pinned)
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                current_transaction.reset(transaction_token)
+                current_target.reset(token)
+        
+        signature = inspect.signature(handler)
+        extra = [inspect.Parameter("target", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[str])]
+        if transactional:
+            extra.append(inspect.Parameter("transaction", inspect.Parameter.KEYWORD_ONLY,
+                                           default=None, annotation=Optional[str]))
+        wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), *extra])
+        return wrapper
+    
+    def _missing_transaction(self, handle: str) -> str:
+        if self.transactions.was_expired(handle):
+            return f"事务 {handle} 空闲超过 {self.transactions.idle_timeout} 秒，已自动回滚"
+        return f"事务 {handle} 不存在或已结束"
     
     def show_dev_warning(self) -> str:
         """显示开发环境警告"""
@@ -84,160 +540,809 @@ class MySQLMCPServer:
 """
         return ""
     
+    async def _run_db(self, func, *args, timeout: Optional[float] = None, retry: bool = False,
+                      write: bool = False):
+        """在线程池中执行阻塞的数据库操作，超过超时时间抛出 QueryTimeoutError
+
+        超时或调用被取消（客户端发送 notifications/cancelled）时终止本次调用登记的服务器端查询：
+        取消协程不会停止工作线程中正在执行的语句。
+        retry=True 时连接断开会按指数退避重连并重新执行，只用于可安全重复执行的读操作。
+        write=True 表示写操作：超时的错误信息说明已提交的修改不会撤销。
+        """
+        timeout = self.query_timeout if timeout is None else timeout
+        session = self.connection_manager.session
+        if retry and session is not None:
+            func, args = session.retry, (func,) + args
+        loop = asyncio.get_running_loop()
+        # 复制上下文，使工作线程中记录的阶段耗时归属到当前工具调用；
+        # 本次调用登记的运行中查询带有 call 标识，超时后据此终止
+        call = object()
+        token = current_call.set(call)
+        context = contextvars.copy_context()
+        current_call.reset(token)
+        future = loop.run_in_executor(self.executor, functools.partial(context.run, func, *args))
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            killed = await self._kill_queries(self.running.owned_by(call))
+            note = f"，已终止 {killed} 条服务器端查询" if killed else ""
+            if write:
+                note += ("。已提交的修改不会撤销，终止前已执行完的语句也可能已经提交，"
+                         "请先核对数据再决定是否重试")
+            raise QueryTimeoutError(msg=f"操作超时（超过 {timeout} 秒）{note}")
+        except asyncio.CancelledError:
+            # shield：终止查询期间再次被取消时仍完成 KILL QUERY
+            await asyncio.shield(self._kill_queries(self.running.owned_by(call)))
+            raise
+    
+    async def _kill_queries(self, queries: List[RunningQuery]) -> int:
+        """在控制连接上终止查询，返回成功终止的数量
+
+        使用默认线程池而不是数据库线程池：后者可能正被这些查询占满。
+        """
+        loop = asyncio.get_running_loop()
+        killed = 0
+        for query in queries:
+            # 先标记，语句之间检查该标记的批量写操作和脚本不再执行后续语句
+            self.running.mark_cancelled(query)
+            if query.connection_id is None or query.session is None:
+                continue
+            try:
+                if await loop.run_in_executor(None, self.connection_manager.kill_query,
+                                              query.session, query.connection_id):
+                    killed += 1
+            except Error as e:
+                logger.warning(f"终止查询 {query.query_id}（连接 {query.connection_id}）失败: {e}")
+        return killed
+    
+    def _track(self, conn, sql: str):
+        """登记 conn 上正在执行的查询，供 list_running_queries / cancel_query 和超时终止使用"""
+        return self.running.track(self.connection_manager.session_of(conn), conn, sql,
+                                  current_target.get() or self.connection_manager.default_target)
+    
+    @staticmethod
+    def _check_cancelled(running: RunningQuery):
+        """多条语句的写操作在语句之间检查是否已被终止（超时或 cancel_query）"""
+        if running.cancelled:
+            raise DatabaseError(msg="操作已被终止，后续语句未执行", errno=QUERY_INTERRUPTED)
+    
     async def handle_connect_database(self, 
-                                    host: str,
+                                    host: str = "",
                                     port: int = 3306,
                                     database: str = "",
                                     username: str = "",
                                     password: str = "",
-                                    charset: str = "utf8mb4") -> str:
-        """连接数据库工具"""
+                                    charset: str = "utf8mb4",
+                                    driver: Optional[str] = None,
+                                    target: Optional[str] = None,
+                                    replicas: Optional[List[str]] = None) -> str:
+        """连接数据库工具：登记为命名连接目标并设为默认目标"""
         warning = self.show_dev_warning()
+        name = target or DEFAULT_TARGET
         
-        if not all([host, database, username]):
+        if not host and name in TARGETS:
+            # 使用 config.py 中预先配置的目标
+            config = self._target_config(TARGETS[name])
+            if replicas is None:
+                replicas = TARGETS[name].get('replicas')
+        elif not all([host, database, username]):
             return f"{warning}错误：缺少必要的连接参数。请提供host、database、username和password。"
+        else:
+            config = DatabaseConfig(
+                host=host,
+                port=port,
+                database=database,
+                username=username,
+                password=password,
+                charset=charset,
+                driver=driver or SERVER_CONFIG['driver']
+            )
         
-        config = DatabaseConfig(
-            host=host,
-            port=port,
-            database=database,
-            username=username,
-            password=password,
-            charset=charset
-        )
+        try:
+            driver_name = mysql_mcp_driver.resolve_driver(config.driver)
+            connected, info, failed = await self._open_target(name, config, replicas)
+            self.connection_manager.use(name)
+            output = (f"{warning}✅ 数据库连接成功！\n连接目标: {name}\nMySQL版本: {info.get('version')}\n"
+                      f"主机: {config.host}:{config.port}\n数据库: {config.database}\n"
+                      f"驱动: {driver_name}\n字符集: {info.get('character_set')}（{info.get('collation')}）\n"
+                      f"时区: {info.get('time_zone')}\nsql_mode: {info.get('sql_mode')}")
+            if connected.replicas:
+                output += "\n只读副本: " + ", ".join(
+                    f"{session.config.host}:{session.config.port}" for session in connected.replicas
+                )
+            if failed:
+                output += "\n⚠️ 以下只读副本连接失败，已跳过: " + "; ".join(failed)
+            return output
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 数据库连接失败: {str(e)}")
+    
+    def _target_config(self, settings: Dict[str, Any]) -> DatabaseConfig:
+        """由 TARGETS 中的一项生成连接配置"""
+        fields = {key: value for key, value in settings.items() if key in DatabaseConfig.model_fields}
+        fields.setdefault('driver', SERVER_CONFIG['driver'])
+        return DatabaseConfig(**fields)
+    
+    def _replica_config(self, config: DatabaseConfig, replica: Union[str, Dict[str, Any]]) -> DatabaseConfig:
+        """只读副本配置：字符串为 host 或 host:port，字典中的项覆盖主库配置"""
+        if isinstance(replica, dict):
+            return config.model_copy(update=replica)
+        host, _, port = replica.rpartition(":") if ":" in replica else (replica, "", "")
+        return config.model_copy(update={'host': host, 'port': int(port) if port else config.port})
+    
+    async def _open_target(self, name: str, config: DatabaseConfig,
+                           replicas: Optional[List[Union[str, Dict[str, Any]]]] = None):
+        """连接主库和只读副本并登记为命名目标，返回 (目标, 主库信息, 连接失败的副本)
+
+        主库连接失败时抛出异常；副本连接失败只记录，不影响主库使用。
+        """
+        session = self.connection_manager.open_session(config)
+        info = await self._run_db(session.retry, self._load_session_info, session)
+        replica_sessions = []
+        failed = []
+        for replica in replicas or []:
+            try:
+                replica_config = self._replica_config(config, replica)
+                replica_session = self.connection_manager.open_session(replica_config)
+                await self._run_db(replica_session.retry, self._load_session_info, replica_session)
+                replica_sessions.append(replica_session)
+            except (Error, ValueError) as e:
+                logger.warning(f"连接目标 {name} 的只读副本 {replica} 连接失败: {e}")
+                failed.append(f"{replica}: {e}")
+        connected = self.connection_manager.register_target(name, session, replica_sessions)
+        if SERVER_CONFIG['schema_cache_warmup'] and self.schema_cache.get_schema(connected.cache_key) is None:
+            # 后台预热表结构缓存，不阻塞连接结果返回
+            asyncio.get_running_loop().run_in_executor(
+                self.executor, contextvars.copy_context().run, self._warm_up_schema_cache, name
+            )
+        return connected, info, failed
+    
+    def _load_session_info(self, session: MySQLSession) -> Dict[str, Any]:
+        """建立会话的第一个连接，并缓存服务器版本、sql_mode、字符集和时区"""
+        with phase("connect"):
+            return session.refresh_info()
+    
+    def _warm_up_schema_cache(self, target: str):
+        """从 information_schema 批量加载指定目标的表结构"""
+        current_target.set(target)
+        try:
+            with self.connection_manager.get_connection() as conn:
+                count = self.schema_cache.warm_up(conn, self.connection_manager.cache_key)
+            logger.info(f"表结构缓存预热完成（{target}）: {count} 张表")
+        except Error as e:
+            logger.warning(f"表结构缓存预热失败: {e}")
+    
+    async def handle_execute_query(self, query: str, max_rows: int = 1000, count_total: bool = False,
+                                   output_format: str = "table", use_cache: Optional[bool] = None,
+                                   cache_ttl: Optional[float] = None,
+                                   params: Optional[List[Any]] = None) -> str:
+        """执行SELECT查询工具（流式读取，达到max_rows后停止拉取）"""
+        warning = self.show_dev_warning()
+        
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        
+        # 安全检查：只允许单条只读语句（SELECT / WITH ... SELECT / SHOW / EXPLAIN / DESCRIBE）
+        statement = classify(query)
+        if not statement.is_read:
+            return ToolFailure(f"{warning}❌ 此工具只允许执行SELECT查询语句。如需执行写操作，请使用相应的写操作工具。")
+        if statement.multiple:
+            return ToolFailure(f"{warning}❌ 一次只能执行一条查询语句。")
+        
+        if output_format not in OUTPUT_FORMATS:
+            return ToolFailure(f"{warning}❌ 不支持的输出格式: {output_format}，可选: {', '.join(OUTPUT_FORMATS)}")
         
+        # 结果缓存（按需开启）
+        if use_cache is None:
+            use_cache = SERVER_CONFIG['query_cache_enabled']
+        cache_key = None
+        # 事务中可能读到未提交的修改，不使用结果缓存
+        if use_cache and self.query_cache.is_cacheable(query) and self.connection_manager.transaction is None:
+            cache_key = self.query_cache.make_key(
+                self.connection_manager.cache_key, query, max_rows, count_total, output_format,
+                json.dumps(params, default=str) if params is not None else None
+            )
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                return f"{warning}{cached}\n(结果来自缓存)"
+        
+        try:
+            # 代价检查（按需开启）：先 EXPLAIN 估算扫描行数，超过阈值时拒绝、限制行数或限制执行时间
+            run_query, guard_notice = query, None
+            if self.cost_guard.enabled and statement.kind == "SELECT":
+                estimate = await self._run_db(self._estimate_cost, query, params, retry=True)
+                run_query, guard_notice = self.cost_guard.apply(
+                    query, estimate, max_rows, in_transaction=self.connection_manager.transaction is not None
+                )
+                if run_query is None:
+                    return ToolFailure(f"{warning}❌ 查询被拒绝: {guard_notice}。"
+                                       f"请添加过滤条件或使用索引列，大量数据请使用 export_query 导出。")
+            
+            # 未被代价检查限制行数的SELECT结果被截断时，登记续页状态供 fetch_more 继续读取
+            # （事务中的连接不能被游标长期占用，不分页）
+            continuation = None
+            if self.cost_guard.capped(guard_notice):
+                results, truncated = await self._run_db(self._run_select, run_query, max_rows, params,
+                                                        False, True, retry=True)
+            elif statement.kind == "SELECT" and not statement.select_into and self.connection_manager.transaction is None:
+                results, truncated, continuation = await self._run_db(
+                    self._run_paged_select, statement, run_query, max_rows, params, output_format, retry=True
+                )
+            else:
+                results, truncated = await self._run_db(self._run_select, run_query, max_rows, params, retry=True)
+            
+            total_rows = None
+            if truncated and count_total and statement.kind == "SELECT":
+                total_rows = await self._run_db(self._count_rows, query, params, retry=True)
+            
+            with phase("format"):
+                output = self._format_query_result(results, truncated, total_rows, max_rows, output_format)
+                if guard_notice:
+                    output += f"\n({guard_notice})"
+            # 带续页令牌的结果不缓存：令牌对应的游标或键集状态只能使用一次，缓存命中时无法再给出令牌
+            if cache_key is not None and continuation is None:
+                self.query_cache.put(cache_key, output, statement.tables, ttl=cache_ttl)
+            if continuation is not None:
+                output += self._continuation_notice(continuation)
+                if self.pager.held_cursors():
+                    self._start_reaper()
+            return f"{warning}{output}"
+        except Error as e:
+            if e.errno == QUERY_INTERRUPTED:
+                return ToolFailure(f"{warning}❌ 查询已被终止（cancel_query）: {str(e)}")
+            return ToolFailure(f"{warning}❌ 查询执行失败: {str(e)}")
+    
+    def _continuation_notice(self, token: str) -> str:
+        return f'\n(还有更多结果，使用 fetch_more 并传入 continuation_token="{token}" 获取下一页)'
+    
+    def _run_paged_select(self, statement, query: str, max_rows: int, params: Optional[List[Any]],
+                          output_format: str):
+        """执行SELECT，结果被截断时登记续页状态，返回 (结果, 是否截断, 续页令牌)
+
+        先按原查询读取，结果只有一页时不改写、不改变行的顺序。被截断时，能确定主键的单表查询改为按主键排序的
+        键集分页重新读取第一页，否则保留游标。登记令牌时被挤出的游标在此（工作线程中）关闭。
+        """
+        if self.pager.max_cursors > 0:
+            results, truncated, held = self._run_held_select(query, max_rows, params, output_format)
+        else:
+            (results, truncated), held = self._run_select(query, max_rows, params), None
+        if not truncated:
+            return results, False, None
+        key_columns = self._keyset_columns(statement)
+        if key_columns:
+            page = KeysetPage(query, params, key_columns, current_target.get(), output_format, max_rows)
+            sql, page_params = page.page_sql(max_rows + 1)
+            try:
+                keyset_results, more = self._run_select(sql, max_rows, page_params, True)
+            except Error as e:
+                if e.errno not in KEYSET_FALLBACK_ERRORS:
+                    if held is not None:
+                        held.close()
+                    raise
+                logger.debug(f"无法按主键 {key_columns} 分页，改用持有游标: {e}")
+            else:
+                if held is not None:
+                    held.close()
+                page.advance(keyset_results.columns, keyset_results.rows)
+                return keyset_results, more, self.pager.add(page) if more else None
+        return results, True, self.pager.add(held) if held is not None else None
+    
+    def _keyset_columns(self, statement) -> Optional[List[str]]:
+        """单表、无 JOIN / GROUP / DISTINCT / ORDER / LIMIT 和聚合函数的SELECT返回主键列，否则返回 None"""
+        if len(statement.base_tables) != 1 or statement.top_level_keywords or statement.aggregate:
+            return None
+        table = next(iter(statement.base_tables))
+        if "." in table:
+            # 其他库的表，当前库中查不到准确的主键
+            return None
+        try:
+            _, indexes = self._fetch_table_structure(table)
+        except Error:
+            return None
+        primary = sorted((index for index in indexes if index['Key_name'] == 'PRIMARY'),
+                         key=lambda index: index['Seq_in_index'])
+        return [index['Column_name'] for index in primary] or None
+    
+    def _run_held_select(self, query: str, max_rows: int, params: Optional[List[Any]], output_format: str):
+        """执行SELECT，结果被截断时保留连接和游标，返回 (ResultSet, 是否截断, HeldCursor)"""
+        manager = self.connection_manager
+        session, conn = manager.acquire(read_only=True)
         try:
-            with self.connection_manager.get_connection(config) as conn:
+            with self._track(conn, query):
                 cursor = conn.cursor()
-                cursor.execute("SELECT VERSION()")
-                version = cursor.fetchone()
+                with phase("execute"):
+                    cursor.execute(query, tuple(params) if params is not None else None)
+                with phase("fetch"):
+                    rows = self._fetch_rows(cursor, max_rows + 1)
+        except Error:
+            manager.release(session, conn, discard=True)
+            raise
+        add_rows(min(len(rows), max_rows))
+        if len(rows) <= max_rows:
+            results = ResultSet(cursor.column_names, cursor.description, rows)
+            cursor.close()
+            manager.release(session, conn)
+            return results, False, None
+        held = HeldCursor(
+            cursor, cursor.column_names,
+            lambda discard: manager.release(session, conn, discard=discard),
+            current_target.get(), output_format, max_rows, offset=max_rows,
+            description=cursor.description, connection=conn, sql=query
+        )
+        held.pending = rows[max_rows:]
+        return ResultSet(held.columns, held.description, rows[:max_rows]), True, held
+    
+    def _fetch_rows(self, cursor, limit: int) -> List[Any]:
+        """按批读取至多 limit 行"""
+        batch_size = SERVER_CONFIG['fetch_batch_size']
+        rows: List[Any] = []
+        while len(rows) < limit:
+            batch = cursor.fetchmany(min(batch_size, limit - len(rows)))
+            if not batch:
+                break
+            rows.extend(batch)
+            self.running.add_rows(len(batch))
+        return rows
+    
+    def _start_reaper(self):
+        """启动后台任务，定期关闭空闲超时的持有游标、回滚空闲超时的事务（两者都没有时任务结束）"""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.ensure_future(self._reap_idle())
+    
+    async def _reap_idle(self):
+        loop = asyncio.get_running_loop()
+        while self.pager.held_cursors() or self.transactions.active():
+            await asyncio.sleep(max(1.0, min(self.pager.cursor_idle_timeout, self.transactions.idle_timeout) / 4))
+            expired = await loop.run_in_executor(self.executor, self.pager.expire)
+            if expired:
+                logger.info(f"已关闭 {expired} 个空闲超时的结果游标")
+            for transaction in await loop.run_in_executor(self.executor, self._expire_transactions):
+                logger.warning(f"事务 {transaction.handle} 空闲超过 {self.transactions.idle_timeout} 秒，已自动回滚")
+    
+    def _expire_transactions(self) -> List[PinnedTransaction]:
+        expired = self.transactions.expire()
+        for transaction in expired:
+            self._end_transaction(transaction)
+        return expired
+    
+    async def handle_fetch_more(self, continuation_token: str, max_rows: Optional[int] = None) -> str:
+        """凭 execute_query 返回的续页令牌读取下一页结果"""
+        warning = self.show_dev_warning()
+        
+        entry = self.pager.get(continuation_token)
+        if entry is None:
+            return ToolFailure(f"{warning}❌ 续页令牌无效或已过期，请重新执行查询")
+        max_rows = max_rows or entry.page_size
+        
+        # 使用令牌登记时的连接目标
+        token = current_target.set(entry.target)
+        try:
+            if entry.kind == "keyset":
+                results, more = await self._run_db(self._fetch_keyset_page, entry, max_rows, retry=True)
+            else:
+                results, more = await self._run_db(self._fetch_cursor_page, entry, max_rows)
+        except Error as e:
+            # 持有的游标出错后无法继续读取
+            if entry.kind == "cursor":
+                self.pager.pop(continuation_token)
+                # 超时后工作线程可能仍在读取该游标，close 等它结束后再归还连接，不阻塞本次返回
+                asyncio.get_running_loop().run_in_executor(self.executor, entry.close)
+            return ToolFailure(f"{warning}❌ 读取下一页失败: {str(e)}")
+        finally:
+            current_target.reset(token)
+        
+        if not more:
+            self.pager.pop(continuation_token)
+        if not results:
+            return f"{warning}没有更多结果了。"
+        
+        with phase("format"):
+            output = self._format_query_result(results, False, None, max_rows, entry.output_format)
+            first = entry.offset - len(results) + 1
+            output += f"\n(第 {first}-{entry.offset} 行)"
+            if more:
+                output += self._continuation_notice(continuation_token)
+            else:
+                output += "\n(已到结果末尾)"
+        return f"{warning}{output}"
+    
+    def _fetch_keyset_page(self, page: KeysetPage, max_rows: int):
+        """从上一页最后一行的主键之后读取下一页"""
+        with page.lock:
+            sql, params = page.page_sql(max_rows + 1)
+            results, more = self._run_select(sql, max_rows, params, True)
+            page.advance(results.columns, results.rows)
+        return results, more
+    
+    def _fetch_cursor_page(self, held: HeldCursor, max_rows: int):
+        """从持有的游标继续读取下一页，读完后归还连接
+
+        读取过程登记为运行中的查询，超时或 cancel_query 时可以终止服务器端查询。
+        """
+        with held.lock:
+            if held.closed:
+                raise InterfaceError(msg="结果游标已因空闲超时关闭，请重新执行查询")
+            rows = held.pending
+            with self._track(held.connection, held.sql), phase("fetch"):
+                rows += self._fetch_rows(held.cursor, max_rows + 1 - len(rows))
+            held.pending = rows[max_rows:]
+            results = ResultSet(held.columns, held.description, rows[:max_rows])
+            held.offset += len(results)
+            add_rows(len(results))
+            more = len(rows) > max_rows
+        if not more:
+            # close 会获取 held.lock，在锁外调用
+            held.close(exhausted=True)
+        return results, more
+    
+    def _estimate_cost(self, query: str, params: Optional[List[Any]] = None):
+        """EXPLAIN 估算查询的扫描行数（同一查询形状使用缓存）"""
+        with self.connection_manager.get_connection(read_only=True) as conn:
+            return self.cost_guard.estimate(conn, self.connection_manager.cache_key, query, params)
+    
+    def _format_query_result(self, results, truncated: bool, total_rows: Optional[int],
+                             max_rows: int, output_format: str) -> str:
+        """格式化查询结果（不含开发环境警告）"""
+        if not results:
+            return "查询成功，但没有返回任何数据。"
+        
+        # 按 cursor.description 为每列编译一次转换函数，逐行按列下标渲染元组行
+        rendered = render_rows(
+            results.columns,
+            results.rows,
+            fmt=output_format,
+            max_cell_bytes=SERVER_CONFIG['max_cell_bytes'],
+            max_total_bytes=SERVER_CONFIG['max_output_bytes'],
+            description=results.description,
+            blob_preview_bytes=SERVER_CONFIG['blob_preview_bytes'],
+        )
+        
+        parts = [f"查询成功！返回 {len(results)} 行数据：\n\n", rendered.text]
+        
+        if rendered.output_truncated:
+            parts.append(f"\n... (输出超过 {self._format_bytes(SERVER_CONFIG['max_output_bytes'])}，仅显示前 {rendered.rows_rendered} 行)")
+        elif truncated:
+            if total_rows is not None:
+                parts.append(f"\n... (显示前 {max_rows} 行，共 {total_rows} 行)")
+            else:
+                parts.append(f"\n... (结果已截断，仅显示前 {max_rows} 行；如需总行数请设置 count_total=true)")
+        if rendered.cells_truncated:
+            parts.append(f"\n({rendered.cells_truncated} 个单元格超过 {SERVER_CONFIG['max_cell_bytes']} 字节已截断)")
+        
+        return "".join(parts)
+    
+    def _run_select(self, query: str, max_rows: int, params: Optional[List[Any]] = None,
+                    limited: bool = False, kill_rest: bool = False):
+        """执行SELECT并流式读取至多 max_rows 行，返回 (ResultSet, 是否截断)
+
+        limited=True 表示查询本身已 LIMIT max_rows + 1，截断时剩余结果为空，连接可以继续使用。
+        kill_rest=True 时截断后在控制连接上 KILL QUERY，终止服务器端仍在执行的查询。
+        """
+        manager = self.connection_manager
+        with manager.get_connection(read_only=True) as conn, self._track(conn, query) as running:
+            # 非缓冲游标：结果按批从服务器读取，不会一次性加载全部行；元组行省去逐行构造字典
+            cursor, prepared = self.connection_manager.execute(conn, query, params)
+            with phase("fetch"):
+                rows, truncated = self._fetch_limited(cursor, max_rows)
+            add_rows(len(rows))
+            results = ResultSet(cursor.column_names, cursor.description, rows)
+            if truncated and limited:
+                cursor.fetchall()
+                if not prepared:
+                    cursor.close()
+            elif truncated:
+                if kill_rest and manager.transaction is None:
+                    self._kill_rest(running)
+                # 剩余结果不再读取，直接丢弃该连接，由服务器端中止发送
+                manager.abandon_result(conn, cursor)
+            elif not prepared:
                 cursor.close()
-                
-                return f"{warning}✅ 数据库连接成功！\nMySQL版本: {version[0]}\n主机: {host}:{port}\n数据库: {database}"
+            return results, truncated
+    
+    def _kill_rest(self, running: RunningQuery):
+        """终止已读够行数的查询（事务中的连接要读完剩余结果，不终止）"""
+        if running.connection_id is None or running.session is None:
+            return
+        try:
+            self.connection_manager.kill_query(running.session, running.connection_id)
         except Error as e:
-            return f"{warning}❌ 数据库连接失败: {str(e)}"
+            logger.warning(f"终止查询 {running.query_id}（连接 {running.connection_id}）失败: {e}")
     
-    async def handle_execute_query(self, query: str, max_rows: int = 1000) -> str:
-        """执行SELECT查询工具"""
+    def _fetch_limited(self, cursor, max_rows: int):
+        """按批读取至多 max_rows 行，多读一行用于判断是否截断"""
+        rows = self._fetch_rows(cursor, max_rows + 1)
+        truncated = len(rows) > max_rows
+        return rows[:max_rows], truncated
+    
+    async def handle_export_query(self, query: str, format: str = "csv", path: Optional[str] = None,
+                                  params: Optional[List[Any]] = None, max_rows: Optional[int] = None) -> str:
+        """将SELECT查询结果流式导出到本地文件，只返回文件信息"""
         warning = self.show_dev_warning()
         
-        if not self.connection_manager.connection:
-            return f"{warning}❌ 请先连接数据库"
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        
+        statement = classify(query)
+        if not statement.is_read or statement.multiple:
+            return ToolFailure(f"{warning}❌ 此工具只允许导出单条SELECT查询的结果。")
+        
+        if format not in available_formats():
+            return ToolFailure(f"{warning}❌ 不支持的导出格式: {format}，当前可用: {', '.join(available_formats())}（parquet/arrow 需要安装 pyarrow）")
         
-        # 安全检查：只允许SELECT语句
-        query_upper = query.strip().upper()
-        if not query_upper.startswith('SELECT'):
-            return f"{warning}❌ 此工具只允许执行SELECT查询语句。如需执行写操作，请使用相应的写操作工具。"
+        if max_rows is not None and max_rows < 1:
+            return ToolFailure(f"{warning}❌ max_rows 必须大于0")
         
         try:
-            with self.connection_manager.get_connection(self.connection_manager.config) as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(query)
-                results = cursor.fetchall()
-                cursor.close()
-                
-                if not results:
-                    return f"{warning}查询成功，但没有返回任何数据。"
-                
-                # 格式化结果
-                output = f"{warning}查询成功！返回 {len(results)} 行数据：\n\n"
-                
-                # 显示列名
-                if results:
-                    columns = list(results[0].keys())
-                    output += " | ".join(columns) + "\n"
-                    output += "-" * (len(" | ".join(columns))) + "\n"
-                    
-                    # 显示数据
-                    for row in results[:max_rows]:
-                        values = [str(row[col]) for col in columns]
-                        output += " | ".join(values) + "\n"
-                    
-                    if len(results) > max_rows:
-                        output += f"\n... (显示前 {max_rows} 行，共 {len(results)} 行)"
+            from datetime import datetime
+            target = resolve_export_path(SERVER_CONFIG['export_dir'], path, format,
+                                         f"export_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        except ValueError as e:
+            return ToolFailure(f"{warning}❌ {str(e)}")
+        
+        try:
+            rows, truncated, seconds = await self._run_db(
+                self._export_rows, query, target, format, params, max_rows,
+                timeout=SERVER_CONFIG['export_timeout'], retry=True
+            )
+        except (Error, *EXPORT_WRITE_ERRORS) as e:
+            # 未完成的临时文件已由 _export_rows 删除
+            return ToolFailure(f"{warning}❌ 导出失败: {str(e)}")
+        
+        size = os.path.getsize(target)
+        note = f"\n(已达到 max_rows={max_rows} 上限，剩余结果未导出)" if truncated else ""
+        return (f"{warning}✅ 导出完成！\n文件: {target}\n格式: {format}\n行数: {rows}\n"
+                f"大小: {self._format_bytes(size)}\n耗时: {seconds * 1000:.1f} ms{note}")
+    
+    def _export_rows(self, query: str, target: str, fmt: str,
+                     params: Optional[List[Any]], max_rows: Optional[int]):
+        """按批读取并写入临时文件，完成后原子替换为目标文件；返回 (行数, 是否截断, 耗时)"""
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.part"
+        batch_size = SERVER_CONFIG['fetch_batch_size']
+        rows = 0
+        truncated = False
+        
+        try:
+            with self.connection_manager.get_connection(read_only=True) as conn, self._track(conn, query):
+                cursor, prepared = self.connection_manager.execute(conn, query, params)
+                writer = open_writer(tmp_path, cursor.column_names, fmt, SERVER_CONFIG['export_buffer_bytes'],
+                                     cursor.description)
+                try:
+                    while True:
+                        limit = batch_size if max_rows is None else min(batch_size, max_rows - rows)
+                        if limit <= 0:
+                            truncated = True
+                            break
+                        with phase("fetch"):
+                            batch = cursor.fetchmany(limit)
+                        if not batch:
+                            break
+                        with phase("format"):
+                            writer.write_batch(batch)
+                        rows += len(batch)
+                        self.running.add_rows(len(batch))
+                finally:
+                    writer.close()
                 
-                return output
+                if truncated:
+                    # 剩余结果不再读取，直接丢弃该连接
+                    self.connection_manager.abandon_result(conn, cursor)
+                elif not prepared:
+                    cursor.close()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        os.replace(tmp_path, target)
+        add_rows(rows)
+        return rows, truncated, time.perf_counter() - start
+    
+    def _count_rows(self, query: str, params: Optional[List[Any]] = None) -> Optional[int]:
+        """统计查询的完整行数（仅在调用方明确要求时执行）"""
+        count_sql = f"SELECT COUNT(*) FROM ({query.strip().rstrip(';')}) AS _mcp_count"
+        try:
+            with self.connection_manager.get_connection(read_only=True) as conn, self._track(conn, count_sql):
+                cursor, prepared = self.connection_manager.execute(conn, count_sql, params)
+                rows = cursor.fetchall()
+                if not prepared:
+                    cursor.close()
+                return rows[0][0] if rows else None
         except Error as e:
-            return f"{warning}❌ 查询执行失败: {str(e)}"
+            logger.warning(f"统计总行数失败: {e}")
+            return None
     
     async def handle_describe_table(self, table_name: str) -> str:
         """获取表结构信息"""
         warning = self.show_dev_warning()
         
-        if not self.connection_manager.connection:
-            return f"{warning}❌ 请先连接数据库"
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
         
         try:
-            with self.connection_manager.get_connection(self.connection_manager.config) as conn:
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(f"DESCRIBE {table_name}")
+            columns, indexes = await self._run_db(self._fetch_table_structure, table_name, retry=True)
+            
+            lines = [f"{warning}表 {table_name} 结构信息：\n"]
+            lines.extend(self._table_structure_lines(columns, indexes))
+            return "\n".join(lines) + "\n"
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 获取表结构失败: {str(e)}")
+    
+    def _table_structure_lines(self, columns, indexes, foreign_keys=None) -> List[str]:
+        """表结构的完整文本（列信息、索引信息、外键信息）"""
+        lines = [
+            # 列信息
+            "列信息:",
+            "字段名 | 类型 | 是否为空 | 键 | 默认值 | 额外信息",
+            "-" * 60,
+        ]
+        lines.extend(
+            f"{col['Field']} | {col['Type']} | {col['Null']} | {col['Key']} | {col['Default']} | {col['Extra']}"
+            for col in columns
+        )
+        
+        # 索引信息
+        if indexes:
+            lines.append("\n索引信息:")
+            lines.extend(
+                f"索引名: {idx['Key_name']}, 列: {idx['Column_name']}, 唯一性: {'是' if idx['Non_unique'] == 0 else '否'}"
+                for idx in indexes
+            )
+        
+        # 外键信息
+        if foreign_keys:
+            lines.append("\n外键信息:")
+            lines.extend(
+                f"外键名: {fk['Constraint_name']}, 列: {fk['Column_name']} -> {fk['Referenced_table']}.{fk['Referenced_column']}"
+                f"（ON UPDATE {fk['Update_rule']}, ON DELETE {fk['Delete_rule']}）"
+                for fk in foreign_keys
+            )
+        return lines
+    
+    def _fetch_table_structure(self, table_name: str):
+        cache_key = self.connection_manager.cache_key
+        cached = self.schema_cache.get_table(cache_key, table_name)
+        if cached is not None:
+            return cached
+        
+        with self.connection_manager.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            with phase("execute"):
+                cursor.execute(f"DESCRIBE {quote_identifier(table_name)}")
+            with phase("fetch"):
                 columns = cursor.fetchall()
-                
-                cursor.execute(f"SHOW INDEX FROM {table_name}")
+            
+            with phase("execute"):
+                cursor.execute(f"SHOW INDEX FROM {quote_identifier(table_name)}")
+            with phase("fetch"):
                 indexes = cursor.fetchall()
-                cursor.close()
-                
-                output = f"{warning}表 {table_name} 结构信息：\n\n"
-                
-                # 列信息
-                output += "列信息:\n"
-                output += "字段名 | 类型 | 是否为空 | 键 | 默认值 | 额外信息\n"
-                output += "-" * 60 + "\n"
-                
-                for col in columns:
-                    output += f"{col['Field']} | {col['Type']} | {col['Null']} | {col['Key']} | {col['Default']} | {col['Extra']}\n"
-                
-                # 索引信息
-                if indexes:
-                    output += "\n索引信息:\n"
-                    for idx in indexes:
-                        output += f"索引名: {idx['Key_name']}, 列: {idx['Column_name']}, 唯一性: {'是' if idx['Non_unique'] == 0 else '否'}\n"
-                
-                return output
+            cursor.close()
+        
+        self.schema_cache.put_table(cache_key, table_name, columns, indexes)
+        return columns, indexes
+    
+    async def handle_describe_schema(self, tables: Optional[List[str]] = None,
+                                     exclude: Optional[List[str]] = None,
+                                     compact: bool = False) -> str:
+        """一次获取整个数据库（或按通配符筛选的表）的列、索引和外键"""
+        warning = self.show_dev_warning()
+        
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        
+        try:
+            schema = await self._run_db(self._fetch_schema, retry=True)
         except Error as e:
-            return f"{warning}❌ 获取表结构失败: {str(e)}"
+            return ToolFailure(f"{warning}❌ 获取数据库结构失败: {str(e)}")
+        
+        names = filter_tables(schema, tables, exclude)
+        if not names:
+            return f"{warning}没有匹配的表（共 {len(schema)} 张表）。"
+        
+        with phase("format"):
+            lines = [f"{warning}数据库结构（{len(names)}/{len(schema)} 张表）：\n"]
+            for name in names:
+                table = schema[name]
+                if compact:
+                    lines.append(self._compact_table_line(name, table))
+                else:
+                    lines.append(f"## {name}")
+                    lines.extend(self._table_structure_lines(table['columns'], table['indexes'], table['foreign_keys']))
+                    lines.append("")
+            return "\n".join(lines) + "\n"
+    
+    def _compact_table_line(self, name: str, table: Dict[str, List[Dict]]) -> str:
+        """单行表结构：表名(列 类型 [PK|UNI] [NULL], ...) 索引: ... 外键: ..."""
+        columns = []
+        for col in table['columns']:
+            flags = {'PRI': ' PK', 'UNI': ' UNI'}.get(col['Key'], '')
+            nullable = ' NULL' if col['Null'] == 'YES' else ''
+            columns.append(f"{col['Field']} {col['Type']}{flags}{nullable}")
+        line = f"{name}({', '.join(columns)})"
+        
+        indexes: Dict[str, List[str]] = {}
+        unique = set()
+        for idx in table['indexes']:
+            if idx['Key_name'] == 'PRIMARY':
+                continue
+            indexes.setdefault(idx['Key_name'], []).append(idx['Column_name'])
+            if idx['Non_unique'] == 0:
+                unique.add(idx['Key_name'])
+        if indexes:
+            line += " 索引: " + ", ".join(
+                f"{'UNIQUE ' if key in unique else ''}{key}({','.join(cols)})" for key, cols in indexes.items()
+            )
+        if table['foreign_keys']:
+            line += " 外键: " + ", ".join(
+                f"{fk['Column_name']}->{fk['Referenced_table']}.{fk['Referenced_column']}" for fk in table['foreign_keys']
+            )
+        return line
+    
+    def _fetch_schema(self):
+        cache_key = self.connection_manager.cache_key
+        cached = self.schema_cache.get_schema(cache_key)
+        if cached is not None:
+            return cached
+        
+        with self.connection_manager.get_connection() as conn:
+            with phase("execute"):
+                return self.schema_cache.load_schema(conn, cache_key)
     
     async def handle_show_tables(self) -> str:
         """显示所有表"""
         warning = self.show_dev_warning()
         
-        if not self.connection_manager.connection:
-            return f"{warning}❌ 请先连接数据库"
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
         
         try:
-            with self.connection_manager.get_connection(self.connection_manager.config) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SHOW TABLES")
-                tables = cursor.fetchall()
-                cursor.close()
-                
-                output = f"{warning}数据库中的表：\n\n"
-                for table in tables:
-                    output += f"- {table[0]}\n"
-                
-                return output
+            tables = await self._run_db(self._fetch_tables, retry=True)
+            
+            lines = [f"{warning}数据库中的表：\n"]
+            lines.extend(f"- {table}" for table in tables)
+            return "\n".join(lines) + "\n"
         except Error as e:
-            return f"{warning}❌ 获取表列表失败: {str(e)}"
+            return ToolFailure(f"{warning}❌ 获取表列表失败: {str(e)}")
+    
+    def _fetch_tables(self) -> List[str]:
+        cache_key = self.connection_manager.cache_key
+        cached = self.schema_cache.get_table_list(cache_key)
+        if cached is not None:
+            return cached
+        
+        with self.connection_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            with phase("execute"):
+                cursor.execute("SHOW TABLES")
+            with phase("fetch"):
+                tables = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+        
+        self.schema_cache.put_table_list(cache_key, tables)
+        return tables
     
-    async def handle_execute_write_operation(self, sql: str) -> str:
+    async def handle_execute_write_operation(self, sql: str, params: Optional[List[Any]] = None) -> str:
         """执行写操作工具（需要确认）"""
         warning = self.show_dev_warning()
         
-        if not self.connection_manager.connection:
-            return f"{warning}❌ 请先连接数据库"
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
         
         # 检查是否为写操作
-        write_keywords = ['INSERT', 'UPDATE', 'DELETE', 'CREATE', 'ALTER', 'DROP', 'TRUNCATE']
-        is_write_operation = any(sql.strip().upper().startswith(keyword) for keyword in write_keywords)
+        if classify(sql).multiple:
+            return ToolFailure(f"{warning}❌ 一次只能提交一条语句，多条语句请使用 batch_write_operation 的 statements 参数。")
+        if not self._is_write_operation(sql):
+            return ToolFailure(f"{warning}❌ 检测到这不是写操作语句。请确认您要执行的是INSERT、UPDATE、DELETE、CREATE、ALTER或DROP语句。")
         
-        if not is_write_operation:
-            return f"{warning}❌ 检测到这不是写操作语句。请确认您要执行的是INSERT、UPDATE、DELETE、CREATE、ALTER或DROP语句。"
+        params_line = ""
+        if params is not None:
+            params_line = f"\n参数: {json.dumps(params, ensure_ascii=False, default=str)[:200]}"
         
         # 返回确认信息
         return f"""{warning}⚠️  危险操作确认 ⚠️
 
 检测到您准备执行写操作：
-{sql[:200]}{'...' if len(sql) > 200 else ''}
+{sql[:200]}{'...' if len(sql) > 200 else ''}{params_line}
 
 此操作将修改数据库！
 请在客户端中明确确认以下内容：
@@ -248,67 +1353,720 @@ class MySQLMCPServer:
 
 如需继续，请回复 "确认执行" 并重新调用此工具。"""
     
-    async def handle_confirmed_write_operation(self, sql: str) -> str:
-        """确认执行写操作"""
+    def _is_write_operation(self, sql: str) -> bool:
+        """检查是否为单条写操作语句（包括 WITH ... UPDATE / DELETE）"""
+        statement = classify(sql)
+        return statement.is_write and not statement.multiple
+    
+    async def handle_confirmed_write_operation(self, sql: str, params: Optional[List[Any]] = None) -> str:
+        """确认执行写操作（在显式事务中执行时不提交，由 commit 工具提交）"""
         warning = self.show_dev_warning()
         
+        transaction = self.connection_manager.transaction
         try:
-            with self.connection_manager.get_connection(self.connection_manager.config) as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql)
-                affected_rows = cursor.rowcount
+            affected_rows = await self._run_db(self._execute_write, sql, params, write=True)
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 写操作执行失败: {str(e)}")
+        result = f"{warning}✅ 写操作执行成功！\n影响行数: {affected_rows}\nSQL: {sql[:100]}{'...' if len(sql) > 100 else ''}"
+        if transaction is not None:
+            result += f"\n(在事务 {transaction.handle} 中执行，commit 后生效)"
+            if classify(sql).is_ddl:
+                result += "\n⚠️ DDL语句会隐式提交事务中此前的修改"
+        return result
+    
+    def _execute_write(self, sql: str, params: Optional[List[Any]] = None) -> int:
+        transaction = self.connection_manager.transaction
+        with self.connection_manager.get_connection() as conn, self._track(conn, sql):
+            cursor, prepared = self.connection_manager.execute(conn, sql, params)
+            affected_rows = cursor.rowcount
+            if transaction is None:
                 conn.commit()
+            else:
+                transaction.statements.append(sql)
+            if not prepared:
                 cursor.close()
-                
-                return f"{warning}✅ 写操作执行成功！\n影响行数: {affected_rows}\nSQL: {sql[:100]}{'...' if len(sql) > 100 else ''}"
+        self._invalidate_caches(sql)
+        return affected_rows
+    
+    async def handle_begin_transaction(self, isolation_level: Optional[str] = None, read_only: bool = False) -> str:
+        """开启显式事务：固定一个主库连接，返回事务句柄
+
+        之后的工具调用传入 transaction=句柄 即在该连接上执行，写操作在 commit 前不提交；
+        空闲超过 transaction_idle_timeout 秒未使用的事务自动回滚。
+        """
+        warning = self.show_dev_warning()
+        
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        if isolation_level is not None:
+            isolation_level = " ".join(isolation_level.upper().replace("-", " ").replace("_", " ").split())
+            if isolation_level not in ISOLATION_LEVELS:
+                return ToolFailure(f"{warning}❌ 不支持的隔离级别: {isolation_level}，可选: {', '.join(ISOLATION_LEVELS)}")
+        # 先在登记表中占用名额，并发开启的事务也不会超过上限
+        handle = self.transactions.new_handle()
+        if not self.transactions.reserve(handle):
+            return ToolFailure(f"{warning}❌ 进行中的事务已达上限 {self.transactions.max_transactions} 个，"
+                               f"请先 commit 或 rollback 其他事务")
+        
+        try:
+            transaction = await self._run_db(self._begin_transaction, handle, isolation_level, read_only)
+        except Error as e:
+            # 超时后工作线程可能仍在开启事务：取消预留使其开启后自行回滚；已登记的事务在此回滚
+            abandoned = self.transactions.cancel(handle)
+            if abandoned is not None:
+                await asyncio.get_running_loop().run_in_executor(self.executor, self._discard_transaction, abandoned)
+            return ToolFailure(f"{warning}❌ 开启事务失败: {str(e)}")
+        self._start_reaper()
+        
+        details = [isolation_level or "默认隔离级别"]
+        if read_only:
+            details.append("只读")
+        return (f"{warning}✅ 事务已开启: {transaction.handle}（{'，'.join(details)}）\n"
+                f"后续工具调用传入 transaction=\"{transaction.handle}\" 在该事务中执行，"
+                f"完成后调用 commit 或 rollback；空闲超过 {self.transactions.idle_timeout} 秒将自动回滚")
+    
+    def _begin_transaction(self, handle: str, isolation_level: Optional[str], read_only: bool) -> PinnedTransaction:
+        """开启事务并在返回前登记；预留已被取消（调用方已超时）时回滚并归还连接"""
+        manager = self.connection_manager
+        try:
+            session, conn = manager.acquire()
+        except Error:
+            self.transactions.cancel(handle)
+            raise
+        try:
+            cursor = conn.cursor()
+            with phase("execute"):
+                if isolation_level:
+                    cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation_level}")
+                cursor.execute("START TRANSACTION READ ONLY" if read_only else "START TRANSACTION")
+            cursor.close()
         except Error as e:
-            return f"{warning}❌ 写操作执行失败: {str(e)}"
+            self.transactions.cancel(handle)
+            manager.release(session, conn, discard=is_lost_connection(e))
+            raise
+        transaction = PinnedTransaction(
+            handle, current_target.get() or manager.default_target, session, conn,
+            lambda discard: manager.release(session, conn, discard=discard),
+            read_only=read_only, isolation_level=isolation_level,
+            wait_timeout=self.query_timeout
+        )
+        manager.pin(transaction)
+        if not self.transactions.add(transaction):
+            self._discard_transaction(transaction)
+            raise InterfaceError(msg=f"事务 {handle} 开启超时，已回滚")
+        return transaction
+    
+    def _discard_transaction(self, transaction: PinnedTransaction):
+        """回滚调用方已不再等待的事务并归还连接"""
+        try:
+            transaction.finish(commit=False)
+        except Exception as e:
+            # 回滚失败时连接已被关闭，服务器端同样会回滚
+            logger.warning(f"回滚事务 {transaction.handle} 失败: {e}")
+    
+    async def handle_commit(self, transaction: str) -> str:
+        """提交显式事务并归还连接"""
+        return await self._finish_transaction(transaction, commit=True)
+    
+    async def handle_rollback(self, transaction: str) -> str:
+        """回滚显式事务并归还连接"""
+        return await self._finish_transaction(transaction, commit=False)
     
-    async def handle_get_database_info(self) -> str:
-        """获取数据库信息"""
+    async def _finish_transaction(self, handle: str, commit: bool) -> str:
         warning = self.show_dev_warning()
         
-        if not self.connection_manager.connection:
-            return f"{warning}❌ 请先连接数据库"
+        transaction = self.transactions.pop(handle)
+        if transaction is None:
+            return ToolFailure(f"{warning}❌ {self._missing_transaction(handle)}")
+        action = "提交" if commit else "回滚"
         
+        token = current_target.set(transaction.target)
         try:
-            with self.connection_manager.get_connection(self.connection_manager.config) as conn:
-                cursor = conn.cursor(dictionary=True)
-                
-                # 数据库基本信息
-                cursor.execute("SELECT VERSION() as version, DATABASE() as database, USER() as user")
-                basic_info = cursor.fetchone()
-                
-                # 表统计信息
-                cursor.execute("""
-                    SELECT 
-                        COUNT(*) as table_count,
-                        SUM(table_rows) as total_rows,
-                        SUM(data_length + index_length) as total_size
-                    FROM information_schema.tables 
-                    WHERE table_schema = DATABASE()
-                """)
-                stats = cursor.fetchone()
-                
+            await self._run_db(self._finish_pinned, transaction, commit)
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 事务{action}失败，连接已关闭，服务器端将回滚该事务: {str(e)}")
+        finally:
+            current_target.reset(token)
+        duration = time.time() - transaction.started_at
+        return (f"{warning}✅ 事务 {handle} 已{action}\n"
+                f"写语句: {len(transaction.statements)} 条，持续 {duration:.1f} 秒")
+    
+    def _finish_pinned(self, transaction: PinnedTransaction, commit: bool):
+        try:
+            self.transactions.finish(transaction, commit)
+        finally:
+            self._end_transaction(transaction)
+    
+    def _end_transaction(self, transaction: PinnedTransaction):
+        """事务结束后失效事务中修改过的表的缓存"""
+        token = current_target.set(transaction.target)
+        try:
+            for sql in transaction.statements:
+                self._invalidate_caches(sql)
+        finally:
+            current_target.reset(token)
+    
+    async def handle_batch_write_operation(self,
+                                           statements: Optional[List[str]] = None,
+                                           sql: Optional[str] = None,
+                                           rows: Optional[List[List[Any]]] = None,
+                                           chunk_size: Optional[int] = None,
+                                           confirmed: bool = False) -> str:
+        """批量写操作工具（需要确认）
+
+        两种模式：
+        - statements: 多条写操作语句，连续的单行INSERT会被合并为多行INSERT
+        - sql + rows: 参数化语句（%s占位符）加参数行数组，使用 executemany 执行
+        每个分块在一个事务中执行并提交一次。
+        """
+        warning = self.show_dev_warning()
+        
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        
+        if bool(statements) == bool(sql):
+            return ToolFailure(f"{warning}❌ 请提供 statements（语句列表）或 sql + rows（参数化语句和参数行）中的一种。")
+        if sql and not rows:
+            return ToolFailure(f"{warning}❌ 参数化模式需要提供 rows 参数行数组。")
+        
+        chunk_size = chunk_size or SERVER_CONFIG['batch_chunk_size']
+        if chunk_size < 1:
+            return ToolFailure(f"{warning}❌ chunk_size 必须大于0")
+        
+        checked = statements if statements else [sql]
+        not_write = [stmt for stmt in checked if not self._is_write_operation(stmt)]
+        if not_write:
+            return ToolFailure(f"{warning}❌ 检测到非写操作语句: {not_write[0][:100]}。请确认您要执行的是INSERT、UPDATE、DELETE、CREATE、ALTER或DROP语句。")
+        
+        if statements:
+            summary = f"{len(statements)} 条语句"
+            preview = "\n".join(stmt[:200] for stmt in statements[:5])
+            if len(statements) > 5:
+                preview += f"\n... 以及另外 {len(statements) - 5} 条语句"
+            if any(classify(stmt).is_ddl for stmt in statements):
+                preview += "\n注意：DDL语句会隐式提交，每条DDL单独作为一个分块执行，失败时无法回滚。"
+        else:
+            summary = f"参数化语句 × {len(rows)} 行"
+            preview = sql[:200] + ('...' if len(sql) > 200 else '')
+        
+        if not confirmed:
+            return f"""{warning}⚠️  危险操作确认 ⚠️
+
+检测到您准备执行批量写操作（{summary}，每块 {chunk_size} 条）：
+{preview}
+
+此操作将修改数据库！
+请在客户端中明确确认以下内容：
+1. 您理解这是不可逆的操作
+2. 您已经在开发环境中
+3. 您已经备份了重要数据
+4. 您确认要执行此操作
+
+如需继续，请回复 "确认执行" 并使用 confirmed=true 重新调用此工具。"""
+        
+        try:
+            if statements:
+                chunks, error = await self._run_db(self._execute_statement_batch, statements, chunk_size, write=True)
+            else:
+                chunks, error = await self._run_db(self._execute_parameterized_batch, sql, rows, chunk_size,
+                                                   write=True)
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 批量写操作执行失败: {str(e)}")
+        
+        total_items = sum(chunk['items'] for chunk in chunks)
+        total_affected = sum(chunk['affected_rows'] for chunk in chunks)
+        total_seconds = sum(chunk['seconds'] for chunk in chunks)
+        throughput = total_items / total_seconds if total_seconds > 0 else 0.0
+        unit = "条语句" if statements else "行"
+        
+        lines = [f"{warning}{'❌ 批量写操作部分失败' if error else '✅ 批量写操作执行成功！'}"]
+        lines.append(f"已提交分块: {len(chunks)}，每块最多 {chunk_size} {unit}")
+        lines.extend(
+            f"块 {chunk['index']}: {chunk['items']} {unit}，影响行数 {chunk['affected_rows']}，耗时 {chunk['seconds'] * 1000:.1f} ms"
+            for chunk in chunks
+        )
+        lines.append(f"总影响行数: {total_affected}")
+        lines.append(f"总耗时: {total_seconds * 1000:.1f} ms，吞吐: {throughput:.0f} {unit}/秒")
+        if error:
+            if statements:
+                failed = list(chunk_statements(statements, chunk_size))[len(chunks)]
+                failed_ddl = classify(failed[0]).is_ddl
+            else:
+                failed_ddl = classify(sql).is_ddl
+            if failed_ddl:
+                lines.append(f"失败分块 {len(chunks) + 1} 为DDL语句，DDL不能回滚（此前的分块均已提交），"
+                             f"后续分块未执行: {error}")
+            else:
+                lines.append(f"失败分块 {len(chunks) + 1} 已回滚，后续分块未执行: {error}")
+            return ToolFailure("\n".join(lines) + "\n")
+        return "\n".join(lines) + "\n"
+    
+    def _execute_statement_batch(self, statements: List[str], chunk_size: int):
+        """逐块执行语句列表，每块一个事务；DDL 会隐式提交，单独成块"""
+        chunks = []
+        with self.connection_manager.get_connection() as conn, \
+                self._track(conn, f"/* 批量写操作，共 {len(statements)} 条 */ {statements[0]}") as running:
+            cursor = conn.cursor()
+            for index, chunk in enumerate(chunk_statements(statements, chunk_size), start=1):
+                start = time.perf_counter()
+                try:
+                    self._check_cancelled(running)
+                    affected_rows = 0
+                    for stmt in merge_insert_statements(chunk, SERVER_CONFIG['batch_max_statement_bytes']):
+                        with phase("execute"):
+                            cursor.execute(stmt)
+                        affected_rows += max(cursor.rowcount, 0)
+                    conn.commit()
+                except Error as e:
+                    conn.rollback()
+                    cursor.close()
+                    return chunks, str(e)
+                finally:
+                    for stmt in chunk:
+                        self._invalidate_caches(stmt)
+                chunks.append({'index': index, 'items': len(chunk), 'affected_rows': affected_rows,
+                               'seconds': time.perf_counter() - start})
+            cursor.close()
+        return chunks, None
+    
+    def _execute_parameterized_batch(self, sql: str, rows: List[List[Any]], chunk_size: int):
+        """逐块 executemany，每块一个事务；INSERT ... VALUES 会被驱动改写为多行INSERT"""
+        if classify(sql).is_ddl:
+            # 每条DDL都会隐式提交，逐行成块使失败报告与实际提交的行一致
+            chunk_size = 1
+        chunks = []
+        try:
+            with self.connection_manager.get_connection() as conn, self._track(conn, sql) as running:
+                cursor = conn.cursor()
+                for index, chunk in enumerate(chunked(rows, chunk_size), start=1):
+                    start = time.perf_counter()
+                    try:
+                        self._check_cancelled(running)
+                        with phase("execute"):
+                            cursor.executemany(sql, [tuple(row) for row in chunk])
+                        affected_rows = max(cursor.rowcount, 0)
+                        conn.commit()
+                    except Error as e:
+                        conn.rollback()
+                        cursor.close()
+                        return chunks, str(e)
+                    chunks.append({'index': index, 'items': len(chunk), 'affected_rows': affected_rows,
+                                   'seconds': time.perf_counter() - start})
                 cursor.close()
-                
-                output = f"""{warning}数据库信息：
+            return chunks, None
+        finally:
+            # 失败前已提交的分块同样修改了数据
+            if chunks:
+                self._invalidate_caches(sql)
+    
+    async def handle_execute_script(self, script: str, transaction: bool = False,
+                                    stop_on_error: bool = True, confirmed: bool = False) -> str:
+        """执行SQL脚本工具（需要确认）
+
+        脚本按分隔符拆分（支持 DELIMITER），在同一个连接上依次执行；
+        连续的 INSERT / UPDATE / DELETE / REPLACE 合并为一次往返发送。
+        """
+        warning = self.show_dev_warning()
+        
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        
+        statements = split_script(script)
+        if not statements:
+            return ToolFailure(f"{warning}❌ 脚本中没有可执行的语句")
+        
+        if not confirmed:
+            preview = "\n".join(self._statement_preview(stmt, 200) for stmt in statements[:5])
+            if len(statements) > 5:
+                preview += f"\n... 以及另外 {len(statements) - 5} 条语句"
+            mode = "单个事务，出错时整体回滚" if transaction else (
+                "逐条提交，遇到错误停止" if stop_on_error else "逐条提交，出错的语句跳过")
+            ddl_note = ""
+            if transaction and any(classify(stmt).is_ddl for stmt in statements):
+                ddl_note = "\n注意：脚本包含DDL语句，MySQL执行DDL时会隐式提交，之前的语句无法回滚。\n"
+            return f"""{warning}⚠️  危险操作确认 ⚠️
+
+检测到您准备执行SQL脚本（{len(statements)} 条语句，{mode}）：
+{preview}
+{ddl_note}
+此操作将修改数据库！
+请在客户端中明确确认以下内容：
+1. 您理解这是不可逆的操作
+2. 您已经在开发环境中
+3. 您已经备份了重要数据
+4. 您确认要执行此操作
+
+如需继续，请回复 "确认执行" 并使用 confirmed=true 重新调用此工具。"""
+        
+        try:
+            results, round_trips, rolled_back = await self._run_db(
+                self._execute_script, statements, transaction, stop_on_error,
+                timeout=SERVER_CONFIG['script_timeout'], write=True
+            )
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 脚本执行失败: {str(e)}")
+        
+        failed = [result for result in results if result['error']]
+        if not failed:
+            lines = [f"{warning}✅ 脚本执行成功！"]
+        elif len(failed) == 1 and (transaction or stop_on_error):
+            lines = [f"{warning}❌ 脚本在第 {failed[0]['index']} 条语句处失败"]
+        else:
+            lines = [f"{warning}❌ 脚本部分执行失败（{len(failed)} 条语句出错）"]
+        lines.append(f"已执行语句: {len(results)}/{len(statements)}，往返次数: {round_trips}，"
+                     f"{'单个事务' if transaction else '逐条提交'}")
+        for result in results:
+            status = f"❌ {result['error']}" if result['error'] else f"行数 {result['rows']}"
+            pipelined = "（合并发送）" if result['pipelined'] else ""
+            lines.append(f"{result['index']}. {result['seconds'] * 1000:.1f} ms{pipelined}，{status}: "
+                         f"{self._statement_preview(result['sql'], 80)}")
+        total_rows = sum(result['rows'] for result in results if not result['error'])
+        total_seconds = sum(result['seconds'] for result in results)
+        lines.append(f"总行数: {total_rows}，总耗时: {total_seconds * 1000:.1f} ms")
+        if rolled_back:
+            lines.append("事务已回滚，脚本中的修改均未生效（DDL语句除外）")
+        if len(results) < len(statements):
+            lines.append(f"后续 {len(statements) - len(results)} 条语句未执行")
+        text = "\n".join(lines) + "\n"
+        return ToolFailure(text) if failed else text
+    
+    @staticmethod
+    def _statement_preview(sql: str, limit: int) -> str:
+        text = " ".join(sql.split())
+        return text[:limit] + ('...' if len(text) > limit else '')
+    
+    def _execute_script(self, statements: List[str], transaction: bool, stop_on_error: bool):
+        """在同一连接上执行脚本，返回 (每条语句的结果, 往返次数, 是否已回滚)"""
+        results: List[Dict[str, Any]] = []
+        round_trips = 0
+        rolled_back = False
+        with self.connection_manager.get_connection() as conn, \
+                self._track(conn, f"/* 脚本，共 {len(statements)} 条语句 */ {statements[0]}") as running:
+            cursor = conn.cursor()
+            try:
+                index = 0
+                while index < len(statements):
+                    self._check_cancelled(running)
+                    group = self._script_group(statements, index)
+                    outcome = self._run_script_group(cursor, group, index)
+                    round_trips += 1
+                    results.extend(outcome)
+                    index += len(outcome)
+                    if outcome[-1]['error'] and (transaction or stop_on_error):
+                        break
+                    if not transaction:
+                        conn.commit()
+                if transaction:
+                    if results[-1]['error']:
+                        conn.rollback()
+                        rolled_back = True
+                    else:
+                        conn.commit()
+            except Error as e:
+                if not is_lost_connection(e):
+                    conn.rollback()
+                raise
+            finally:
+                cursor.close()
+                executed = [result['sql'] for result in results]
+                for stmt in executed:
+                    self._invalidate_caches(stmt)
+                if any(classify(stmt).kind in SESSION_STATE_KINDS for stmt in executed):
+                    # USE / SET 等改变了会话状态，连接不再复用
+                    self.connection_manager.discard(conn)
+        return results, round_trips, rolled_back
+    
+    def _script_group(self, statements: List[str], start: int) -> List[str]:
+        """从 start 开始可以在一次往返中发送的语句：连续的单条DML，总长度不超过 batch_max_statement_bytes"""
+        if not SERVER_CONFIG['script_multi_statements']:
+            return statements[start:start + 1]
+        group: List[str] = []
+        size = 0
+        for stmt in statements[start:]:
+            if classify(stmt).kind not in DML_KINDS:
+                break
+            if group and size + len(stmt) > SERVER_CONFIG['batch_max_statement_bytes']:
+                break
+            group.append(stmt)
+            size += len(stmt) + 3
+        return group or statements[start:start + 1]
+    
+    def _run_script_group(self, cursor, group: List[str], start: int) -> List[Dict[str, Any]]:
+        """执行一组语句；一次发送多条时，每条语句的耗时按相邻结果到达的间隔计算"""
+        results: List[Dict[str, Any]] = []
+        pipelined = len(group) > 1
+        started = time.perf_counter()
+        try:
+            with phase("execute"):
+                counts = execute_multi(cursor, group)
+                for stmt, rows in zip(group, counts):
+                    now = time.perf_counter()
+                    results.append({'index': start + len(results) + 1, 'sql': stmt, 'rows': rows,
+                                    'seconds': now - started, 'pipelined': pipelined, 'error': None})
+                    started = now
+                # CALL 等语句可能返回多个结果集，剩余结果读完丢弃
+                for _ in counts:
+                    pass
+                for stmt in group[len(results):]:
+                    results.append({'index': start + len(results) + 1, 'sql': stmt, 'rows': 0,
+                                    'seconds': 0.0, 'pipelined': pipelined, 'error': None})
+        except Error as e:
+            if is_lost_connection(e) or e.errno == QUERY_INTERRUPTED:
+                # 连接断开或语句被终止（超时、cancel_query）时不再继续执行脚本
+                raise
+            failed = min(len(results), len(group) - 1)
+            results = results[:failed]
+            results.append({'index': start + failed + 1, 'sql': group[failed], 'rows': 0,
+                            'seconds': time.perf_counter() - started, 'pipelined': pipelined,
+                            'error': str(e)})
+        return results
+    
+    def _invalidate_caches(self, sql: str):
+        """写操作后失效查询结果缓存和表结构缓存"""
+        self.query_cache.invalidate_tables(self.connection_manager.cache_key, classify(sql).tables)
+        self._invalidate_schema_cache(sql)
+    
+    def _invalidate_schema_cache(self, sql: str):
+        """DDL执行后失效相关的表结构缓存"""
+        statement = classify(sql)
+        if not statement.is_ddl:
+            return
+        cache_key = self.connection_manager.cache_key
+        self.cost_guard.invalidate(cache_key)
+        self.database_stats.mark_stale(cache_key)
+        if statement.ddl_object and statement.ddl_object[0] in ('TABLE', 'VIEW'):
+            self.schema_cache.invalidate(cache_key, statement.ddl_object[1])
+        else:
+            # 索引、数据库级DDL或无法识别目标时，失效整个数据库的缓存
+            self.schema_cache.invalidate(cache_key)
+    
+    async def handle_get_database_info(self, table: Optional[str] = None, top_n: Optional[int] = None,
+                                       refresh: bool = False) -> str:
+        """获取数据库信息（表统计来自缓存，过期后在后台刷新）"""
+        warning = self.show_dev_warning()
+        
+        if not self.connection_manager.session:
+            return ToolFailure(f"{warning}❌ 请先连接数据库")
+        
+        top_n = SERVER_CONFIG['database_stats_top_n'] if top_n is None else top_n
+        if top_n < 0:
+            return ToolFailure(f"{warning}❌ top_n 不能小于0")
+        
+        try:
+            stats = await self._database_stats(refresh)
+            basic_info = self.connection_manager.session.info
+            pool_stats = self.connection_manager.get_pool_stats()
+            target = self.connection_manager.target
+            replicas = ", ".join(f"{session.config.host}:{session.config.port}" for session in target.replicas)
+            
+            if table:
+                table_stats = stats.table(table)
+                if table_stats is None:
+                    return ToolFailure(f"{warning}❌ 统计信息中没有表: {table}（如刚创建，可设置 refresh=true 重新统计）")
+                details = f"""
+表 {table_stats['name']}：
+- 类型: {table_stats['type']}，引擎: {table_stats['engine'] or '-'}
+- 行数（估算）: {table_stats['rows']}
+- 数据大小: {self._format_bytes(table_stats['data_size'])}
+- 索引大小: {self._format_bytes(table_stats['index_size'])}
+- 最后更新: {table_stats['update_time'] or '-'}
+"""
+            elif top_n:
+                details = f"\n占用空间最大的 {min(top_n, stats.table_count)} 张表：\n" + "".join(
+                    f"- {item['name']}: 约 {item['rows']} 行，数据 {self._format_bytes(item['data_size'])}，"
+                    f"索引 {self._format_bytes(item['index_size'])}\n"
+                    for item in stats.top(top_n)
+                )
+            else:
+                details = ""
+            
+            refreshing = "，后台刷新中" if self.database_stats.is_refreshing(self.connection_manager.cache_key) else ""
+            output = f"""{warning}数据库信息：
 
 基本连接信息：
+- 连接目标: {target.name}（只读副本: {replicas or '无'}）
 - MySQL版本: {basic_info['version']}
 - 当前数据库: {basic_info['database']}
 - 连接用户: {basic_info['user']}
+- 字符集: {basic_info['character_set']}（{basic_info['collation']}）
+- 时区: {basic_info['time_zone']}（系统时区 {basic_info['system_time_zone']}）
+- sql_mode: {basic_info['sql_mode']}
 
-统计信息：
-- 表数量: {stats['table_count']}
-- 总行数: {stats['total_rows'] or 0}
-- 总大小: {self._format_bytes(stats['total_size'] or 0)}
+统计信息（{stats.age:.0f} 秒前统计，耗时 {stats.load_seconds * 1000:.0f} ms{refreshing}）：
+- 表数量: {stats.table_count}
+- 总行数（估算）: {stats.total_rows}
+- 总大小: {self._format_bytes(stats.total_size)}
+{details}
+连接池：
+- 大小: {pool_stats.get('size', 0)}（已打开 {pool_stats.get('open', 0)}，空闲 {pool_stats.get('idle', 0)}）
+- 命中/新建: {pool_stats.get('hits', 0)}/{pool_stats.get('misses', 0)}
+- 等待次数: {pool_stats.get('waits', 0)}，累计等待 {pool_stats.get('wait_time_total_ms', 0):.1f} ms
+- 断线重连: {self.connection_manager.session.reconnects} 次
 
 当前时间: {self._get_current_time()}
 """
-                return output
+            return output
+        except Error as e:
+            return ToolFailure(f"{warning}❌ 获取数据库信息失败: {str(e)}")
+    
+    async def _database_stats(self, refresh: bool = False):
+        """当前数据库的表统计：没有缓存或要求刷新时同步统计，过期时先返回旧统计并在后台刷新"""
+        cache_key = self.connection_manager.cache_key
+        stats = self.database_stats.get(cache_key)
+        if stats is None or refresh:
+            return await self._run_db(self._load_database_stats, retry=True)
+        if self.database_stats.is_stale(stats) and self.database_stats.begin_refresh(cache_key):
+            # 后台刷新不使用当前调用的事务连接（刷新完成前事务可能已经结束）
+            context = contextvars.copy_context()
+            context.run(current_transaction.set, None)
+            asyncio.get_running_loop().run_in_executor(
+                self.executor, context.run, self._refresh_database_stats, cache_key
+            )
+        return stats
+    
+    def _load_database_stats(self):
+        with self.connection_manager.get_connection(read_only=True) as conn:
+            with phase("execute"):
+                return self.database_stats.load(conn, self.connection_manager.cache_key)
+    
+    def _refresh_database_stats(self, cache_key):
+        """后台刷新表统计"""
+        try:
+            self._load_database_stats()
         except Error as e:
-            return f"{warning}❌ 获取数据库信息失败: {str(e)}"
+            logger.warning(f"数据库统计刷新失败: {e}")
+        finally:
+            self.database_stats.end_refresh(cache_key)
+    
+    async def handle_get_cache_stats(self) -> str:
+        """获取缓存和连接池统计信息"""
+        warning = self.show_dev_warning()
+        
+        query_stats = self.query_cache.stats()
+        schema_stats = self.schema_cache.stats()['tables']
+        classify_stats = classify_cache_info()
+        guard_stats = self.cost_guard.stats()
+        plan_stats = guard_stats['plans']
+        pool_stats = self.connection_manager.get_pool_stats()
+        
+        return f"""{warning}缓存统计：
+
+查询结果缓存（{'默认开启' if SERVER_CONFIG['query_cache_enabled'] else '按需开启，use_cache=true'}）：
+- 条目: {query_stats['entries']}/{query_stats['max_entries']}
+- 占用: {self._format_bytes(query_stats['bytes'])} / {self._format_bytes(query_stats['max_bytes'])}
+- 命中/未命中: {query_stats['hits']}/{query_stats['misses']}（命中率 {query_stats['hit_ratio']:.1%}）
+- 节省传输: {self._format_bytes(query_stats['bytes_saved'])}
+- 淘汰/失效: {query_stats['evictions']}/{query_stats['invalidations']}
+
+表结构缓存：
+- 条目: {schema_stats['entries']}/{schema_stats['max_entries']}
+- 命中/未命中: {schema_stats['hits']}/{schema_stats['misses']}（命中率 {schema_stats['hit_ratio']:.1%}）
+
+查询代价检查（模式: {guard_stats['mode']}）：
+- 执行计划缓存: {plan_stats['entries']}/{plan_stats['max_entries']}，命中/未命中 {plan_stats['hits']}/{plan_stats['misses']}
+- 拒绝/改写: {guard_stats['rejected']}/{guard_stats['rewritten']}
+
+SQL语句分类缓存：
+- 条目: {classify_stats['entries']}/{classify_stats['max_entries']}
+- 命中/未命中: {classify_stats['hits']}/{classify_stats['misses']}
+
+连接池：
+- 命中/新建: {pool_stats.get('hits', 0)}/{pool_stats.get('misses', 0)}（命中率 {pool_stats.get('hit_ratio', 0.0):.1%}）
+- 预处理语句: {pool_stats.get('prepared_statements', 0)} 个已缓存，复用 {pool_stats.get('prepared_hits', 0)} 次
+"""
+    
+    async def handle_list_targets(self) -> str:
+        """列出已连接和 config.py 中配置的连接目标"""
+        warning = self.show_dev_warning()
+        
+        manager = self.connection_manager
+        names = list(manager.targets) + [name for name in TARGETS if name not in manager.targets]
+        if not names:
+            return f"{warning}尚未连接任何数据库，也没有在 config.py 中配置 TARGETS"
+        
+        lines = [f"{warning}连接目标（默认: {manager.default_target or '无'}）：\n"]
+        for name in names:
+            target = manager.targets.get(name)
+            if target is None:
+                settings = TARGETS[name]
+                lines.append(f"{name}: {settings.get('host')}:{settings.get('port', 3306)}/{settings.get('database')}（已配置，未连接）")
+                continue
+            config = target.primary.config
+            stats = target.primary.pool.stats()
+            lines.append(f"{name}{' *' if name == manager.default_target else ''}: "
+                         f"{config.host}:{config.port}/{config.database}，"
+                         f"连接 {stats.get('open', 0)}/{stats.get('size', 0)}（空闲 {stats.get('idle', 0)}）")
+            for session in target.replicas:
+                replica_stats = session.pool.stats()
+                lines.append(f"- 只读副本 {session.config.host}:{session.config.port}，"
+                             f"连接 {replica_stats.get('open', 0)}/{replica_stats.get('size', 0)}（空闲 {replica_stats.get('idle', 0)}）")
+            for transaction in self.transactions.transactions():
+                if transaction.target == name:
+                    lines.append(f"- 事务 {transaction.handle}：写语句 {len(transaction.statements)} 条，"
+                                 f"空闲 {transaction.idle_seconds:.0f} 秒")
+        return "\n".join(lines) + "\n"
+    
+    async def handle_list_running_queries(self) -> str:
+        """列出正在执行的查询：已执行时间和已读取行数"""
+        warning = self.show_dev_warning()
+        
+        queries = self.running.queries()
+        if not queries:
+            return f"{warning}当前没有正在执行的查询"
+        lines = [f"{warning}正在执行的查询（{len(queries)} 条）：\n"]
+        for query in queries:
+            state = "，正在终止" if query.cancelled else ""
+            lines.append(f"#{query.query_id} [{query.target or '-'}] 连接 {query.connection_id}，"
+                         f"已执行 {query.elapsed:.1f} 秒，已读取 {query.rows} 行{state}: "
+                         f"{self._statement_preview(query.sql, 120)}")
+        lines.append("\n使用 cancel_query 并传入查询编号终止查询")
+        return "\n".join(lines) + "\n"
+    
+    async def handle_cancel_query(self, query_id: int) -> str:
+        """在控制连接上执行 KILL QUERY，终止正在执行的查询（连接保留）"""
+        warning = self.show_dev_warning()
+        
+        query = self.running.get(query_id)
+        if query is None:
+            return ToolFailure(f"{warning}❌ 查询 #{query_id} 不存在或已结束")
+        if await self._kill_queries([query]):
+            return f"{warning}✅ 已终止查询 #{query_id}（连接 {query.connection_id}，已执行 {query.elapsed:.1f} 秒）"
+        return ToolFailure(f"{warning}❌ 终止查询 #{query_id} 失败，查询可能已经结束")
+    
+    async def handle_get_server_metrics(self, format: str = "text", dump_file: Optional[str] = None) -> str:
+        """获取各工具的调用延迟、阶段耗时和返回数据量"""
+        warning = self.show_dev_warning()
+        
+        if format not in ("text", "json", "prometheus"):
+            return ToolFailure(f"{warning}❌ 不支持的指标格式: {format}，可选: text, json, prometheus")
+        
+        if dump_file:
+            try:
+                self.metrics.dump(dump_file, "prometheus" if format == "prometheus" else "json")
+            except OSError as e:
+                return ToolFailure(f"{warning}❌ 写入指标文件失败: {str(e)}")
+        
+        if format != "text":
+            return f"{warning}{self.metrics.render(format)}"
+        
+        snapshot = self.metrics.snapshot()
+        lines = [f"{warning}服务器指标（运行 {snapshot['uptime_seconds']:.0f} 秒）：\n"]
+        if not snapshot['tools']:
+            lines.append("暂无工具调用记录")
+        for name, tool in snapshot['tools'].items():
+            latency = tool['latency_ms']
+            lines.append(f"{name}:")
+            lines.append(f"- 调用/失败: {tool['calls']}/{tool['errors']}")
+            lines.append(f"- 延迟: 平均 {latency['avg']:.1f} ms，p50 ≤{latency['p50']:g} ms，"
+                         f"p95 ≤{latency['p95']:g} ms，p99 ≤{latency['p99']:g} ms")
+            if tool['phases_ms']:
+                lines.append("- 阶段平均耗时: " + "，".join(
+                    f"{phase_name} {stats['avg']:.2f} ms" for phase_name, stats in tool['phases_ms'].items()
+                ))
+            lines.append(f"- 返回: {tool['rows']} 行，{self._format_bytes(tool['bytes'])}")
+        if dump_file:
+            lines.append(f"\n指标已写入: {dump_file}")
+        return "\n".join(lines) + "\n"
     
     def _format_bytes(self, bytes_value: int) -> str:
         """格式化字节大小"""
@@ -329,35 +2087,60 @@ server = MySQLMCPServer()
 
 
 def main():
-    """简单的MCP服务器主函数"""
-    print("🟢 MySQL MCP服务器启动中...")
-    print("⚠️  此工具仅应在开发环境中使用！")
-    print()
-    print("📋 可用工具:")
-    print("  - connect_database: 连接MySQL数据库")
-    print("  - execute_query: 执行SELECT查询")
-    print("  - describe_table: 查看表结构")
-    print("  - show_tables: 显示所有表")
-    print("  - execute_write_operation: 执行写操作（需确认）")
-    print("  - confirmed_write_operation: 确认执行写操作")
-    print("  - get_database_info: 获取数据库信息")
-    print()
-    print("💡 使用说明:")
-    print("  1. 使用MCP客户端连接此服务器")
-    print("  2. 先使用connect_database工具连接数据库")
-    print("  3. 然后使用其他工具进行数据库操作")
-    print()
-    print("🛑 按 Ctrl+C 停止服务器")
-    print("-" * 50)
+    """MCP服务器主函数：通过标准输入输出收发JSON-RPC消息"""
+    # 标准输出用于MCP协议消息，提示信息一律写到标准错误
+    print("🟢 MySQL MCP服务器启动中...", file=sys.stderr)
+    print("⚠️  此工具仅应在开发环境中使用！", file=sys.stderr)
+    print(file=sys.stderr)
+    print("📋 可用工具:", file=sys.stderr)
+    print("  - connect_database: 连接MySQL数据库", file=sys.stderr)
+    print("  - execute_query: 执行SELECT查询", file=sys.stderr)
+    print("  - fetch_more: 凭续页令牌读取查询的下一页", file=sys.stderr)
+    print("  - describe_table: 查看表结构", file=sys.stderr)
+    print("  - describe_schema: 一次查看整个数据库的结构", file=sys.stderr)
+    print("  - show_tables: 显示所有表", file=sys.stderr)
+    print("  - execute_write_operation: 执行写操作（需确认）", file=sys.stderr)
+    print("  - confirmed_write_operation: 确认执行写操作", file=sys.stderr)
+    print("  - batch_write_operation: 批量写操作（需确认）", file=sys.stderr)
+    print("  - execute_script: 执行SQL脚本（需确认）", file=sys.stderr)
+    print("  - begin_transaction / commit / rollback: 显式事务（其他工具用 transaction 参数加入事务）", file=sys.stderr)
+    print("  - export_query: 导出查询结果到文件", file=sys.stderr)
+    print("  - get_database_info: 获取数据库信息", file=sys.stderr)
+    print("  - get_cache_stats: 查看缓存统计", file=sys.stderr)
+    print("  - get_server_metrics: 查看工具调用性能指标", file=sys.stderr)
+    print("  - list_running_queries / cancel_query: 查看和终止正在执行的查询", file=sys.stderr)
+    print("  - list_targets: 列出连接目标（所有数据库工具都可用 target 参数指定目标）", file=sys.stderr)
+    print(file=sys.stderr)
+    print("💡 使用说明:", file=sys.stderr)
+    print("  1. 使用MCP客户端连接此服务器", file=sys.stderr)
+    print("  2. 先使用connect_database工具连接数据库", file=sys.stderr)
+    print("  3. 然后使用其他工具进行数据库操作", file=sys.stderr)
+    print(file=sys.stderr)
+    print("🛑 按 Ctrl+C 停止服务器", file=sys.stderr)
+    print("-" * 50, file=sys.stderr)
+    
+    from mysql_mcp_tools import TOOLS, TOOL_HANDLERS
+    from mysql_mcp_transport import StdioMCPServer
     
+    transport = StdioMCPServer(
+        TOOLS,
+        TOOL_HANDLERS,
+        max_concurrency=SERVER_CONFIG['transport_max_concurrency'],
+        max_message_bytes=SERVER_CONFIG['transport_max_message_bytes']
+    )
     try:
-        # 保持服务器运行
-        import time
-        while True:
-            time.sleep(1)
+        asyncio.run(transport.serve())
     except KeyboardInterrupt:
-        print("\n👋 MySQL MCP服务器已停止")
+        pass
+    finally:
+        print("\n👋 MySQL MCP服务器已停止", file=sys.stderr)
+        server.pager.close()
+        server.transactions.close()
+        server.executor.shutdown(wait=False)
+        server.connection_manager.close()
 
 
 if __name__ == "__main__":
-    main()
+    # 工具分发表绑定的是 mysql_mcp_server 模块中的实例，以脚本运行时改用该模块，避免出现两个服务器实例
+    import mysql_mcp_server
+    mysql_mcp_server.main()
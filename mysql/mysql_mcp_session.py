@@ -0,0 +1,133 @@
+"""
+MySQL MCP数据库会话
+每个数据库配置一个长期会话：持有连接池，缓存服务器版本、sql_mode、字符集和时区，
+连接断开（server has gone away 等）时按指数退避重连；
+多个会话可组成命名连接目标（一个主库加若干只读副本）
+"""
+
+import time
+import logging
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from mysql.connector import Error
+
+from mysql_mcp_pool import MySQLConnectionPool
+
+logger = logging.getLogger("mysql-mcp-server")
+
+T = TypeVar("T")
+
+# 2006: server has gone away，2013 / 2055: 查询过程中连接断开
+LOST_CONNECTION_ERRORS = frozenset({2006, 2013, 2055})
+
+# 可以通过重连恢复的错误（另加 2003: 无法连接，服务器重启期间常见）
+RETRYABLE_ERRORS = LOST_CONNECTION_ERRORS | {2003}
+
+
+# 当前工具调用指定的连接目标名，None 表示默认目标
+current_target: ContextVar[Optional[str]] = ContextVar("mysql_mcp_target", default=None)
+
+
+def is_lost_connection(error: Exception) -> bool:
+    return isinstance(error, Error) and error.errno in LOST_CONNECTION_ERRORS
+
+
+class MySQLSession:
+    """单个数据库配置的长期会话"""
+
+    INFO_SQL = """
+        SELECT VERSION() AS version, DATABASE() AS `database`, USER() AS user,
+               @@session.sql_mode AS sql_mode, @@character_set_connection AS character_set,
+               @@collation_connection AS collation, @@session.time_zone AS time_zone,
+               @@system_time_zone AS system_time_zone
+    """
+
+    def __init__(self,
+                 config: Any,
+                 pool: MySQLConnectionPool,
+                 retries: int = 3,
+                 backoff: float = 0.2,
+                 backoff_max: float = 5.0):
+        self.config = config
+        self.pool = pool
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.info: Dict[str, Any] = {}
+        self.created_at = time.time()
+        self.reconnects = 0
+
+    @contextmanager
+    def connection(self):
+        """从会话的连接池取出连接；连接已断开时归还后直接关闭"""
+        conn = self.pool.acquire()
+        discard = False
+        try:
+            yield conn
+        except Error as e:
+            discard = is_lost_connection(e)
+            raise
+        finally:
+            self.pool.release(conn, discard=discard)
+
+    def refresh_info(self) -> Dict[str, Any]:
+        """读取并缓存服务器版本、sql_mode、字符集和时区"""
+        with self.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(self.INFO_SQL)
+            row = cursor.fetchone()
+            cursor.close()
+        self.info = dict(row or {})
+        return self.info
+
+    def retry(self, func: Callable[..., T], *args) -> T:
+        """执行 func，遇到可重连的错误时按指数退避重试
+
+        只应用于可安全重复执行的操作（读操作、元数据查询）；
+        写操作重试可能导致重复执行，调用方不应使用此方法。
+        """
+        delay = self.backoff
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except Error as e:
+                if e.errno not in RETRYABLE_ERRORS or attempt >= self.retries:
+                    raise
+                attempt += 1
+                logger.warning(f"数据库连接中断（{e.errno}），{delay:.2f} 秒后第 {attempt} 次重连: {e}")
+                # 同一时刻断开的很可能不止一个连接，空闲连接下次取出时都重新校验
+                self.pool.expire_idle()
+                self.reconnects += 1
+                time.sleep(delay)
+                delay = min(delay * 2, self.backoff_max)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class ConnectionTarget:
+    """命名连接目标：主库会话加若干只读副本会话
+
+    只读查询在副本间轮询，没有副本时使用主库；写操作和元数据查询始终使用主库。
+    缓存按主库标识，副本与主库共用同一份缓存。
+    """
+
+    def __init__(self, name: str, primary: MySQLSession, replicas: Sequence[MySQLSession] = ()):
+        self.name = name
+        self.primary = primary
+        self.replicas: List[MySQLSession] = list(replicas)
+        self._next_replica = itertools.count()
+
+    def session_for(self, read_only: bool = False) -> MySQLSession:
+        if read_only and self.replicas:
+            return self.replicas[next(self._next_replica) % len(self.replicas)]
+        return self.primary
+
+    @property
+    def cache_key(self):
+        config = self.primary.config
+        return (config.host, config.port, config.database)
@@ -0,0 +1,481 @@
+"""
+MySQL MCP SQL语句分类
+基于词法单元判断语句类型：跳过开头的注释和括号，WITH 公共表表达式取其后的主语句，
+EXPLAIN / DESCRIBE 识别被分析的语句。MySQL 会执行的注释 /*! ... */ 和 /*!50700 ... */ 不跳过，
+按其中的内容参与分类。语句类型只读取开头的少量词法单元，
+多语句检测和引用表提取在第一次用到时完整扫描一次；分类结果按SQL文本缓存。
+"""
+
+import re
+import functools
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+
+# 只读语句
+READ_KINDS = frozenset({"SELECT", "SHOW", "EXPLAIN", "DESCRIBE", "TABLE", "VALUES"})
+
+# 数据修改语句
+DML_KINDS = frozenset({"INSERT", "UPDATE", "DELETE", "REPLACE"})
+
+# 结构修改语句
+DDL_KINDS = frozenset({"CREATE", "ALTER", "DROP", "TRUNCATE", "RENAME"})
+
+# 可以出现在 WITH 之后或被 EXPLAIN 分析的语句
+_MAIN_KINDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "TABLE", "VALUES"})
+
+# 超过该长度的SQL（例如大批量INSERT）不进入缓存，避免缓存占用过多内存
+MAX_CACHED_SQL_LENGTH = 16 * 1024
+
+CLASSIFY_CACHE_SIZE = 1024
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<executable>/\*!.*?(?:\*/|$))
+    | (?P<comment>(?:--(?=\s|$)|\#)[^\n]*|/\*.*?(?:\*/|$))
+    | (?P<string>'(?:[^'\\]|\\.|'')*'?|"(?:[^"\\]|\\.|"")*"?)
+    | (?P<quoted>`(?:[^`]|``)*`?)
+    | (?P<word>[\w$@]+)
+    | (?P<punct>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# 其后跟表名的关键字
+_TABLE_KEYWORDS = frozenset({"FROM", "JOIN", "INTO", "UPDATE", "TABLE"})
+
+# 出现这些关键字时 FROM 子句中逗号分隔的表列表结束
+_CLAUSE_KEYWORDS = frozenset({
+    "WHERE", "ON", "USING", "SET", "GROUP", "ORDER", "LIMIT", "HAVING", "WINDOW", "UNION",
+    "EXCEPT", "INTERSECT", "VALUES", "VALUE", "SELECT", "FOR", "LOCK", "PARTITION", "INTO",
+    "JOIN", "INNER", "LEFT", "RIGHT", "CROSS", "NATURAL", "STRAIGHT_JOIN", "OUTFILE", "DUMPFILE",
+})
+
+# 记录在 top_level_keywords 中的关键字（决定结果能否按主键分页等）
+_SHAPE_KEYWORDS = frozenset({
+    "JOIN", "GROUP", "DISTINCT", "UNION", "EXCEPT", "INTERSECT", "LIMIT", "OFFSET", "ORDER",
+    "HAVING", "WINDOW", "FOR", "LOCK", "WITH",
+})
+
+# 聚合函数（最外层出现时结果行与表中的行不对应）
+_AGGREGATE_FUNCTIONS = frozenset({
+    "COUNT", "SUM", "AVG", "MIN", "MAX", "GROUP_CONCAT", "BIT_AND", "BIT_OR", "BIT_XOR",
+    "STD", "STDDEV", "STDDEV_POP", "STDDEV_SAMP", "VARIANCE", "VAR_POP", "VAR_SAMP",
+    "JSON_ARRAYAGG", "JSON_OBJECTAGG",
+})
+
+# mysql 客户端的 DELIMITER 命令（占一整行）
+_DELIMITER_PATTERN = re.compile(r"DELIMITER[ \t]+(\S+)[^\n]*(?:\n|$)", re.IGNORECASE)
+
+# DDL 语句的对象类型
+_DDL_OBJECTS = frozenset({
+    "TABLE", "TABLES", "VIEW", "INDEX", "DATABASE", "SCHEMA", "PROCEDURE", "FUNCTION", "TRIGGER", "EVENT",
+})
+
+# 可执行注释的开头：/*! 加可选的最低服务器版本号
+_EXECUTABLE_PREFIX = re.compile(r"/\*!\d*")
+
+Token = Tuple[str, str]
+
+_END: Token = ("", "")
+
+
+def _iter_tokens(sql: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+    """逐个产生 (类型, 文本, 结束位置)；可执行注释 /*! ... */ 展开为其中的词法单元"""
+    for match in _TOKEN_PATTERN.finditer(sql, pos, len(sql) if endpos is None else endpos):
+        kind = match.lastgroup
+        if kind == "executable":
+            body = _EXECUTABLE_PREFIX.match(sql, match.start()).end()
+            end = match.end()
+            if match.group().endswith("*/") and end - 2 >= body:
+                end -= 2
+            yield from _iter_tokens(sql, body, end)
+        else:
+            yield kind, match.group(), match.end()
+
+
+class _TokenStream:
+    """按需读取有意义的词法单元 (类型, 文本)，跳过空白和注释，支持向前看一个"""
+
+    def __init__(self, sql: str):
+        self._matches = _iter_tokens(sql)
+        self._peeked: Optional[Token] = None
+        self._peeked_end = 0
+        # 最近读取的词法单元在SQL中的结束位置
+        self.end = 0
+        # 最近读取的名称带库名前缀时为完整的 db.name，否则为 None
+        self.qualified: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Token]:
+        return self
+
+    def __next__(self) -> Token:
+        token = self.next()
+        if token is _END:
+            raise StopIteration
+        return token
+
+    def next(self) -> Token:
+        if self._peeked is not None:
+            token, self._peeked = self._peeked, None
+            self.end = self._peeked_end
+            return token
+        for kind, text, end in self._matches:
+            if kind != "space" and kind != "comment":
+                self.end = end
+                return kind, text
+        return _END
+
+    def peek(self) -> Token:
+        if self._peeked is None:
+            end = self.end
+            self._peeked = self.next()
+            self._peeked_end, self.end = self.end, end
+        return self._peeked
+
+    def word(self) -> str:
+        """读取下一个词法单元，是关键字时返回大写形式，否则返回空字符串"""
+        kind, text = self.next()
+        return text.upper() if kind == "word" else ""
+
+    def skip_parenthesized(self) -> None:
+        """跳过到与已读取的 '(' 匹配的 ')'"""
+        depth = 1
+        for kind, text in self:
+            if kind == "punct" and text == "(":
+                depth += 1
+            elif kind == "punct" and text == ")":
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def qualified_name(self, token: Token) -> Optional[str]:
+        """从 token 开始读取 name 或 db.name，返回不带库名和反引号的名称"""
+        name = _identifier(token)
+        if name is None:
+            return None
+        self.qualified = None
+        while self.peek() == ("punct", "."):
+            self.next()
+            part = _identifier(self.next())
+            if part is None:
+                break
+            self.qualified = f"{name}.{part}"
+            name = part
+        return name
+
+    def table_name(self) -> Optional[str]:
+        """下一个词法单元是表名时读取并返回（跳过 IF [NOT] EXISTS），否则不读取"""
+        if self.peek()[1].upper() == "IF":
+            while self.word() not in ("EXISTS", ""):
+                pass
+        token = self.peek()
+        if _identifier(token) is None or (token[0] == "word" and token[1].upper() in _CLAUSE_KEYWORDS):
+            return None
+        self.next()
+        return self.qualified_name(token)
+
+
+def _identifier(token: Token) -> Optional[str]:
+    """标识符文本（去掉反引号），不是标识符时返回 None"""
+    kind, text = token
+    if kind == "word" and not text.startswith("@"):
+        return text
+    if kind == "quoted":
+        return text[1:-1].replace("``", "`")
+    return None
+
+
+class StatementInfo:
+    """语句分类结果
+
+    - kind: 主语句关键字（大写），无法识别时为空字符串；DESC 记为 DESCRIBE
+    - analyzed: EXPLAIN ANALYZE 会实际执行的语句类型，其他情况为空字符串
+    - ddl_object: DDL 的对象类型和名称，例如 ("TABLE", "users")；索引DDL记为所在的表
+    """
+
+    def __init__(self, sql: str, kind: str, analyzed: str = "",
+                 ddl_object: Optional[Tuple[str, str]] = None):
+        self.sql = sql
+        self.kind = kind
+        self.analyzed = analyzed
+        self.ddl_object = ddl_object
+        self._scanned = False
+        self._tables: FrozenSet[str] = frozenset()
+        self._base_tables: FrozenSet[str] = frozenset()
+        self._top_level_keywords: FrozenSet[str] = frozenset()
+        self._multiple = False
+        self._select_into = False
+        self._aggregate = False
+
+    @property
+    def is_read(self) -> bool:
+        """只读语句（SELECT ... INTO 会写文件或变量，不算只读）"""
+        if self.kind not in READ_KINDS or self.analyzed in DML_KINDS:
+            return False
+        return not self.select_into
+
+    @property
+    def is_write(self) -> bool:
+        return self.kind in DML_KINDS or self.kind in DDL_KINDS
+
+    @property
+    def is_ddl(self) -> bool:
+        return self.kind in DDL_KINDS
+
+    @property
+    def tables(self) -> FrozenSet[str]:
+        """引用的表名（去掉库名前缀和反引号）"""
+        self._scan()
+        return self._tables
+
+    @property
+    def base_tables(self) -> FrozenSet[str]:
+        """最外层 FROM / JOIN 直接引用的表（不含子查询中的表，带库名前缀的保留为 db.table）"""
+        self._scan()
+        return self._base_tables
+
+    @property
+    def top_level_keywords(self) -> FrozenSet[str]:
+        """最外层出现的 JOIN、GROUP、DISTINCT、UNION、LIMIT、ORDER 等关键字"""
+        self._scan()
+        return self._top_level_keywords
+
+    @property
+    def aggregate(self) -> bool:
+        """最外层是否调用了聚合函数（如 SELECT COUNT(*) FROM t）"""
+        self._scan()
+        return self._aggregate
+
+    @property
+    def multiple(self) -> bool:
+        """是否包含多条语句"""
+        if ";" not in self.sql:
+            return False
+        self._scan()
+        return self._multiple
+
+    @property
+    def select_into(self) -> bool:
+        """SELECT ... INTO OUTFILE / DUMPFILE / @变量"""
+        if self.kind != "SELECT":
+            return False
+        self._scan()
+        return self._select_into
+
+    def _scan(self) -> None:
+        """完整扫描一次：提取引用表，检测多语句和 SELECT ... INTO"""
+        if self._scanned:
+            return
+        tables = set()
+        base_tables = set()
+        keywords = set()
+        multiple = False
+        select_into = False
+        aggregate = False
+        # 上一个表名来自 FROM / JOIN，逗号后可能还有表
+        table_list = False
+        depth = 0
+        tokens = _TokenStream(self.sql)
+        for kind, text in tokens:
+            if kind == "punct":
+                if text == ";":
+                    multiple = any(token != ("punct", ";") for token in tokens)
+                    break
+                if text == "(":
+                    depth += 1
+                elif text == ")":
+                    depth -= 1
+                if text == "," and table_list:
+                    name = tokens.table_name()
+                    if name is not None:
+                        tables.add(name)
+                        if depth == 0:
+                            base_tables.add(tokens.qualified or name)
+                else:
+                    table_list = False
+                continue
+            word = text.upper() if kind == "word" else ""
+            if depth == 0 and word in _SHAPE_KEYWORDS:
+                keywords.add(word)
+            elif depth == 0 and word in _AGGREGATE_FUNCTIONS and tokens.peek() == ("punct", "("):
+                aggregate = True
+            if word in _TABLE_KEYWORDS:
+                if word == "INTO" and depth == 0 and self.kind == "SELECT":
+                    select_into = True
+                name = tokens.table_name()
+                if name is not None:
+                    tables.add(name)
+                    table_list = word in ("FROM", "JOIN", "UPDATE")
+                    if depth == 0 and table_list:
+                        base_tables.add(tokens.qualified or name)
+            elif word in _CLAUSE_KEYWORDS:
+                table_list = False
+        self._tables = frozenset(tables)
+        self._base_tables = frozenset(base_tables)
+        self._top_level_keywords = frozenset(keywords)
+        self._multiple = multiple
+        self._select_into = select_into
+        self._aggregate = aggregate
+        self._scanned = True
+
+
+def _leading_kind(tokens: _TokenStream) -> str:
+    """读取主语句关键字：跳过开头的括号，WITH 取公共表表达式之后的语句"""
+    kind, text = tokens.next()
+    while text == "(":
+        kind, text = tokens.next()
+    if kind != "word":
+        return ""
+    word = text.upper()
+    if word != "WITH":
+        return "DESCRIBE" if word == "DESC" else word
+    # WITH [RECURSIVE] name [(columns)] AS (subquery) [, ...] 主语句
+    for kind, text in tokens:
+        if kind == "punct" and text == "(":
+            tokens.skip_parenthesized()
+        elif kind == "word" and text.upper() in _MAIN_KINDS:
+            return text.upper()
+    return ""
+
+
+def _analyzed_kind(tokens: _TokenStream) -> str:
+    """EXPLAIN ANALYZE 分析（并实际执行）的语句类型；其他 EXPLAIN / DESCRIBE 返回空字符串"""
+    analyze = False
+    while True:
+        kind, text = tokens.peek()
+        word = text.upper() if kind == "word" else ""
+        if word == "ANALYZE":
+            analyze = True
+        elif word in ("EXTENDED", "PARTITIONS"):
+            pass
+        elif word == "FORMAT":
+            # FORMAT = TREE / JSON / TRADITIONAL
+            tokens.next()
+            tokens.next()
+        elif analyze and (text == "(" or word in _MAIN_KINDS or word == "WITH"):
+            return _leading_kind(tokens)
+        else:
+            return ""
+        tokens.next()
+
+
+def _ddl_object(kind: str, tokens: _TokenStream) -> Optional[Tuple[str, str]]:
+    """DDL 的对象类型和名称"""
+    if kind == "TRUNCATE" and tokens.peek()[1].upper() != "TABLE":
+        name = tokens.table_name()
+        return ("TABLE", name) if name else None
+    # 跳过 OR REPLACE、TEMPORARY、UNIQUE、ALGORITHM = ...、DEFINER = ... 等修饰
+    for _ in range(16):
+        object_type = tokens.word()
+        if object_type in _DDL_OBJECTS:
+            break
+        if not object_type and tokens.peek() is _END:
+            return None
+    else:
+        return None
+    name = tokens.table_name()
+    if name is None:
+        return None
+    if object_type == "INDEX":
+        # CREATE / DROP INDEX name ON table：索引属于该表
+        for token in tokens:
+            if token[0] == "word" and token[1].upper() == "ON":
+                table = tokens.table_name()
+                return ("TABLE", table) if table else None
+        return None
+    return object_type, name
+
+
+def add_optimizer_hint(sql: str, hint: str) -> Optional[str]:
+    """在主 SELECT 关键字后插入优化器提示 /*+ hint */，不是 SELECT 语句时返回 None"""
+    tokens = _TokenStream(sql)
+    if _leading_kind(tokens) != "SELECT":
+        return None
+    head, tail = sql[:tokens.end], sql[tokens.end:]
+    if "/*!" in head:
+        # SELECT 在可执行注释中，插入的注释会提前结束该注释
+        return None
+    stripped = tail.lstrip()
+    if stripped.startswith("/*+"):
+        # 一个查询块只识别一个提示注释，合并到已有的注释中
+        return f"{head} /*+ {hint} {stripped[3:]}"
+    return f"{head} /*+ {hint} */{tail}"
+
+
+def query_shape(sql: str) -> str:
+    """查询的规范化形状：字面量替换为 ?，去掉注释和多余空白"""
+    return " ".join(
+        "?" if kind == "string" or (kind == "word" and text[0].isdigit()) else text
+        for kind, text in _TokenStream(sql)
+    )
+
+
+def _classify(sql: str) -> StatementInfo:
+    tokens = _TokenStream(sql)
+    kind = _leading_kind(tokens)
+    if kind in ("EXPLAIN", "DESCRIBE"):
+        return StatementInfo(sql, kind, analyzed=_analyzed_kind(tokens))
+    if kind in DDL_KINDS:
+        return StatementInfo(sql, kind, ddl_object=_ddl_object(kind, tokens))
+    return StatementInfo(sql, kind)
+
+
+_classify_cached = functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(_classify)
+
+
+def classify(sql: str) -> StatementInfo:
+    """对SQL语句分类，结果按SQL文本缓存（过长的SQL不缓存）"""
+    if len(sql) > MAX_CACHED_SQL_LENGTH:
+        return _classify(sql)
+    return _classify_cached(sql)
+
+
+def referenced_tables(sql: str) -> FrozenSet[str]:
+    """SQL引用的表名（去掉库名前缀和反引号）"""
+    return classify(sql).tables
+
+
+def split_script(script: str) -> List[str]:
+    """将SQL脚本拆分为单条语句（不含分隔符）
+
+    支持 mysql 客户端的 DELIMITER 命令（存储过程、触发器定义体中的分号不拆分）；
+    字符串、反引号标识符和注释中的分隔符不拆分，只有普通注释的片段被丢弃
+    （可执行注释 /*! ... */ 会被服务器执行，保留为语句）。
+    """
+    statements = []
+    delimiter = ";"
+    start = pos = 0
+    # 当前语句还没有注释和空白以外的内容
+    empty = True
+    while pos < len(script):
+        if empty:
+            match = _DELIMITER_PATTERN.match(script, pos)
+            if match:
+                delimiter = match.group(1)
+                start = pos = match.end()
+                continue
+        if script.startswith(delimiter, pos):
+            if not empty:
+                statements.append(script[start:pos].strip())
+            start = pos = pos + len(delimiter)
+            empty = True
+            continue
+        token = _TOKEN_PATTERN.match(script, pos)
+        end = token.end()
+        if token.lastgroup == "word":
+            # 分隔符可能紧跟在单词后（如 END$$）
+            found = script.find(delimiter, pos + 1, end + len(delimiter) - 1)
+            if found != -1:
+                end = found
+        if token.lastgroup not in ("space", "comment"):
+            empty = False
+        pos = end
+    if not empty:
+        statements.append(script[start:].strip())
+    return statements
+
+
+def classify_cache_info() -> dict:
+    """分类缓存的命中统计"""
+    info = _classify_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize, "max_entries": info.maxsize}
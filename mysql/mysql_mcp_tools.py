@@ -3,13 +3,14 @@ MySQL MCP工具定义
 """
 
 import mcp.types as types
-from mysql_mcp_server import server
+from mysql_mcp_server import NON_TRANSACTIONAL_TOOLS, TARGETLESS_TOOLS, server
 
-# 定义工具
-TOOLS = [
-    types.Tool(
+# 工具定义（name / description / inputSchema）
+TOOL_SPECS = [
+    dict(
         name="connect_database",
-        description="连接MySQL数据库。显示开发环境安全警告。",
+        description="连接MySQL数据库，登记为命名连接目标并设为默认目标。显示开发环境安全警告。"
+                    "只传 target 时使用 config.py 中 TARGETS 的配置。",
         inputSchema={
             "type": "object",
             "properties": {
@@ -38,14 +39,27 @@ TOOLS = [
                     "type": "string",
                     "description": "字符集，默认utf8mb4",
                     "default": "utf8mb4"
+                },
+                "driver": {
+                    "type": "string",
+                    "description": "数据库驱动：auto（默认，有C扩展时使用C扩展）、c_ext（C扩展，大结果集更快）、pure（纯Python）、memory（进程内sqlite内存库，离线测试用）"
+                },
+                "target": {
+                    "type": "string",
+                    "description": "连接目标名称，默认default；其他工具通过 target 参数使用该连接"
+                },
+                "replicas": {
+                    "type": "array",
+                    "description": "只读副本地址（host 或 host:port），账号与主库相同；SELECT查询自动分发到副本",
+                    "items": {"type": "string"}
                 }
             },
-            "required": ["host", "database", "username", "password"]
+            "required": []
         }
     ),
-    types.Tool(
+    dict(
         name="execute_query",
-        description="执行SELECT查询。只能执行查询语句，用于读取数据。",
+        description="执行SELECT查询。只能执行单条只读语句（SELECT、WITH ... SELECT、SHOW、EXPLAIN、DESCRIBE），用于读取数据。SELECT结果超过max_rows时返回续页令牌，可用fetch_more读取后续结果。",
         inputSchema={
             "type": "object",
             "properties": {
@@ -55,14 +69,55 @@ TOOLS = [
                 },
                 "max_rows": {
                     "type": "integer",
-                    "description": "最大返回行数，默认1000",
+                    "description": "最大返回行数，默认1000。达到该行数后停止读取",
                     "default": 1000
+                },
+                "count_total": {
+                    "type": "boolean",
+                    "description": "结果被截断时是否额外统计总行数（会再执行一次COUNT查询），默认false",
+                    "default": False
+                },
+                "output_format": {
+                    "type": "string",
+                    "description": "输出格式：table（管道分隔表格）、tsv、jsonl（每行一个JSON对象）、json（紧凑列式JSON），默认table",
+                    "enum": ["table", "tsv", "jsonl", "json"],
+                    "default": "table"
+                },
+                "use_cache": {
+                    "type": "boolean",
+                    "description": "是否使用查询结果缓存，默认取服务器配置query_cache_enabled"
+                },
+                "cache_ttl": {
+                    "type": "number",
+                    "description": "本次结果的缓存有效期（秒），默认取服务器配置query_cache_ttl"
+                },
+                "params": {
+                    "type": "array",
+                    "description": "查询参数，按顺序替换query中的%s占位符"
                 }
             },
             "required": ["query"]
         }
     ),
-    types.Tool(
+    dict(
+        name="fetch_more",
+        description="凭execute_query返回的续页令牌读取查询结果的下一页。单表且结果含主键的查询按主键续读，其他查询使用服务器端保留的游标（空闲超时后失效）",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "continuation_token": {
+                    "type": "string",
+                    "description": "execute_query 或上一次 fetch_more 返回的续页令牌"
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": "本页最大行数，默认与原查询的max_rows相同"
+                }
+            },
+            "required": ["continuation_token"]
+        }
+    ),
+    dict(
         name="describe_table",
         description="获取指定表的结构信息",
         inputSchema={
@@ -76,7 +131,32 @@ TOOLS = [
             "required": ["table_name"]
         }
     ),
-    types.Tool(
+    dict(
+        name="describe_schema",
+        description="一次获取整个数据库所有表（或按通配符筛选的表）的列、索引和外键，比逐个调用describe_table快得多",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tables": {
+                    "type": "array",
+                    "description": "可选，表名通配符列表（支持 * ? [abc]，不区分大小写），如 [\"order*\", \"user?\"]，默认全部表",
+                    "items": {"type": "string"}
+                },
+                "exclude": {
+                    "type": "array",
+                    "description": "可选，要排除的表名通配符列表",
+                    "items": {"type": "string"}
+                },
+                "compact": {
+                    "type": "boolean",
+                    "description": "紧凑模式：每张表输出一行（列、类型、键、索引、外键），默认false",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    ),
+    dict(
         name="show_tables",
         description="显示当前数据库中的所有表",
         inputSchema={
@@ -85,7 +165,7 @@ TOOLS = [
             "required": []
         }
     ),
-    types.Tool(
+    dict(
         name="execute_write_operation",
         description="执行写操作（INSERT、UPDATE、DELETE、CREATE、ALTER、DROP）。需要用户确认！",
         inputSchema={
@@ -94,12 +174,16 @@ TOOLS = [
                 "sql": {
                     "type": "string",
                     "description": "写操作SQL语句"
+                },
+                "params": {
+                    "type": "array",
+                    "description": "语句参数，按顺序替换sql中的%s占位符"
                 }
             },
             "required": ["sql"]
         }
     ),
-    types.Tool(
+    dict(
         name="confirmed_write_operation",
         description="确认执行写操作。只有在用户明确确认后才能执行。",
         inputSchema={
@@ -108,18 +192,259 @@ TOOLS = [
                 "sql": {
                     "type": "string",
                     "description": "确认要执行的写操作SQL语句"
+                },
+                "params": {
+                    "type": "array",
+                    "description": "语句参数，按顺序替换sql中的%s占位符"
                 }
             },
             "required": ["sql"]
         }
     ),
-    types.Tool(
+    dict(
+        name="batch_write_operation",
+        description="批量执行写操作。支持语句列表或参数化语句加参数行数组，按块提交事务。需要用户确认！",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "statements": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "写操作SQL语句列表，连续的单行INSERT会合并为多行INSERT"
+                },
+                "sql": {
+                    "type": "string",
+                    "description": "参数化写操作语句，使用%s作为占位符，需配合rows使用"
+                },
+                "rows": {
+                    "type": "array",
+                    "items": {"type": "array"},
+                    "description": "参数行数组，每一行对应sql中的占位符"
+                },
+                "chunk_size": {
+                    "type": "integer",
+                    "description": "每个事务包含的语句数或行数，默认1000"
+                },
+                "confirmed": {
+                    "type": "boolean",
+                    "description": "用户是否已明确确认执行，默认false（仅返回确认信息）",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    ),
+    dict(
+        name="begin_transaction",
+        description="开启显式事务，固定一个数据库连接并返回事务句柄。之后的查询和写操作传入transaction参数即在该事务中执行，直到commit或rollback；空闲超时的事务自动回滚",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "isolation_level": {
+                    "type": "string",
+                    "description": "可选，事务隔离级别",
+                    "enum": ["READ UNCOMMITTED", "READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE"]
+                },
+                "read_only": {
+                    "type": "boolean",
+                    "description": "是否为只读事务（START TRANSACTION READ ONLY），默认false",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    ),
+    dict(
+        name="commit",
+        description="提交begin_transaction开启的事务并归还连接",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "transaction": {
+                    "type": "string",
+                    "description": "begin_transaction 返回的事务句柄"
+                }
+            },
+            "required": ["transaction"]
+        }
+    ),
+    dict(
+        name="rollback",
+        description="回滚begin_transaction开启的事务并归还连接",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "transaction": {
+                    "type": "string",
+                    "description": "begin_transaction 返回的事务句柄"
+                }
+            },
+            "required": ["transaction"]
+        }
+    ),
+    dict(
+        name="execute_script",
+        description="执行SQL脚本（如迁移脚本）。按分隔符拆分语句，支持DELIMITER、字符串和注释，在同一连接上执行，连续的DML语句合并为一次往返发送，返回每条语句的耗时和行数。需要用户确认！",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "script": {
+                    "type": "string",
+                    "description": "SQL脚本，语句之间用分号（或DELIMITER指定的分隔符）分隔"
+                },
+                "transaction": {
+                    "type": "boolean",
+                    "description": "是否在单个事务中执行，出错时整体回滚，默认false（每条语句执行后提交）",
+                    "default": False
+                },
+                "stop_on_error": {
+                    "type": "boolean",
+                    "description": "遇到错误时是否停止执行后续语句，默认true（transaction=true时总是停止）",
+                    "default": True
+                },
+                "confirmed": {
+                    "type": "boolean",
+                    "description": "用户是否已明确确认执行，默认false（仅返回确认信息）",
+                    "default": False
+                }
+            },
+            "required": ["script"]
+        }
+    ),
+    dict(
+        name="export_query",
+        description="将SELECT查询结果流式导出到本地文件（csv、jsonl，安装pyarrow后支持parquet、arrow），只返回文件路径、行数、大小和耗时。适合需要分析大量数据的场景",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "要导出的SELECT查询语句"
+                },
+                "format": {
+                    "type": "string",
+                    "description": "导出格式",
+                    "enum": ["csv", "jsonl", "parquet", "arrow"],
+                    "default": "csv"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "可选，导出目录内的文件名，默认按时间生成"
+                },
+                "params": {
+                    "type": "array",
+                    "description": "查询参数，按顺序替换query中的%s占位符",
+                    "items": {}
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": "可选，最多导出的行数，默认不限制"
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    dict(
         name="get_database_info",
-        description="获取当前数据库的基本信息和统计信息",
+        description="获取当前数据库的基本信息和统计信息（表数量、行数、大小、最大的表）。统计信息有缓存，结果中注明统计时间",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table": {
+                    "type": "string",
+                    "description": "可选，只显示该表的统计（行数、数据和索引大小、引擎、最后更新时间）"
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "显示占用空间最大的前N张表，默认10，0为不显示"
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "是否忽略缓存立即重新统计，默认false",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    ),
+    dict(
+        name="get_cache_stats",
+        description="查看查询结果缓存、表结构缓存和连接池的命中率等统计信息",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
+    dict(
+        name="list_targets",
+        description="列出已连接和 config.py 中配置的连接目标、只读副本及连接池使用情况",
         inputSchema={
             "type": "object",
             "properties": {},
             "required": []
         }
+    ),
+    dict(
+        name="list_running_queries",
+        description="列出正在执行的查询，包括查询编号、服务器连接ID、已执行时间和已读取行数",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
+    dict(
+        name="cancel_query",
+        description="终止正在执行的查询（在单独的控制连接上执行KILL QUERY，查询所在连接保留）",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query_id": {
+                    "type": "integer",
+                    "description": "list_running_queries 返回的查询编号"
+                }
+            },
+            "required": ["query_id"]
+        }
+    ),
+    dict(
+        name="get_server_metrics",
+        description="查看各工具的调用次数、延迟分布、各阶段耗时（建连/执行/读取/格式化）和返回数据量",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "format": {
+                    "type": "string",
+                    "description": "输出格式：text（摘要）、json 或 prometheus（Prometheus文本格式）",
+                    "enum": ["text", "json", "prometheus"],
+                    "default": "text"
+                },
+                "dump_file": {
+                    "type": "string",
+                    "description": "可选，同时将指标写入该文件（prometheus格式写Prometheus文本，其余写JSON）"
+                }
+            },
+            "required": []
+        }
     )
 ]
+
+# 数据库工具统一支持 target 参数，可在显式事务中执行的工具另支持 transaction 参数；
+# 在构造 Tool 之前写入 inputSchema，不依赖 Tool 对象的属性名
+for spec in TOOL_SPECS:
+    if spec["name"] not in TARGETLESS_TOOLS:
+        spec["inputSchema"]["properties"]["target"] = {
+            "type": "string",
+            "description": "可选，连接目标名称（见 list_targets），默认使用最近一次 connect_database 的目标"
+        }
+    if spec["name"] not in NON_TRANSACTIONAL_TOOLS:
+        spec["inputSchema"]["properties"]["transaction"] = {
+            "type": "string",
+            "description": "可选，begin_transaction 返回的事务句柄，本次调用在该事务中执行"
+        }
+
+TOOLS = [types.Tool(**spec) for spec in TOOL_SPECS]
+
+# 工具分发表：工具名 -> MySQLMCPServer.handle_* 协程
+TOOL_HANDLERS = {spec["name"]: getattr(server, f"handle_{spec['name']}") for spec in TOOL_SPECS}
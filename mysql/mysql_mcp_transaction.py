@@ -0,0 +1,204 @@
+"""
+MySQL MCP显式事务
+begin_transaction 从连接池取出一个主库连接并开启事务，返回事务句柄；
+之后带该句柄的工具调用都在这个连接上执行，直到 commit / rollback。
+空闲超过 idle_timeout 的事务自动回滚并归还连接，避免长期持有行锁。
+"""
+
+import time
+import secrets
+import threading
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from mysql.connector.errors import InterfaceError
+
+# 允许的事务隔离级别
+ISOLATION_LEVELS = ("READ UNCOMMITTED", "READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE")
+
+
+class PinnedTransaction:
+    """固定在一个连接上的事务；同一事务的工具调用依次使用该连接"""
+
+    def __init__(self, handle: str, target: Optional[str], session, conn,
+                 release: Callable[[bool], None], read_only: bool = False,
+                 isolation_level: Optional[str] = None, wait_timeout: Optional[float] = None):
+        self.handle = handle
+        self.target = target
+        self.session = session
+        self.conn = conn
+        self._release = release
+        self.read_only = read_only
+        self.isolation_level = isolation_level
+        # 等待同一事务中其他语句执行完的最长时间（秒），None 表示一直等待
+        self.wait_timeout = wait_timeout
+        # 事务中执行过的写语句，结束时据此失效缓存
+        self.statements: List[str] = []
+        self.started_at = time.time()
+        self.last_used = time.monotonic()
+        self.lock = threading.RLock()
+        self.closed = False
+        self.broken = False
+
+    def enter(self) -> None:
+        """占用事务连接；事务已结束或等待超过 wait_timeout 时抛出 InterfaceError"""
+        timeout = -1 if self.wait_timeout is None else self.wait_timeout
+        if not self.lock.acquire(timeout=timeout):
+            raise InterfaceError(msg=f"事务 {self.handle} 正在执行其他语句，等待超过 {self.wait_timeout} 秒")
+        if self.closed or self.broken:
+            self.lock.release()
+            reason = "连接已断开，事务已回滚" if self.broken else "事务已结束"
+            raise InterfaceError(msg=f"事务 {self.handle} 不可用: {reason}")
+
+    def exit(self, broken: bool = False) -> None:
+        if broken:
+            self.broken = True
+        self.last_used = time.monotonic()
+        self.lock.release()
+
+    def finish(self, commit: bool) -> None:
+        """提交或回滚并归还连接；提交失败时连接直接关闭（服务器端随之回滚）"""
+        with self.lock:
+            if self.closed:
+                raise InterfaceError(msg=f"事务 {self.handle} 已结束")
+            self.closed = True
+            discard = self.broken
+            try:
+                if not discard:
+                    if commit:
+                        self.conn.commit()
+                    else:
+                        self.conn.rollback()
+            except Exception:
+                discard = True
+                raise
+            finally:
+                self._release(discard)
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+
+# 当前工具调用所在的事务，None 表示不在显式事务中
+current_transaction: ContextVar[Optional[PinnedTransaction]] = ContextVar("mysql_mcp_transaction", default=None)
+
+
+class TransactionRegistry:
+    """事务句柄登记表：同时进行的事务不超过 max_transactions，空闲超时的事务自动回滚"""
+
+    def __init__(self, max_transactions: int = 2, idle_timeout: float = 60.0):
+        self.max_transactions = max_transactions
+        self.idle_timeout = idle_timeout
+        self._transactions: "OrderedDict[str, PinnedTransaction]" = OrderedDict()
+        # 已预留名额、正在开启的事务句柄
+        self._reserved: Set[str] = set()
+        # 最近因超时回滚的句柄，用于给出明确的错误提示
+        self._expired: Deque[str] = deque(maxlen=64)
+        self._lock = threading.Lock()
+        self.committed = 0
+        self.rolled_back = 0
+        self.expired = 0
+
+    @staticmethod
+    def new_handle() -> str:
+        return f"tx_{secrets.token_hex(6)}"
+
+    def reserve(self, handle: str) -> bool:
+        """为即将开启的事务预留名额，已达上限时返回 False
+
+        预留的名额计入上限，直到 add 登记事务或 cancel 取消预留。
+        """
+        with self._lock:
+            if len(self._transactions) + len(self._reserved) >= self.max_transactions:
+                return False
+            self._reserved.add(handle)
+            return True
+
+    def add(self, transaction: PinnedTransaction) -> bool:
+        """登记已开启的事务；预留已被取消（如开启超时）时返回 False，由调用方回滚"""
+        with self._lock:
+            if transaction.handle not in self._reserved:
+                return False
+            self._reserved.discard(transaction.handle)
+            self._transactions[transaction.handle] = transaction
+            return True
+
+    def cancel(self, handle: str) -> Optional[PinnedTransaction]:
+        """取消预留；事务已登记时将其移出并返回，由调用方回滚"""
+        with self._lock:
+            self._reserved.discard(handle)
+            return self._transactions.pop(handle, None)
+
+    def get(self, handle: str) -> Optional[PinnedTransaction]:
+        with self._lock:
+            return self._transactions.get(handle)
+
+    def pop(self, handle: str) -> Optional[PinnedTransaction]:
+        with self._lock:
+            return self._transactions.pop(handle, None)
+
+    def was_expired(self, handle: str) -> bool:
+        with self._lock:
+            return handle in self._expired
+
+    def finish(self, transaction: PinnedTransaction, commit: bool) -> None:
+        try:
+            transaction.finish(commit)
+        finally:
+            with self._lock:
+                if commit:
+                    self.committed += 1
+                else:
+                    self.rolled_back += 1
+
+    def expire(self) -> List[PinnedTransaction]:
+        """回滚空闲超时的事务（正在执行语句的事务跳过），返回被回滚的事务"""
+        with self._lock:
+            expired = [
+                transaction for transaction in self._transactions.values()
+                if transaction.idle_seconds > self.idle_timeout and transaction.lock.acquire(blocking=False)
+            ]
+            for transaction in expired:
+                transaction.lock.release()
+                del self._transactions[transaction.handle]
+                self._expired.append(transaction.handle)
+            self.expired += len(expired)
+        for transaction in expired:
+            try:
+                transaction.finish(commit=False)
+            except Exception:
+                # 回滚失败时连接已被关闭，服务器端同样会回滚
+                pass
+        return expired
+
+    def active(self) -> int:
+        with self._lock:
+            return len(self._transactions)
+
+    def transactions(self) -> List[PinnedTransaction]:
+        with self._lock:
+            return list(self._transactions.values())
+
+    def close(self) -> None:
+        """回滚所有未结束的事务"""
+        with self._lock:
+            transactions = list(self._transactions.values())
+            self._transactions.clear()
+        for transaction in transactions:
+            try:
+                transaction.finish(commit=False)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": len(self._transactions),
+                "starting": len(self._reserved),
+                "max": self.max_transactions,
+                "committed": self.committed,
+                "rolled_back": self.rolled_back,
+                "expired": self.expired,
+            }
@@ -0,0 +1,325 @@
+"""
+MySQL MCP stdio传输
+基于标准输入输出的 JSON-RPC 2.0 消息循环（每行一个JSON消息），
+请求并发处理并带背压，响应合并后批量写出
+"""
+
+import os
+import sys
+import json
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from mysql_mcp_metrics import ToolFailure
+
+logger = logging.getLogger("mysql-mcp-server")
+
+PROTOCOL_VERSION = "2024-11-05"
+
+# JSON-RPC 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+ToolHandler = Callable[..., Awaitable[str]]
+
+
+class JSONRPCError(Exception):
+    """可直接返回给客户端的 JSON-RPC 错误"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class _FileWriter:
+    """标准输出重定向到普通文件时的同步写出"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, data: bytes) -> None:
+        self._stream.write(data)
+
+    async def drain(self) -> None:
+        self._stream.flush()
+
+
+class ResponseWriter:
+    """响应合并写出：同一轮事件循环内产生的响应只做一次 write + drain"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+        self._pending: List[bytes] = []
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task = asyncio.ensure_future(self._flush_loop())
+
+    def send(self, message: Any) -> None:
+        self._pending.append(json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._pending:
+                data, self._pending = b"".join(self._pending), []
+                self._writer.write(data)
+                await self._writer.drain()
+            if self._closed and not self._pending:
+                return
+
+    async def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        await self._task
+
+
+class StdioMCPServer:
+    """MCP stdio 服务器
+
+    - 读取不阻塞事件循环，单条消息最大 max_message_bytes
+    - 同时执行的工具调用不超过 max_concurrency，另外最多 max_concurrency 个请求排队等待；
+      再多时暂停读取，由管道缓冲区向客户端施加背压
+    - 支持 notifications/cancelled 取消正在执行或排队的请求：通知不占用名额，读到后立即处理
+    """
+
+    def __init__(self,
+                 tools: Sequence[Any],
+                 handlers: Dict[str, ToolHandler],
+                 server_name: str = "mysql-mcp-server",
+                 server_version: str = "1.0.0",
+                 max_concurrency: int = 8,
+                 max_message_bytes: int = 16 * 1024 * 1024):
+        self.tools = [self._tool_to_dict(tool) for tool in tools]
+        self.handlers = handlers
+        self.server_name = server_name
+        self.server_version = server_version
+        self.max_concurrency = max_concurrency
+        self.max_message_bytes = max_message_bytes
+        self._in_flight: Dict[Any, asyncio.Task] = {}
+        # 工具调用的执行名额，在 serve 中创建
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def _tool_to_dict(tool: Any) -> Dict[str, Any]:
+        if isinstance(tool, dict):
+            return tool
+        return tool.model_dump(by_alias=True, exclude_none=True)
+
+    async def serve(self, reader: Optional[asyncio.StreamReader] = None,
+                    writer: Optional[asyncio.StreamWriter] = None) -> None:
+        """处理消息直到输入结束"""
+        if reader is None or writer is None:
+            reader, writer = await self._open_stdio()
+        responses = ResponseWriter(writer)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        # 读取下一行前只等待排队名额而不是执行名额：工具调用占满执行名额时仍能读到取消通知
+        pending = asyncio.Semaphore(2 * self.max_concurrency)
+        tasks = set()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    # 输入结束；最后一行可能没有换行符
+                    line = e.partial
+                    if not line.strip():
+                        break
+                except asyncio.LimitOverrunError:
+                    # 超过单条消息上限：丢弃整行
+                    responses.send(self._error(None, INVALID_REQUEST, f"消息超过 {self.max_message_bytes} 字节"))
+                    await self._skip_line(reader)
+                    continue
+                if not line.strip():
+                    continue
+
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    responses.send(self._error(None, PARSE_ERROR, f"JSON解析失败: {e}"))
+                    continue
+
+                message = self._take_notifications(message)
+                if message is None:
+                    continue
+                await pending.acquire()
+                task = asyncio.ensure_future(self._handle_message(message, responses))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: pending.release())
+                if isinstance(message, dict) and "id" in message:
+                    # 立即登记：紧随其后的取消通知可能在任务开始运行前就被读到
+                    self._register(message["id"], task)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await responses.close()
+
+    def _register(self, request_id: Any, task: asyncio.Task) -> None:
+        """登记可被 notifications/cancelled 取消的请求；任务结束（包括开始运行前被取消）时移除"""
+        self._in_flight[request_id] = task
+        task.add_done_callback(lambda _: self._unregister(request_id, task))
+
+    def _unregister(self, request_id: Any, task: asyncio.Task) -> None:
+        # 只移除自己：客户端可能复用已结束请求的 id
+        if self._in_flight.get(request_id) is task:
+            del self._in_flight[request_id]
+
+    @staticmethod
+    def _is_notification(message: Any) -> bool:
+        return isinstance(message, dict) and isinstance(message.get("method"), str) and "id" not in message
+
+    def _take_notifications(self, message: Any) -> Any:
+        """立即处理消息中的通知，返回其余要排队处理的消息；没有时返回 None"""
+        if self._is_notification(message):
+            self._notify(message)
+            return None
+        if isinstance(message, list) and message:
+            requests = []
+            for item in message:
+                if self._is_notification(item):
+                    self._notify(item)
+                else:
+                    requests.append(item)
+            return requests or None
+        return message
+
+    async def _handle_message(self, message: Any, responses: ResponseWriter) -> None:
+        if isinstance(message, list):
+            # JSON-RPC 批量请求：整批处理完后一起返回
+            if not message:
+                responses.send(self._error(None, INVALID_REQUEST, "空的批量请求"))
+                return
+            results = await asyncio.gather(*(self._dispatch(item) for item in message))
+            batch = [result for result in results if result is not None]
+            if batch:
+                responses.send(batch)
+            return
+        response = await self._dispatch(message)
+        if response is not None:
+            responses.send(response)
+
+    async def _dispatch(self, message: Any) -> Optional[Dict[str, Any]]:
+        """处理单条消息，通知消息返回 None"""
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            if isinstance(message, dict) and "method" not in message and ("result" in message or "error" in message):
+                # 客户端对服务器请求的响应，本服务器不发起请求，忽略
+                return None
+            return self._error(message.get("id") if isinstance(message, dict) else None,
+                               INVALID_REQUEST, "无效的JSON-RPC请求")
+
+        method = message["method"]
+        params = message.get("params") or {}
+        request_id = message.get("id")
+        is_notification = "id" not in message
+
+        if is_notification:
+            self._notify(message)
+            return None
+
+        self._register(request_id, asyncio.current_task())
+        try:
+            result = await self._call_method(method, params)
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except JSONRPCError as e:
+            return self._error(request_id, e.code, e.message)
+        except asyncio.CancelledError:
+            # 被客户端取消的请求不返回响应
+            return None
+        except Exception as e:
+            logger.exception(f"处理请求 {method} 失败")
+            return self._error(request_id, INTERNAL_ERROR, str(e))
+        finally:
+            self._unregister(request_id, asyncio.current_task())
+
+    async def _call_method(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if method == "initialize":
+            return {
+                "protocolVersion": params.get("protocolVersion") or PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": self.server_name, "version": self.server_version},
+            }
+        if method == "ping":
+            return {}
+        if method == "tools/list":
+            return {"tools": self.tools}
+        if method == "tools/call":
+            if self._slots is None:
+                return await self._call_tool(params.get("name"), params.get("arguments") or {})
+            # 只有工具调用占用执行名额，排队期间也可以被取消
+            async with self._slots:
+                return await self._call_tool(params.get("name"), params.get("arguments") or {})
+        raise JSONRPCError(METHOD_NOT_FOUND, f"未知方法: {method}")
+
+    async def _call_tool(self, name: Optional[str], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        handler = self.handlers.get(name)
+        if handler is None:
+            raise JSONRPCError(INVALID_PARAMS, f"未知工具: {name}")
+        if not isinstance(arguments, dict):
+            raise JSONRPCError(INVALID_PARAMS, "arguments 必须是对象")
+        try:
+            inspect.signature(handler).bind(**arguments)
+        except TypeError as e:
+            return {"content": [{"type": "text", "text": f"❌ 参数错误: {e}"}], "isError": True}
+        text = await handler(**arguments)
+        return {"content": [{"type": "text", "text": text}], "isError": isinstance(text, ToolFailure)}
+
+    def _notify(self, message: Dict[str, Any]) -> None:
+        params = message.get("params")
+        self._handle_notification(message["method"], params if isinstance(params, dict) else {})
+
+    def _handle_notification(self, method: str, params: Dict[str, Any]) -> None:
+        if method == "notifications/cancelled":
+            task = self._in_flight.get(params.get("requestId"))
+            if task is not None:
+                task.cancel()
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    @staticmethod
+    async def _skip_line(reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.LimitOverrunError as e:
+                await reader.readexactly(e.consumed)
+            except asyncio.IncompleteReadError:
+                return
+
+    async def _open_stdio(self):
+        """将标准输入输出包装为异步流"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=self.max_message_bytes)
+        protocol = asyncio.StreamReaderProtocol(reader)
+        try:
+            await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+        except (ValueError, OSError):
+            # 标准输入是普通文件等不支持的类型时，改用线程读取
+            loop.run_in_executor(None, self._feed_from_file, loop, reader)
+
+        try:
+            write_transport, write_protocol = await loop.connect_write_pipe(
+                asyncio.streams.FlowControlMixin, os.fdopen(sys.stdout.fileno(), "wb", closefd=False)
+            )
+            writer = asyncio.StreamWriter(write_transport, write_protocol, None, loop)
+        except (ValueError, OSError):
+            writer = _FileWriter(sys.stdout.buffer)
+        return reader, writer
+
+    @staticmethod
+    def _feed_from_file(loop: asyncio.AbstractEventLoop, reader: asyncio.StreamReader) -> None:
+        for chunk in iter(lambda: sys.stdin.buffer.read1(65536), b""):
+            loop.call_soon_threadsafe(reader.feed_data, chunk)
+        loop.call_soon_threadsafe(reader.feed_eof)
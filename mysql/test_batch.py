@@ -0,0 +1,70 @@
+"""
+批量写操作测试
+"""
+
+from mysql_mcp_batch import chunk_statements, chunked, merge_insert_statements
+from mysql_mcp_metrics import ToolFailure
+
+
+def test_chunked():
+    assert [list(chunk) for chunk in chunked(list(range(5)), 2)] == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 3)) == []
+
+
+def test_chunk_statements_isolates_ddl():
+    statements = ["INSERT INTO t VALUES (1)", "INSERT INTO t VALUES (2)", "INSERT INTO t VALUES (3)",
+                  "CREATE TABLE u (id INT)", "DELETE FROM t", "DROP TABLE u"]
+    assert [list(chunk) for chunk in chunk_statements(statements, 2)] == [
+        statements[0:2], statements[2:3], statements[3:4], statements[4:5], statements[5:6],
+    ]
+
+
+def test_merge_insert_statements():
+    statements = [
+        "INSERT INTO t (a, b) VALUES (1, 'x')",
+        "INSERT INTO t  (a, b)\n VALUES (2, 'y');",
+        "UPDATE t SET b = 'z'",
+        "INSERT INTO t (a, b) VALUES (3, 'w')",
+        "INSERT INTO u (a) VALUES (4)",
+    ]
+    merged = merge_insert_statements(statements)
+    assert len(merged) == 4
+    assert merged[0].count("(1, 'x')") == 1 and merged[0].count("(2, 'y')") == 1
+    assert merged[1:3] == statements[2:4]
+    assert merged[3] == "INSERT INTO u (a) VALUES (4)"
+
+
+def test_merge_insert_statements_keeps_unmergeable():
+    statements = [
+        "INSERT INTO t (a) VALUES (1) ON DUPLICATE KEY UPDATE a = 1",
+        "INSERT INTO t (a) SELECT a FROM u",
+        "INSERT INTO t (a) VALUES (1); DELETE FROM t",
+    ]
+    assert merge_insert_statements(statements) == statements
+
+
+def test_merge_insert_statements_size_limit():
+    statements = [f"INSERT INTO t (a) VALUES ({i})" for i in range(10)]
+    merged = merge_insert_statements(statements, max_bytes=30)
+    assert len(merged) > 1
+    assert all(len(statement) <= 30 for statement in merged)
+    assert sum(statement.count("(") - 1 for statement in merged) == 10
+
+
+def test_batch_with_ddl(run):
+    statements = ["CREATE TABLE t (id INT)", "INSERT INTO t VALUES (1)", "INSERT INTO t VALUES (2)",
+                  "CREATE TABLE t (id INT)", "INSERT INTO t VALUES (3)"]
+    result = run(lambda server: server.handle_batch_write_operation(statements=statements, confirmed=True))
+    assert isinstance(result, ToolFailure)
+    assert "已提交分块: 2" in result
+    assert "失败分块 3 为DDL语句" in result
+    count = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM t", output_format="tsv"))
+    assert "\n2\n" in count
+
+
+def test_batch_rollback(run):
+    result = run(lambda server: server.handle_batch_write_operation(
+        statements=["DELETE FROM reviews", "INSERT INTO missing VALUES (1)"], confirmed=True))
+    assert "失败分块 1 已回滚" in result
+    count = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM reviews", output_format="tsv"))
+    assert "\n50\n" in count
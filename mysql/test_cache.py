@@ -0,0 +1,119 @@
+"""
+缓存测试
+"""
+
+from mysql_mcp_cache import SchemaCache, TTLLRUCache
+
+CONN = ("localhost", 3306, "shop")
+
+
+def test_lru_eviction():
+    cache = TTLLRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # b 最久未使用，被淘汰
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    cache = TTLLRUCache(ttl=60)
+    cache.set("fresh", 1)
+    cache.set("stale", 2, ttl=-1)
+    assert cache.get("fresh") == 1
+    assert cache.get("stale", "missing") == "missing"
+    assert len(cache) == 1
+
+
+def test_byte_limit():
+    cache = TTLLRUCache(max_bytes=10)
+    cache.set("big", "x", size=11)
+    assert cache.get("big") is None
+    cache.set("a", "x", size=6)
+    cache.set("b", "y", size=6)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y"
+    assert cache.stats()["bytes"] == 6
+
+
+def test_replace_and_invalidate():
+    cache = TTLLRUCache()
+    cache.set("a", 1, size=4)
+    cache.set("a", 2, size=5)
+    assert cache.get("a") == 2
+    assert cache.stats()["bytes"] == 5
+    cache.set("b", 3)
+    assert cache.invalidate(lambda key, value: value > 2) == 1
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_schema_cache_table_names():
+    cache = SchemaCache()
+    cache.put_table(CONN, "`users`", [{"Field": "id"}], [])
+    assert cache.get_table(CONN, "users") == ([{"Field": "id"}], [])
+    assert cache.get_table(("localhost", 3306, "other"), "users") is None
+
+
+def test_schema_cache_invalidate():
+    cache = SchemaCache()
+    other = ("localhost", 3306, "other")
+    for conn_key in (CONN, other):
+        cache.put_table(conn_key, "users", [], [])
+        cache.put_table(conn_key, "orders", [], [])
+        cache.put_table_list(conn_key, ["orders", "users"])
+
+    cache.invalidate(CONN, "users")
+    assert cache.get_table(CONN, "users") is None
+    assert cache.get_table(CONN, "orders") is not None
+    assert cache.get_table_list(CONN) is None
+
+    cache.invalidate(CONN)
+    assert cache.get_table(CONN, "orders") is None
+    assert cache.get_table(other, "users") is not None
+    assert cache.get_table_list(other) == ["orders", "users"]
+
+
+class _Cursor:
+    def __init__(self, results):
+        self._results = list(results)
+        self._rows = None
+
+    def execute(self, sql):
+        self._rows = self._results.pop(0)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self, *results):
+        self._results = results
+
+    def cursor(self, dictionary=False):
+        return _Cursor(self._results)
+
+
+def test_schema_cache_load_schema():
+    columns = [{"Table": "users", "Field": "id"}, {"Table": "users", "Field": "name"},
+               {"Table": "orders", "Field": "id"}]
+    indexes = [{"Table": "users", "Key_name": "PRIMARY", "Column_name": "id"},
+               {"Table": "gone", "Key_name": "PRIMARY", "Column_name": "id"}]
+    foreign_keys = [{"Table": "orders", "Constraint_name": "fk_user", "Column_name": "user_id"}]
+    cache = SchemaCache()
+
+    assert cache.warm_up(_Connection(columns, indexes, foreign_keys), CONN) == 2
+    schema = cache.get_schema(CONN)
+    assert list(schema) == ["users", "orders"]
+    assert [column["Field"] for column in schema["users"]["columns"]] == ["id", "name"]
+    assert schema["users"]["indexes"] == [{"Key_name": "PRIMARY", "Column_name": "id"}]
+    assert schema["orders"]["foreign_keys"][0]["Constraint_name"] == "fk_user"
+    assert cache.get_table_list(CONN) == ["users", "orders"]
+    assert cache.get_table(CONN, "orders") == ([{"Field": "id"}], [])
@@ -6,11 +6,12 @@ MySQL MCP服务器连接测试脚本
 
 import mysql.connector
 from mysql.connector import Error
+import mysql_mcp_driver
 import sys
 from datetime import datetime
 
 
-def test_mysql_connection(host, port, database, username, password, charset='utf8mb4'):
+def test_mysql_connection(host, port, database, username, password, charset='utf8mb4', driver='auto'):
     """测试MySQL连接"""
     print(f"🔍 正在测试MySQL连接...")
     print(f"   主机: {host}:{port}")
@@ -20,15 +21,17 @@ def test_mysql_connection(host, port, database, username, password, charset='utf
     print()
     
     try:
-        # 建立连接
-        connection = mysql.connector.connect(
+        # 建立连接（C扩展不可用时自动退回纯Python驱动）
+        print(f"   驱动: {mysql_mcp_driver.resolve_driver(driver)}")
+        print()
+        connection = mysql_mcp_driver.connect(
+            driver,
             host=host,
             port=port,
             database=database,
             user=username,
             password=password,
-            charset=charset,
-            use_pure=True
+            charset=charset
         )
         
         if connection.is_connected():
@@ -106,6 +109,7 @@ def interactive_test():
     username = input("用户名: ").strip()
     password = input("密码: ").strip()
     charset = input("字符集 (默认: utf8mb4): ").strip() or "utf8mb4"
+    driver = input("驱动 auto/c_ext/pure (默认: auto): ").strip() or "auto"
     
     if not all([database, username, password]):
         print("❌ 错误：数据库名、用户名和密码为必填项！")
@@ -118,7 +122,7 @@ def interactive_test():
         return
     
     print()
-    test_mysql_connection(host, port, database, username, password, charset)
+    test_mysql_connection(host, port, database, username, password, charset, driver)
 
 
 def main():
@@ -131,8 +135,9 @@ def main():
         username = sys.argv[4]
         password = sys.argv[5]
         charset = sys.argv[6] if len(sys.argv) > 6 else 'utf8mb4'
+        driver = sys.argv[7] if len(sys.argv) > 7 else 'auto'
         
-        test_mysql_connection(host, port, database, username, password, charset)
+        test_mysql_connection(host, port, database, username, password, charset, driver)
     else:
         # 交互式模式
         interactive_test()
@@ -0,0 +1,48 @@
+"""
+数据库驱动注册表测试
+"""
+
+import pytest
+from mysql.connector.errors import NotSupportedError
+
+import mysql_mcp_driver
+from mysql_mcp_driver import available_drivers, connect, register_driver, resolve_driver
+
+
+@pytest.fixture
+def fake_driver():
+    calls = []
+    register_driver("fake", lambda **kwargs: calls.append(kwargs) or "connection")
+    yield calls
+    mysql_mcp_driver._DRIVERS.pop("fake", None)
+
+
+def test_builtin_drivers():
+    assert "pure" in available_drivers()
+    assert ("c_ext" in available_drivers()) == mysql_mcp_driver.HAVE_CEXT
+    assert resolve_driver("auto") == ("c_ext" if mysql_mcp_driver.HAVE_CEXT else "pure")
+    assert resolve_driver("pure") == "pure"
+
+
+def test_c_ext_falls_back(monkeypatch):
+    monkeypatch.setattr(mysql_mcp_driver, "HAVE_CEXT", False)
+    assert resolve_driver("c_ext") == "pure"
+    assert "c_ext" not in available_drivers()
+
+
+def test_register_and_connect(fake_driver):
+    assert "fake" in available_drivers()
+    assert connect("fake", host="localhost", database="shop") == "connection"
+    assert fake_driver == [{"host": "localhost", "database": "shop"}]
+
+
+def test_register_replaces(fake_driver):
+    register_driver("fake", lambda **kwargs: "other")
+    assert connect("fake") == "other"
+
+
+def test_invalid_names():
+    with pytest.raises(ValueError):
+        register_driver("auto", lambda **kwargs: None)
+    with pytest.raises(NotSupportedError):
+        resolve_driver("missing")
@@ -0,0 +1,152 @@
+"""
+结果导出测试
+"""
+
+import csv
+import json
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from mysql.connector.constants import FieldType
+
+from mysql_mcp_export import open_writer, resolve_export_path
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_server import SERVER_CONFIG
+
+try:
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa_ipc = pq = None
+
+needs_pyarrow = pytest.mark.skipif(pq is None, reason="需要安装 pyarrow")
+
+
+def test_resolve_export_path(tmp_path):
+    base = str(tmp_path)
+    assert resolve_export_path(base, None, "csv", "export_1") == os.path.join(base, "export_1.csv")
+    assert resolve_export_path(base, "sub/a.jsonl", "jsonl", "x") == os.path.join(base, "sub", "a.jsonl")
+    # 规范化后仍在目录内的路径允许
+    assert resolve_export_path(base, "sub/../b.csv", "csv", "x") == os.path.join(base, "b.csv")
+    for path in ("../escape.csv", "sub/../../escape.csv", "/etc/passwd", os.path.join(os.path.dirname(base), "x.csv")):
+        with pytest.raises(ValueError):
+            resolve_export_path(base, path, "csv", "x")
+
+
+def test_resolve_export_path_symlink(tmp_path):
+    base = tmp_path / "exports"
+    base.mkdir()
+    (base / "link").symlink_to(tmp_path)
+    with pytest.raises(ValueError):
+        resolve_export_path(str(base), "link/escape.csv", "csv", "x")
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(SERVER_CONFIG, "export_dir", str(tmp_path))
+    return tmp_path
+
+
+def _export(run, query, fmt, **kwargs):
+    result = run(lambda server: server.handle_export_query(query, format=fmt, **kwargs))
+    assert not isinstance(result, ToolFailure), result
+    return result, re.search(r"文件: (.+)", result).group(1)
+
+
+def _expected(run):
+    result = run(lambda server: server.handle_execute_query("SELECT id, name, status FROM users ORDER BY id",
+                                                            max_rows=100, output_format="jsonl"))
+    return [json.loads(line) for line in result.splitlines() if line.startswith("{")]
+
+
+def test_export_csv(run, export_dir, monkeypatch):
+    # 小批量读取，覆盖多批写入
+    monkeypatch.setitem(SERVER_CONFIG, "fetch_batch_size", 7)
+    result, target = _export(run, "SELECT id, name, status FROM users ORDER BY id", "csv", path="users.csv")
+    assert target == str(export_dir / "users.csv")
+    assert "行数: 50" in result
+    with open(target, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [{key: str(value) for key, value in row.items()} for row in _expected(run)]
+    assert not os.path.exists(target + ".part")
+
+
+def test_export_jsonl_max_rows(run, export_dir):
+    result, target = _export(run, "SELECT id, name, status FROM users ORDER BY id", "jsonl", max_rows=10)
+    assert os.path.dirname(target) == str(export_dir)
+    assert "行数: 10" in result and "剩余结果未导出" in result
+    with open(target, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert rows == _expected(run)[:10]
+
+
+def test_export_rejected_paths(run, export_dir):
+    for path in ("../escape.csv", "/tmp/escape.csv"):
+        result = run(lambda server: server.handle_export_query("SELECT id FROM users", path=path))
+        assert isinstance(result, ToolFailure) and "导出目录内" in result
+    assert list(export_dir.iterdir()) == []
+    result = run(lambda server: server.handle_export_query("DELETE FROM users"))
+    assert isinstance(result, ToolFailure)
+
+
+def _description(*columns):
+    return [(name, type_code, None, precision, precision, scale, True, flags)
+            for name, type_code, precision, scale, flags in columns]
+
+
+TYPED_DESCRIPTION = _description(
+    ("id", FieldType.LONGLONG, None, None, 32),
+    ("price", FieldType.NEWDECIMAL, 10, 2, 0),
+    ("day", FieldType.DATE, None, None, 0),
+    ("at", FieldType.DATETIME, None, None, 0),
+    ("note", FieldType.BLOB, None, None, 0),
+)
+
+TYPED_ROWS = [
+    (2 ** 63 + 1, Decimal("12.50"), date(2024, 1, 2), datetime(2024, 1, 2, 3, 4, 5), b"\xff"),
+    (1, None, None, None, "中文"),
+]
+
+
+def _read_arrow(path, fmt):
+    if fmt == "parquet":
+        return pq.read_table(path)
+    with pa_ipc.open_file(path) as reader:
+        return reader.read_all()
+
+
+@needs_pyarrow
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_writers(tmp_path, fmt):
+    path = str(tmp_path / f"typed.{fmt}")
+    writer = open_writer(path, [column[0] for column in TYPED_DESCRIPTION], fmt, description=TYPED_DESCRIPTION)
+    writer.write_batch(TYPED_ROWS[:1])
+    writer.write_batch(TYPED_ROWS[1:])
+    writer.close()
+    table = _read_arrow(path, fmt)
+    assert [str(field.type) for field in table.schema] == [
+        "uint64", "decimal128(38, 2)", "date32[day]", "timestamp[us]", "string"]
+    assert table.to_pylist() == [
+        {"id": 2 ** 63 + 1, "price": Decimal("12.50"), "day": date(2024, 1, 2),
+         "at": datetime(2024, 1, 2, 3, 4, 5), "note": "0xff"},
+        {"id": 1, "price": None, "day": None, "at": None, "note": "中文"},
+    ]
+
+
+@needs_pyarrow
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_empty_result(tmp_path, fmt):
+    path = str(tmp_path / f"empty.{fmt}")
+    open_writer(path, ["id"], fmt, description=_description(("id", FieldType.LONG, None, None, 0))).close()
+    table = _read_arrow(path, fmt)
+    assert table.num_rows == 0 and str(table.schema.field("id").type) == "int64"
+
+
+@needs_pyarrow
+def test_export_parquet(run, export_dir):
+    result, target = _export(run, "SELECT id, name, status FROM users ORDER BY id", "parquet")
+    assert target.endswith(".parquet") and "行数: 50" in result
+    assert pq.read_table(target).to_pylist() == _expected(run)
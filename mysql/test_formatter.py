@@ -0,0 +1,88 @@
+"""
+结果渲染测试
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from mysql.connector.constants import FieldType
+
+from mysql_mcp_formatter import blob_preview, compile_converters, render_rows, truncate_cell
+
+
+def _description(*type_codes):
+    return [(f"c{i}", type_code, None, None, None, None, True, 0) for i, type_code in enumerate(type_codes)]
+
+
+def test_truncate_cell():
+    assert truncate_cell("abc", 0) == "abc"
+    assert truncate_cell("abc", 3) == "abc"
+    assert truncate_cell("中文字符", 7) == "中文…(共12字节)"
+
+
+def test_blob_preview():
+    assert blob_preview(b"\x00\xff") == "0x00ff"
+    assert blob_preview(b"\x01\x02\x03", 2) == "0x0102…(共3字节)"
+    assert blob_preview(b"abc", 0) == "(二进制数据，共3字节)"
+
+
+def test_text_converters():
+    description = _description(FieldType.LONG, FieldType.NEWDECIMAL, FieldType.BLOB, FieldType.VAR_STRING)
+    converters, long_columns = compile_converters(["a", "b", "c", "d"], description, json_values=False)
+    values = [convert(value) for convert, value in zip(converters, (1, Decimal("1.50"), b"\x01", None))]
+    assert values == ["1", "1.50", "0x01", "None"]
+    # 数值和 DECIMAL 列不会超出单元格上限，不做截断检查
+    assert long_columns == [2, 3]
+
+
+def test_json_converters():
+    description = _description(FieldType.LONGLONG, FieldType.NEWDECIMAL, FieldType.DATE, FieldType.BLOB)
+    converters, _ = compile_converters(["a", "b", "c", "d"], description, json_values=True)
+    values = [convert(value) for convert, value in zip(converters, (7, Decimal("2.5"), date(2024, 1, 2), b"\xff"))]
+    assert values == [7, "2.5", "2024-01-02", "0xff"]
+    assert [convert(None) for convert in converters] == [None, None, None, None]
+    # 类型码与值不符时按字符串输出
+    assert converters[0](Decimal("3")) == "3"
+
+
+def test_converters_without_description():
+    converters, long_columns = compile_converters(["a", "b"], None, json_values=True)
+    assert [convert(value) for convert, value in zip(converters, (1.5, bytearray(b"\x02")))] == [1.5, "0x02"]
+    assert long_columns == [0, 1]
+
+
+def test_render_table():
+    result = render_rows(["id", "name"], [(1, "a"), (2, None)], "table",
+                         description=_description(FieldType.LONG, FieldType.VAR_STRING))
+    assert result.text == "id | name\n---------\n1 | a\n2 | None\n"
+    assert result.rows_rendered == 2
+
+
+def test_render_tsv_escapes():
+    result = render_rows(["v"], [("a\tb\nc",), (None,)], "tsv")
+    assert result.text == "v\na\\tb\\nc\n\\N\n"
+
+
+def test_render_json_formats():
+    rows = [(1, "x"), (2, "y")]
+    lines = render_rows(["id", "name"], rows, "jsonl").text.splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": 1, "name": "x"}, {"id": 2, "name": "y"}]
+    columnar = json.loads(render_rows(["id", "name"], rows, "json").text)
+    assert columnar == {"columns": ["id", "name"], "data": [[1, 2], ["x", "y"]]}
+
+
+def test_render_budgets():
+    result = render_rows(["v"], [("x" * 100,)], "table", max_cell_bytes=10)
+    assert result.cells_truncated == 1
+    assert "(共100字节)" in result.text
+    result = render_rows(["v"], [(str(i),) for i in range(100)], "tsv", max_total_bytes=20)
+    assert result.output_truncated
+    assert 0 < result.rows_rendered < 100
+    assert len(result.text.encode("utf-8")) <= 21
+
+
+def test_render_unknown_format():
+    with pytest.raises(ValueError):
+        render_rows(["v"], [], "xml")
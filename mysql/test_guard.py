@@ -0,0 +1,153 @@
+"""
+查询代价检查测试
+"""
+
+import json
+
+import pytest
+
+from mysql_mcp_guard import CostEstimate, QueryCostGuard, estimate_rows_examined
+from mysql_mcp_metrics import ToolFailure
+
+JOIN_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "cost_info": {"query_cost": "1250.50"},
+        "nested_loop": [
+            {"table": {"table_name": "orders", "access_type": "ALL",
+                       "rows_examined_per_scan": 1000, "rows_produced_per_join": 100}},
+            {"table": {"table_name": "users", "access_type": "ref",
+                       "rows_examined_per_scan": 3, "rows_produced_per_join": 300}},
+        ],
+    }
+}
+
+SUBQUERY_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "table": {
+            "table_name": "users", "access_type": "ALL", "rows_examined_per_scan": 50,
+            "attached_subqueries": [
+                {"query_block": {"select_id": 2,
+                                 "table": {"table_name": "orders", "rows_examined_per_scan": 20}}},
+            ],
+        },
+    }
+}
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, operation, params=None):
+        self.conn.explained.append((operation, params))
+
+    def fetchall(self):
+        return [(json.dumps(self.conn.plan),)]
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    """返回固定执行计划的连接，记录 EXPLAIN 语句"""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.explained = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+def test_estimate_rows_examined():
+    # orders 全表扫描 1000 行，之后每个连接结果行在 users 上扫描 3 行
+    assert estimate_rows_examined(JOIN_PLAN) == 1000 + 100 * 3
+    # 附属子查询的扫描行数累加
+    assert estimate_rows_examined(SUBQUERY_PLAN) == 50 + 20
+    assert estimate_rows_examined({}) == 0
+    assert estimate_rows_examined([SUBQUERY_PLAN, SUBQUERY_PLAN]) == 140
+
+
+def test_plan_cache_by_query_shape():
+    guard = QueryCostGuard(mode="reject")
+    conn = _Connection(JOIN_PLAN)
+    first = guard.estimate(conn, "db1", "SELECT * FROM orders WHERE id = 1")
+    assert (first.rows, first.cost, first.cached) == (1300, 1250.5, False)
+    assert conn.explained == [("EXPLAIN FORMAT=JSON SELECT * FROM orders WHERE id = 1", None)]
+    # 字面量不同的同形状查询使用缓存
+    second = guard.estimate(conn, "db1", "SELECT  * FROM orders WHERE id = 'x'")
+    assert second.cached and second.rows == 1300
+    assert len(conn.explained) == 1
+    # 不同连接目标、不同形状各自 EXPLAIN
+    guard.estimate(conn, "db2", "SELECT * FROM orders WHERE id = 1")
+    guard.estimate(conn, "db1", "SELECT * FROM orders WHERE user_id = %s", [7])
+    assert len(conn.explained) == 3
+    assert conn.explained[-1][1] == (7,)
+
+
+def test_invalidate():
+    guard = QueryCostGuard(mode="reject")
+    conn = _Connection(JOIN_PLAN)
+    for key in ("db1", "db2"):
+        guard.estimate(conn, key, "SELECT * FROM orders")
+    guard.invalidate("db1")
+    assert not guard.estimate(conn, "db1", "SELECT * FROM orders").cached
+    assert guard.estimate(conn, "db2", "SELECT * FROM orders").cached
+
+
+def test_modes():
+    estimate = CostEstimate(rows=5000, cost=None)
+    sql = "SELECT * FROM orders"
+
+    guard = QueryCostGuard(mode="reject", max_rows=1000)
+    assert guard.apply(sql, CostEstimate(rows=1000, cost=None), 10) == (sql, None)
+    run_query, notice = guard.apply(sql, estimate, 10)
+    assert run_query is None and "预计扫描 5,000 行" in notice
+    assert guard.rejected == 1
+
+    guard = QueryCostGuard(mode="limit", max_rows=1000)
+    run_query, notice = guard.apply(sql, estimate, 10)
+    # limit 模式不改写SQL，由调用方限制读取行数
+    assert run_query == sql and guard.capped(notice)
+    assert guard.rewritten == 1
+
+    guard = QueryCostGuard(mode="hint", max_rows=1000, max_execution_ms=2500)
+    run_query, notice = guard.apply(sql, estimate, 10)
+    assert run_query == "SELECT /*+ MAX_EXECUTION_TIME(2500) */ * FROM orders"
+    assert not guard.capped(notice)
+
+    with pytest.raises(ValueError):
+        QueryCostGuard(mode="block")
+
+
+def _guarded(mode, query, **kwargs):
+    def call(server):
+        server.cost_guard.mode = mode
+        server.cost_guard.max_rows = 10
+        return server.handle_execute_query(query, **kwargs)
+    return call
+
+
+def test_reject_mode(run):
+    result = run(_guarded("reject", "SELECT * FROM users"))
+    assert isinstance(result, ToolFailure) and "查询被拒绝" in result
+    # 估算行数在阈值内的查询照常执行
+    result = run(_guarded("reject", "SELECT * FROM users WHERE id = 1"))
+    assert not isinstance(result, ToolFailure)
+
+
+def test_limit_mode(run):
+    result = run(_guarded("limit", "SELECT id FROM users ORDER BY id", max_rows=5, output_format="tsv"))
+    assert not isinstance(result, ToolFailure)
+    assert "\nid\n1\n2\n3\n4\n5\n\n" in result
+    assert "已在客户端限制为 5 行" in result
+    # 被限制行数的结果不登记续页状态
+    assert "continuation_token" not in result
+    # 读够行数后连接归还连接池，可以继续使用
+    async def count(server):
+        assert server.connection_manager.get_pool_stats()["in_use"] == 0
+        return await server.handle_execute_query("SELECT COUNT(*) AS n FROM users", output_format="tsv")
+
+    assert "\n50\n" in run(count)
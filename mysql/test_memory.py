@@ -0,0 +1,50 @@
+"""
+内存后端和服务器工具的离线测试：服务器以 driver="memory" 连接 mysql_mcp_memory 的内存数据库
+"""
+
+import pytest
+from mysql.connector import errors
+
+import mysql_mcp_memory
+from mysql_mcp_metrics import ToolFailure
+
+
+def test_connection(database):
+    conn = mysql_mcp_memory.connect(database=database)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM users WHERE id > %s", (10,))
+        assert cursor.fetchall() == [(40,)]
+        cursor.execute("SELECT DATABASE(), @@version")
+        assert cursor.fetchall() == [(database, mysql_mcp_memory.VERSION)]
+        with pytest.raises(errors.ProgrammingError) as info:
+            cursor.execute("SELECT * FROM missing")
+        assert info.value.errno == 1146
+    finally:
+        conn.close()
+
+
+def test_shared_data_and_rollback(database):
+    writer = mysql_mcp_memory.connect(database=database)
+    reader = mysql_mcp_memory.connect(database=database)
+    try:
+        cursor = writer.cursor()
+        cursor.execute("DELETE FROM reviews")
+        assert writer.in_transaction
+        writer.rollback()
+        cursor = reader.cursor()
+        cursor.execute("SELECT COUNT(*) FROM reviews")
+        assert cursor.fetchall() == [(50,)]
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_execute_query(run):
+    result = run(lambda server: server.handle_execute_query("SELECT id, name FROM users WHERE id <= 3"))
+    assert not isinstance(result, ToolFailure)
+    assert "id | name" in result
+    # 行数据中的 ❌ 不会让结果被当作失败
+    assert not isinstance(run(lambda server: server.handle_execute_query("SELECT '❌' AS mark")), ToolFailure)
+    assert isinstance(run(lambda server: server.handle_execute_query("SELECT * FROM missing")), ToolFailure)
+    assert isinstance(run(lambda server: server.handle_execute_query("DELETE FROM users")), ToolFailure)
@@ -0,0 +1,83 @@
+"""
+性能指标测试
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from mysql_mcp_metrics import Histogram, MetricsRegistry, ToolFailure, add_rows, phase
+
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+    assert histogram.cumulative() == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+
+
+def test_histogram_quantile():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    assert histogram.quantile(0.5) == 0.0
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def _run(registry, name, handler, *args):
+    return asyncio.run(registry.instrument(name, handler)(*args))
+
+
+def test_instrument_counts_calls_and_errors():
+    registry = MetricsRegistry()
+
+    async def query(sql):
+        with phase("execute"):
+            add_rows(3)
+        # 行数据中出现 ❌ 不算失败
+        return f"❌\n{sql}"
+
+    async def failing(sql):
+        return ToolFailure(f"❌ 查询执行失败: {sql}")
+
+    async def raising(sql):
+        raise RuntimeError(sql)
+
+    assert _run(registry, "query", query, "SELECT 1") == "❌\nSELECT 1"
+    _run(registry, "query", failing, "SELECT 2")
+    with pytest.raises(RuntimeError):
+        _run(registry, "query", raising, "SELECT 3")
+
+    tool = registry.snapshot()["tools"]["query"]
+    assert tool["calls"] == 3
+    assert tool["errors"] == 2
+    assert tool["rows"] == 3
+    assert tool["phases_ms"]["execute"]["count"] == 1
+    assert tool["latency_ms"]["buckets"][-1] == ("+Inf", 3)
+
+
+def test_phase_outside_call_is_ignored():
+    with phase("execute"):
+        add_rows(1)
+
+
+def test_prometheus_and_dump(tmp_path):
+    registry = MetricsRegistry()
+
+    async def tool():
+        return "ok"
+
+    _run(registry, "list_tables", tool)
+    text = registry.to_prometheus()
+    assert 'mysql_mcp_tool_calls_total{tool="list_tables"} 1' in text
+    assert 'mysql_mcp_tool_duration_seconds_bucket{tool="list_tables",le="+Inf"} 1' in text
+
+    path = tmp_path / "metrics.json"
+    registry.dump(str(path))
+    assert json.loads(path.read_text(encoding="utf-8"))["tools"]["list_tables"]["bytes"] == 2
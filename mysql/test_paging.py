@@ -0,0 +1,151 @@
+"""
+结果分页测试
+"""
+
+import re
+import time
+import threading
+
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_paging import KeysetPage, ResultPager
+
+
+def _page(query="SELECT * FROM users", params=None, key_columns=("id",)):
+    return KeysetPage(query, params, key_columns, None, "table", 20)
+
+
+def test_first_page():
+    assert _page("SELECT * FROM users;").page_sql(21) == (
+        "SELECT * FROM (SELECT * FROM users) AS _mcp_page ORDER BY `id` LIMIT 21", None)
+
+
+def test_advance_and_next_page():
+    page = _page()
+    page.advance(["name", "id"], [("a", 1), ("b", 2)])
+    assert page.last_key == [2]
+    assert page.offset == 2
+    page.advance(["name", "id"], [])
+    assert page.last_key == [2] and page.offset == 2
+    assert page.page_sql(5) == (
+        "SELECT * FROM (SELECT * FROM users) AS _mcp_page WHERE `id` > %s ORDER BY `id` LIMIT 5", [2])
+
+
+def test_composite_key():
+    page = _page(key_columns=("tenant", "id"))
+    page.advance(["id", "tenant"], [(7, "t1")])
+    sql, params = page.page_sql(10)
+    assert "WHERE (`tenant`, `id`) > (%s, %s) ORDER BY `tenant`, `id`" in sql
+    assert params == ["t1", 7]
+
+
+def test_query_params_come_first():
+    page = _page("SELECT * FROM users WHERE name LIKE %s", ["a%"])
+    assert page.page_sql(5)[1] == ["a%"]
+    page.advance(["id"], [(3,)])
+    sql, params = page.page_sql(5)
+    assert "LIKE %s" in sql
+    assert params == ["a%", 3]
+
+
+def test_literal_percent_escaped_with_key_params():
+    page = _page("SELECT * FROM users WHERE name LIKE 'a%'")
+    # 第一页没有参数，% 原样保留
+    assert "LIKE 'a%'" in page.page_sql(5)[0]
+    page.advance(["id"], [(3,)])
+    assert "LIKE 'a%%'" in page.page_sql(5)[0]
+
+
+class _Entry:
+    """登记到 ResultPager 的分页状态替身"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_pager_tokens():
+    pager = ResultPager()
+    entry = _Entry("keyset")
+    token = pager.add(entry)
+    assert pager.get(token) is entry
+    pager.pop(token)
+    assert pager.get(token) is None
+
+
+def test_pager_cursor_limit():
+    pager = ResultPager(max_cursors=2)
+    cursors = [_Entry("cursor") for _ in range(3)]
+    tokens = [pager.add(cursor) for cursor in cursors]
+    assert cursors[0].closed
+    assert pager.get(tokens[0]) is None
+    assert pager.held_cursors() == 2
+    # 正在使用的游标不计入上限，也不会被淘汰
+    with cursors[1].lock:
+        pager.add(_Entry("cursor"))
+        assert not cursors[1].closed and not cursors[2].closed
+        assert pager.held_cursors() == 3
+
+
+def test_pager_token_limit():
+    pager = ResultPager(max_tokens=2)
+    entries = [_Entry("keyset") for _ in range(3)]
+    tokens = [pager.add(entry) for entry in entries]
+    assert entries[0].closed
+    assert pager.get(tokens[0]) is None and pager.get(tokens[2]) is entries[2]
+
+
+def test_pager_expire():
+    pager = ResultPager(cursor_idle_timeout=10, keyset_ttl=100)
+    cursor, keyset = _Entry("cursor"), _Entry("keyset")
+    pager.add(cursor)
+    keyset_token = pager.add(keyset)
+    cursor.last_used -= 50
+    keyset.last_used -= 50
+    assert pager.expire() == 1
+    assert cursor.closed and not keyset.closed
+    assert pager.get(keyset_token) is keyset
+    pager.close()
+    assert keyset.closed
+
+
+def test_execute_query_paging(run):
+    first = run(lambda server: server.handle_execute_query("SELECT id FROM users", max_rows=20,
+                                                           output_format="tsv"))
+    token = re.search(r'continuation_token="([^"]+)"', first).group(1)
+    second = run(lambda server: server.handle_fetch_more(token))
+    assert not isinstance(second, ToolFailure), second
+    ids = [int(line) for line in second.splitlines() if line.isdigit()]
+    assert ids == list(range(21, 41))
+    assert isinstance(run(lambda server: server.handle_fetch_more("missing")), ToolFailure)
+
+
+def test_fetch_more_timeout_kills_held_cursor(run):
+    # 多表查询不走键集分页，结果截断后持有游标
+    query = "SELECT u.id, SLEEP(0.05) AS s FROM users u JOIN reviews r ON r.id = u.id"
+    first = run(lambda server: server.handle_execute_query(query, max_rows=2, output_format="tsv"))
+    token = re.search(r'continuation_token="([^"]+)"', first).group(1)
+
+    def fetch(server):
+        server.query_timeout = 0.3
+        return server.handle_fetch_more(token, max_rows=40)
+
+    result = run(fetch)
+    assert isinstance(result, ToolFailure)
+    assert "已终止 1 条服务器端查询" in result
+    assert isinstance(run(lambda server: server.handle_fetch_more(token)), ToolFailure)
+
+    def idle(server):
+        # 被终止的读取结束后游标关闭，连接不再占用
+        deadline = time.monotonic() + 5
+        while server.pager.held_cursors() or server.connection_manager.get_pool_stats()["in_use"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        server.query_timeout = 30
+        return server.handle_execute_query("SELECT COUNT(*) AS n FROM users", output_format="tsv")
+
+    assert "\n50\n" in run(idle)
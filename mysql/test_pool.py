@@ -0,0 +1,217 @@
+"""
+连接池和预处理语句缓存测试
+"""
+
+import threading
+import time
+
+import pytest
+from mysql.connector.errors import InterfaceError, PoolError
+
+from mysql_mcp_pool import MySQLConnectionPool, PreparedStatementCache
+
+
+class _Cursor:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _Connection:
+    """模拟连接：记录 ping / rollback / close"""
+
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.unread_result = False
+        self.in_transaction = False
+        self.pings = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise InterfaceError("MySQL server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def cursor(self, prepared=False):
+        return _Cursor()
+
+
+class _Factory:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        conn = _Connection(len(self.created) + 1)
+        self.created.append(conn)
+        return conn
+
+
+def test_reuses_idle_connection():
+    factory = _Factory()
+    pool = MySQLConnectionPool(factory, size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    stats = pool.stats()
+    assert len(factory.created) == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["open"] == 1 and stats["in_use"] == 1
+
+
+def test_size_bound_and_wait_timeout():
+    pool = MySQLConnectionPool(_Factory(), size=2, acquire_timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolError):
+        pool.acquire()
+    stats = pool.stats()
+    assert stats["open"] == 2
+    assert stats["timeouts"] == 1
+    pool.release(first)
+    pool.release(second)
+
+
+def test_waiter_gets_released_connection():
+    pool = MySQLConnectionPool(_Factory(), size=1, acquire_timeout=5)
+    conn = pool.acquire()
+    timer = threading.Timer(0.05, pool.release, (conn,))
+    timer.start()
+    assert pool.acquire() is conn
+    timer.join()
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["wait_time_max_ms"] > 0
+
+
+def test_validation_only_after_interval():
+    pool = MySQLConnectionPool(_Factory(), size=1, validation_interval=60)
+    conn = pool.acquire()
+    pool.release(conn)
+    pool.acquire()
+    assert conn.pings == 0
+    pool.release(conn)
+    pool.expire_idle()
+    assert pool.acquire() is conn
+    assert conn.pings == 1
+
+
+def test_dead_connection_replaced():
+    factory = _Factory()
+    pool = MySQLConnectionPool(factory, size=1, validation_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.alive = False
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert conn.closed
+    stats = pool.stats()
+    assert stats["dropped"] == 1 and stats["open"] == 1
+
+
+def test_release_cleans_up_connection_state():
+    pool = MySQLConnectionPool(_Factory(), size=2)
+    conn = pool.acquire()
+    conn.in_transaction = True
+    pool.release(conn)
+    assert conn.rollbacks == 1 and not conn.closed
+
+    conn = pool.acquire()
+    conn.unread_result = True
+    pool.release(conn)
+    assert conn.closed
+
+    conn = pool.acquire()
+    pool.invalidate(conn)
+    pool.release(conn)
+    assert conn.closed
+    assert pool.stats()["dropped"] == 2
+    assert pool.stats()["open"] == 0
+
+
+def test_failed_connect_frees_slot():
+    def connect():
+        raise InterfaceError("Can't connect")
+
+    pool = MySQLConnectionPool(connect, size=1, acquire_timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(InterfaceError):
+            pool.acquire()
+    assert pool.stats()["open"] == 0
+
+
+def test_close():
+    pool = MySQLConnectionPool(_Factory(), size=2)
+    idle, in_use = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close()
+    assert idle.closed
+    with pytest.raises(PoolError):
+        pool.acquire()
+    # 关闭后归还的连接直接关闭
+    pool.release(in_use)
+    assert in_use.closed
+    assert pool.stats()["open"] == 0
+
+
+def test_statement_cache_threshold_and_lru():
+    cache = PreparedStatementCache(_Connection(1), max_statements=2, prepare_threshold=2)
+    assert cache.cursor_for("SELECT 1") is None
+    first = cache.cursor_for("SELECT 1")
+    assert first is not None and cache.owns(first)
+    assert cache.cursor_for("SELECT 1") is first
+    assert cache.hits == 1
+
+    for sql in ("SELECT 2", "SELECT 2", "SELECT 3", "SELECT 3"):
+        cache.cursor_for(sql)
+    # SELECT 1 最久未使用，被淘汰并关闭服务器端语句
+    assert len(cache) == 2
+    assert first.closed and not cache.owns(first)
+    assert cache.prepares == 3
+
+
+def test_statement_cache_per_connection():
+    pool = MySQLConnectionPool(_Factory(), size=2, prepare_threshold=1)
+    conn = pool.acquire()
+    cursor = pool.statement_cache(conn).cursor_for("SELECT 1")
+    assert pool.statement_cache(conn).cursor_for("SELECT 1") is cursor
+    other = pool.acquire()
+    assert pool.statement_cache(other).cursor_for("SELECT 1") is not cursor
+    stats = pool.stats()
+    assert stats["prepared_statements"] == 2 and stats["prepared_hits"] == 1
+
+
+def test_concurrent_acquire_never_exceeds_size():
+    factory = _Factory()
+    pool = MySQLConnectionPool(factory, size=3, acquire_timeout=5)
+    peak = []
+    lock = threading.Lock()
+    in_use = [0]
+
+    def worker():
+        for _ in range(20):
+            conn = pool.acquire()
+            with lock:
+                in_use[0] += 1
+                peak.append(in_use[0])
+            time.sleep(0.001)
+            with lock:
+                in_use[0] -= 1
+            pool.release(conn)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3
+    assert len(factory.created) <= 3
@@ -0,0 +1,67 @@
+"""
+查询结果缓存测试
+"""
+
+from mysql_mcp_cache import QueryResultCache, normalize_sql
+
+CONN = ("localhost", 3306, "shop")
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT  *\n FROM t ;") == "SELECT * FROM t"
+    assert normalize_sql("SELECT 'a  b'") == "SELECT 'a  b'"
+
+
+def test_is_cacheable():
+    assert QueryResultCache.is_cacheable("SELECT * FROM t")
+    assert not QueryResultCache.is_cacheable("SELECT NOW()")
+    assert not QueryResultCache.is_cacheable("SELECT RAND() FROM t")
+
+
+def test_invalidate_tables():
+    cache = QueryResultCache()
+    users = cache.make_key(CONN, "SELECT * FROM users", "table")
+    orders = cache.make_key(CONN, "SELECT * FROM orders", "table")
+    cache.put(users, "u", ["users"])
+    cache.put(orders, "o", ["orders"])
+    assert cache.get(cache.make_key(CONN, "SELECT *  FROM users;", "table")) == "u"
+    assert cache.invalidate_tables(CONN, ["users"]) == 1
+    assert cache.get(users) is None and cache.get(orders) == "o"
+    # 未识别出表名时失效该连接的全部缓存
+    assert cache.invalidate_tables(CONN, []) == 1
+    assert cache.get(orders) is None
+
+
+def _count(run, table):
+    result = run(lambda server: server.handle_execute_query(f"SELECT COUNT(*) AS n FROM {table}",
+                                                            output_format="tsv", use_cache=True))
+    return int(result.splitlines()[-1])
+
+
+def test_write_invalidates(run):
+    assert _count(run, "reviews") == 50
+    run(lambda server: server.handle_confirmed_write_operation("DELETE FROM reviews WHERE id <= 5"))
+    assert _count(run, "reviews") == 45
+
+
+def test_partial_parameterized_batch_invalidates(run):
+    run(lambda server: server.handle_confirmed_write_operation("CREATE TABLE t (id INT PRIMARY KEY)"))
+    assert _count(run, "t") == 0
+    # 第一块提交后第二块主键冲突
+    result = run(lambda server: server.handle_batch_write_operation(
+        sql="INSERT INTO t (id) VALUES (%s)", rows=[[1], [2], [1]], chunk_size=2, confirmed=True))
+    assert "已提交分块: 1" in result
+    assert _count(run, "t") == 2
+
+
+def test_paged_result_not_cached(run):
+    def query(server):
+        return server.handle_execute_query("SELECT id FROM users WHERE id <= 20", max_rows=5, use_cache=True)
+
+    for _ in range(2):
+        result = run(query)
+        assert "continuation_token" in result and "结果来自缓存" not in result
+    # 没有下一页的结果照常缓存
+    run(lambda server: server.handle_execute_query("SELECT id FROM users WHERE id <= 3", use_cache=True))
+    assert "结果来自缓存" in run(lambda server: server.handle_execute_query("SELECT id FROM users WHERE id <= 3",
+                                                                          use_cache=True))
@@ -0,0 +1,84 @@
+"""
+运行中查询终止测试：超时或取消工具调用后 KILL QUERY 终止服务器端查询
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_server import SERVER_CONFIG
+
+SLOW_UPDATE = "UPDATE users SET status = SLEEP(5) WHERE id = 1"
+
+
+@pytest.fixture
+def timed(run, monkeypatch):
+    """以 0.3 秒超时执行工具调用，返回 (结果, 耗时)"""
+    monkeypatch.setitem(SERVER_CONFIG, "script_timeout", 0.3)
+
+    def call(tool):
+        async def timed_call(server):
+            server.query_timeout = 0.3
+            # memory 驱动的 sqlite 共享缓存在语句执行期间会阻塞新连接，先建立控制连接
+            await asyncio.get_running_loop().run_in_executor(
+                None, server.connection_manager.kill_query, server.connection_manager.session, 0)
+            start = time.monotonic()
+            result = await tool(server)
+            return result, time.monotonic() - start
+        return run(timed_call)
+    return call
+
+
+def _statuses(run):
+    result = run(lambda server: server.handle_execute_query(
+        "SELECT status FROM users WHERE id <= 3 ORDER BY id", output_format="tsv"))
+    return result.splitlines()[3:6]
+
+
+def _assert_killed(result, elapsed):
+    assert isinstance(result, ToolFailure)
+    assert "已终止 1 条服务器端查询" in result
+    assert elapsed < 2
+
+
+def test_timeout_kills_write(run, timed):
+    before = _statuses(run)
+    _assert_killed(*timed(lambda server: server.handle_confirmed_write_operation(SLOW_UPDATE)))
+    assert "已提交的修改不会撤销" in timed(lambda server: server.handle_confirmed_write_operation(SLOW_UPDATE))[0]
+    assert _statuses(run) == before
+
+
+def test_timeout_kills_batch(run, timed):
+    before = _statuses(run)
+    _assert_killed(*timed(lambda server: server.handle_batch_write_operation(
+        statements=[SLOW_UPDATE, "UPDATE users SET status = 'b' WHERE id = 2"], confirmed=True)))
+    _assert_killed(*timed(lambda server: server.handle_batch_write_operation(
+        sql="UPDATE users SET status = SLEEP(%s) WHERE id = %s", rows=[[5, 1], [0, 2]], confirmed=True)))
+    assert _statuses(run) == before
+
+
+def test_timeout_kills_script(run, timed):
+    before = _statuses(run)
+    _assert_killed(*timed(lambda server: server.handle_execute_script(
+        f"{SLOW_UPDATE};\nUPDATE users SET status = 'b' WHERE id = 2;", transaction=True, confirmed=True)))
+    assert _statuses(run) == before
+
+
+def test_cancel_kills_query(run, timed):
+    async def cancel(server):
+        task = asyncio.ensure_future(server.handle_execute_query("SELECT SLEEP(5)"))
+        while not server.running.queries():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # 工作线程中的查询被终止后很快结束
+        while server.running.queries():
+            await asyncio.sleep(0.01)
+        return server.running.cancelled
+
+    cancelled, elapsed = timed(cancel)
+    assert cancelled == 1
+    assert elapsed < 2
@@ -0,0 +1,43 @@
+"""
+SQL脚本执行测试
+"""
+
+import mysql_mcp_memory
+from mysql_mcp_batch import execute_multi
+from mysql_mcp_metrics import ToolFailure
+
+
+def test_execute_multi():
+    mysql_mcp_memory.open_database("test_batch", tables={"users": 3})
+    conn = mysql_mcp_memory.connect(database="test_batch")
+    try:
+        cursor = conn.cursor()
+        counts = list(execute_multi(cursor, ["SELECT * FROM users", "UPDATE users SET status = 'active'",
+                                             "SELECT 1 -- 行注释"]))
+        assert counts == [3, 3, 1]
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+def test_execute_script(run):
+    script = """
+        CREATE TABLE t (id INT);
+        INSERT INTO t VALUES (1);
+        INSERT INTO t VALUES (2);
+        UPDATE t SET id = id + 10;
+        SELECT * FROM t;
+    """
+    result = run(lambda server: server.handle_execute_script(script, confirmed=True))
+    assert not isinstance(result, ToolFailure), result
+    assert "已执行语句: 5/5" in result
+    assert "（合并发送）" in result
+
+
+def test_execute_script_transaction_rollback(run):
+    script = "DELETE FROM reviews; INSERT INTO missing VALUES (1); DELETE FROM users"
+    result = run(lambda server: server.handle_execute_script(script, transaction=True, confirmed=True))
+    assert isinstance(result, ToolFailure)
+    assert "事务已回滚" in result
+    count = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM reviews", output_format="tsv"))
+    assert "\n50\n" in count
@@ -0,0 +1,115 @@
+"""
+数据库会话重连测试
+"""
+
+import pytest
+from mysql.connector import errors
+
+import mysql_mcp_memory
+import mysql_mcp_session
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_session import MySQLSession
+
+
+class _Pool:
+    def __init__(self):
+        self.expired = 0
+
+    def expire_idle(self):
+        self.expired += 1
+
+
+class _Flaky:
+    """前 failures 次调用抛出 errno 错误，之后返回 "ok" """
+
+    def __init__(self, failures, errno=2013):
+        self.failures = failures
+        self.errno = errno
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise errors.OperationalError(msg="Lost connection to MySQL server during query", errno=self.errno)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(mysql_mcp_session.time, "sleep", delays.append)
+    return delays
+
+
+def _session(**kwargs):
+    return MySQLSession(config=None, pool=_Pool(), **kwargs)
+
+
+def test_retry_until_success(sleeps):
+    session = _session(retries=3, backoff=0.2)
+    func = _Flaky(2)
+    assert session.retry(func) == "ok"
+    assert func.calls == 3
+    assert sleeps == pytest.approx([0.2, 0.4])
+    assert session.reconnects == 2
+    assert session.pool.expired == 2
+
+
+def test_backoff_capped(sleeps):
+    session = _session(retries=5, backoff=1.0, backoff_max=3.0)
+    assert session.retry(_Flaky(5, errno=2006)) == "ok"
+    assert sleeps == [1.0, 2.0, 3.0, 3.0, 3.0]
+
+
+def test_gives_up_after_retries(sleeps):
+    session = _session(retries=2)
+    func = _Flaky(10, errno=2003)
+    with pytest.raises(errors.OperationalError):
+        session.retry(func)
+    assert func.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_other_errors_not_retried(sleeps):
+    session = _session()
+    func = _Flaky(1, errno=1146)
+    with pytest.raises(errors.OperationalError):
+        session.retry(func)
+    assert func.calls == 1
+    assert sleeps == []
+
+
+@pytest.fixture
+def lose_connection(monkeypatch, sleeps):
+    """包含 marker 的语句前 times 次执行时连接断开，返回各次执行的语句"""
+    executed = []
+    execute = mysql_mcp_memory.MemoryCursor.execute
+
+    def setup(marker, times):
+        def flaky(cursor, operation, params=None):
+            if marker in operation:
+                executed.append(operation)
+                if len(executed) <= times:
+                    raise errors.OperationalError(msg="Lost connection to MySQL server during query", errno=2013)
+            return execute(cursor, operation, params)
+        monkeypatch.setattr(mysql_mcp_memory.MemoryCursor, "execute", flaky)
+        return executed
+    return setup
+
+
+def test_read_retried_after_lost_connection(run, lose_connection):
+    executed = lose_connection("FROM users", 2)
+    result = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM users", output_format="tsv"))
+    assert "\n50\n" in result
+    assert len(executed) == 3
+
+
+def test_write_not_retried_after_lost_connection(run, lose_connection):
+    executed = lose_connection("DELETE FROM reviews", 2)
+    result = run(lambda server: server.handle_confirmed_write_operation("DELETE FROM reviews WHERE id = 1"))
+    assert isinstance(result, ToolFailure)
+    assert len(executed) == 1
+    result = run(lambda server: server.handle_batch_write_operation(
+        statements=["DELETE FROM reviews WHERE id = 2"], confirmed=True))
+    assert isinstance(result, ToolFailure)
+    assert len(executed) == 2
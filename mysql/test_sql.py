@@ -0,0 +1,123 @@
+"""
+SQL语句分类和脚本拆分测试
+"""
+
+import pytest
+
+from mysql_mcp_sql import add_optimizer_hint, classify, query_shape, referenced_tables, split_script
+
+
+@pytest.mark.parametrize("sql, kind", [
+    ("SELECT 1", "SELECT"),
+    ("  -- 注释\n/* 块注释 */ select * from t", "SELECT"),
+    ("(SELECT 1) UNION (SELECT 2)", "SELECT"),
+    ("WITH c AS (SELECT 1) SELECT * FROM c", "SELECT"),
+    ("WITH c AS (SELECT id FROM t) DELETE FROM t WHERE id IN (SELECT id FROM c)", "DELETE"),
+    ("DESC users", "DESCRIBE"),
+    ("insert into t values (1)", "INSERT"),
+    ("/*!50000 DELETE */ FROM t", "DELETE"),
+    ("/*!40101 SET NAMES utf8 */", "SET"),
+    ("", ""),
+])
+def test_kind(sql, kind):
+    assert classify(sql).kind == kind
+
+
+def test_read_and_write():
+    assert classify("SHOW TABLES").is_read
+    assert classify("EXPLAIN SELECT * FROM t").is_read
+    assert not classify("EXPLAIN ANALYZE DELETE FROM t").is_read
+    assert classify("UPDATE t SET a = 1").is_write
+    assert classify("TRUNCATE t").is_ddl
+    assert not classify("SELECT 1").is_write
+
+
+def test_select_into():
+    assert classify("SELECT * FROM t INTO OUTFILE '/tmp/x'").select_into
+    assert classify("SELECT a INTO @v FROM t").select_into
+    assert not classify("SELECT * FROM t WHERE a IN (SELECT b FROM u)").select_into
+    assert not classify("INSERT INTO t SELECT * FROM u").select_into
+
+
+def test_ordinary_comments_are_skipped():
+    statement = classify("SELECT * FROM t /* INTO OUTFILE '/tmp/x' */ -- ; DROP TABLE t")
+    assert statement.is_read
+    assert not statement.select_into
+    assert not statement.multiple
+
+
+def test_executable_comments_are_classified():
+    statement = classify("SELECT * FROM t /*! INTO OUTFILE '/tmp/x' */")
+    assert statement.select_into
+    assert not statement.is_read
+    assert classify("SELECT * FROM t /*!50700 INTO DUMPFILE '/tmp/x' */").select_into
+    assert classify("SELECT 1 /*! ; DROP TABLE t */").multiple
+    # 优化器提示不是可执行注释
+    assert classify("SELECT /*+ MAX_EXECUTION_TIME(100) */ * FROM t").is_read
+
+
+def test_multiple():
+    assert classify("SELECT 1; SELECT 2").multiple
+    assert not classify("SELECT 1;").multiple
+    assert not classify("SELECT ';' FROM t").multiple
+
+
+def test_tables():
+    assert referenced_tables("SELECT * FROM `db`.`users` u JOIN orders o ON o.user_id = u.id") == {"users", "orders"}
+    assert referenced_tables("SELECT * FROM a, b WHERE a.id = b.id") == {"a", "b"}
+    statement = classify("SELECT * FROM a WHERE id IN (SELECT a_id FROM b)")
+    assert statement.tables == {"a", "b"}
+    assert statement.base_tables == {"a"}
+
+
+def test_shape_keywords_and_aggregate():
+    assert classify("SELECT DISTINCT a FROM t").top_level_keywords == {"DISTINCT"}
+    assert classify("SELECT * FROM t WHERE id IN (SELECT id FROM u ORDER BY id)").top_level_keywords == frozenset()
+    assert classify("SELECT COUNT(*) FROM t").aggregate
+    assert not classify("SELECT count FROM t").aggregate
+    assert not classify("SELECT * FROM t WHERE id = (SELECT MAX(id) FROM t)").aggregate
+
+
+def test_ddl_object():
+    assert classify("CREATE TABLE IF NOT EXISTS `t1` (id INT)").ddl_object == ("TABLE", "t1")
+    assert classify("CREATE UNIQUE INDEX idx ON users (email)").ddl_object == ("TABLE", "users")
+    assert classify("DROP VIEW v").ddl_object == ("VIEW", "v")
+
+
+def test_query_shape():
+    shape = query_shape("SELECT * FROM t WHERE id = 5 AND name = 'x'")
+    assert shape == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert query_shape("SELECT  * FROM t\nWHERE id = 42 AND name = 'yy' -- 注释") == shape
+
+
+def test_add_optimizer_hint():
+    assert add_optimizer_hint("SELECT * FROM t", "X") == "SELECT /*+ X */ * FROM t"
+    assert add_optimizer_hint("SELECT /*+ A */ 1", "X") == "SELECT /*+ X  A */ 1"
+    assert add_optimizer_hint("UPDATE t SET a = 1", "X") is None
+    assert add_optimizer_hint("/*!SELECT */ 1", "X") is None
+
+
+def test_split_script():
+    script = """
+        -- 建表
+        CREATE TABLE t (id INT);
+        INSERT INTO t VALUES (1), (';');
+        /* 只有注释 */;
+        SELECT `a;b` FROM t
+    """
+    assert split_script(script) == [
+        "-- 建表\n        CREATE TABLE t (id INT)",
+        "INSERT INTO t VALUES (1), (';')",
+        "SELECT `a;b` FROM t",
+    ]
+
+
+def test_split_script_delimiter():
+    script = "DELIMITER $$\nCREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END$$\nDELIMITER ;\nCALL p();"
+    assert split_script(script) == ["CREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END", "CALL p()"]
+
+
+def test_split_script_keeps_executable_comments():
+    assert split_script("/*!40101 SET NAMES utf8mb4 */;\nSELECT 1;") == ["/*!40101 SET NAMES utf8mb4 */", "SELECT 1"]
+    # 可执行注释中的分号不拆分
+    assert split_script("/*!50003 a; b */;") == ["/*!50003 a; b */"]
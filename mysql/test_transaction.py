@@ -0,0 +1,109 @@
+"""
+显式事务测试
+"""
+
+import re
+
+from mysql_mcp_guard import CostEstimate, QueryCostGuard
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_server import SERVER_CONFIG, MySQLConnectionManager
+
+
+def _begin(run, **kwargs):
+    begun = run(lambda server: server.handle_begin_transaction(**kwargs))
+    assert not isinstance(begun, ToolFailure), begun
+    return re.search(r'transaction="([^"]+)"', begun).group(1)
+
+
+def test_transaction_rollback(run):
+    handle = _begin(run)
+    run(lambda server: server.handle_confirmed_write_operation("DELETE FROM reviews", transaction=handle))
+    inside = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM reviews",
+                                                            output_format="tsv", transaction=handle))
+    assert "\n0\n" in inside
+    result = run(lambda server: server.handle_rollback(handle))
+    assert not isinstance(result, ToolFailure), result
+    count = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM reviews", output_format="tsv"))
+    assert "\n50\n" in count
+
+
+def test_commit(run):
+    handle = _begin(run)
+    run(lambda server: server.handle_confirmed_write_operation("DELETE FROM reviews WHERE id <= 10",
+                                                               transaction=handle))
+    assert not isinstance(run(lambda server: server.handle_commit(handle)), ToolFailure)
+    count = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM reviews", output_format="tsv"))
+    assert "\n40\n" in count
+    # 事务结束后句柄失效
+    result = run(lambda server: server.handle_execute_query("SELECT 1", transaction=handle))
+    assert isinstance(result, ToolFailure) and "不存在或已结束" in result
+
+
+def test_script_transaction_flag_is_not_a_handle(run):
+    # execute_script 自己的 transaction 参数是布尔值，不能被当作事务句柄
+    result = run(lambda server: server.handle_execute_script("DELETE FROM reviews WHERE id = 1",
+                                                             transaction=True, confirmed=True))
+    assert not isinstance(result, ToolFailure), result
+    assert "单个事务" in result
+
+
+class _StreamingCursor:
+    """未读完的非缓冲结果：只允许按批读取"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.batches = []
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.batches.append(len(batch))
+        return batch
+
+    def fetchall(self):
+        raise AssertionError("剩余结果不应一次性读入内存")
+
+
+def test_truncated_result_drained_in_batches():
+    manager = MySQLConnectionManager()
+    conn = object()
+    manager._pinned[id(conn)] = object()
+    cursor = _StreamingCursor([(i,) for i in range(2500)])
+    manager.abandon_result(conn, cursor)
+    assert cursor.rows == []
+    assert max(cursor.batches) <= SERVER_CONFIG['fetch_batch_size']
+
+
+def test_truncated_query_in_transaction(run):
+    handle = _begin(run)
+    result = run(lambda server: server.handle_execute_query("SELECT * FROM users", max_rows=5, transaction=handle))
+    assert "结果已截断" in result
+    # 剩余结果读完后事务连接可以继续使用
+    count = run(lambda server: server.handle_execute_query("SELECT COUNT(*) AS n FROM users", output_format="tsv",
+                                                           transaction=handle))
+    assert "\n50\n" in count
+    run(lambda server: server.handle_rollback(handle))
+
+
+def test_guard_limit_mode_rejects_in_transaction():
+    guard = QueryCostGuard(mode="limit", max_rows=100)
+    estimate = CostEstimate(rows=1000, cost=None)
+    sql, notice = guard.apply("SELECT * FROM t", estimate, 10)
+    assert sql == "SELECT * FROM t" and guard.capped(notice)
+    sql, notice = guard.apply("SELECT * FROM t", estimate, 10, in_transaction=True)
+    assert sql is None and "事务中" in notice
+
+
+def test_guard_rejects_capped_query_in_transaction(run):
+    handle = _begin(run)
+
+    def query(server):
+        server.cost_guard.mode = "limit"
+        server.cost_guard.max_rows = 10
+        return server.handle_execute_query("SELECT * FROM users", max_rows=5, transaction=handle)
+
+    result = run(query)
+    assert isinstance(result, ToolFailure) and "事务中无法在读够行数后终止查询" in result
+    # 事务外按 limit 模式执行
+    assert not isinstance(run(lambda server: server.handle_execute_query("SELECT * FROM users", max_rows=5)),
+                          ToolFailure)
+    run(lambda server: server.handle_rollback(handle))
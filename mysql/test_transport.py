@@ -0,0 +1,99 @@
+"""
+MCP stdio 传输层测试
+"""
+
+import asyncio
+import json
+
+from mysql_mcp_metrics import ToolFailure
+from mysql_mcp_transport import INVALID_PARAMS, StdioMCPServer
+
+
+async def _rows(query: str) -> str:
+    return f"x\n-\n{query}\n"
+
+
+async def _fail(query: str) -> str:
+    return ToolFailure(f"❌ 查询执行失败: {query}")
+
+
+def _dispatch(message):
+    server = StdioMCPServer([], {"rows": _rows, "fail": _fail})
+    return asyncio.run(server._dispatch(message))
+
+
+def _call(name, arguments, request_id=1):
+    return _dispatch({"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                      "params": {"name": name, "arguments": arguments}})
+
+
+def test_is_error_follows_result_type():
+    # 行数据中出现 ❌ 不算失败
+    result = _call("rows", {"query": "❌"})["result"]
+    assert result["isError"] is False
+    assert "❌" in result["content"][0]["text"]
+    result = _call("fail", {"query": "SELECT 1"})["result"]
+    assert result["isError"] is True
+
+
+def test_bad_arguments():
+    assert _call("rows", {"sql": "SELECT 1"})["result"]["isError"] is True
+    assert _call("missing", {})["error"]["code"] == INVALID_PARAMS
+
+
+def test_notification_has_no_response():
+    assert _dispatch({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def test_cancel_when_slots_busy():
+    started, cancelled = [], []
+
+    async def slow(name):
+        started.append(name)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        return name
+
+    def call(request_id):
+        return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+                "params": {"name": "slow", "arguments": {"name": f"q{request_id}"}}}
+
+    def cancel(request_id):
+        return {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": request_id}}
+
+    async def serve():
+        server = StdioMCPServer([], {"slow": slow}, max_concurrency=1)
+        reader, writer = asyncio.StreamReader(), _Writer()
+
+        def feed(*messages):
+            for message in messages:
+                reader.feed_data(json.dumps(message).encode("utf-8") + b"\n")
+
+        serving = asyncio.ensure_future(server.serve(reader, writer))
+        # q1 占满执行名额，q2 排队
+        feed(call(1), call(2))
+        await asyncio.sleep(0.05)
+        # 取消通知和 ping 仍能读到并处理；q4 在开始运行前就被取消
+        feed([cancel(2)], {"jsonrpc": "2.0", "id": 3, "method": "ping"}, call(4), cancel(4), cancel(1))
+        reader.feed_eof()
+        await asyncio.wait_for(serving, timeout=5)
+        return [json.loads(line) for line in writer.data.splitlines()]
+
+    responses = asyncio.run(serve())
+    assert responses == [{"jsonrpc": "2.0", "id": 3, "result": {}}]
+    # q2 在排队时被取消，没有开始执行
+    assert started == ["q1"] and cancelled == ["q1"]